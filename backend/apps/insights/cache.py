@@ -0,0 +1,21 @@
+# insights/cache.py
+from django.core.cache import cache as default_cache
+from config.timing import TimedCache
+
+cache = TimedCache(default_cache)
+
+# Generated content by input hash; outlives the Insight row of a period
+# whose data changed and later changed back
+INSIGHT_CONTENT_TIMEOUT = 60 * 60 * 24 * 30  # 30 days
+
+
+def get_insight_content_key(input_hash):
+    return f'insight_content:{input_hash}'
+
+
+def get_cached_insight_content(input_hash):
+    return cache.get(get_insight_content_key(input_hash))
+
+
+def set_cached_insight_content(input_hash, content):
+    cache.set(get_insight_content_key(input_hash), content, INSIGHT_CONTENT_TIMEOUT)
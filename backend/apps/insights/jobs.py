@@ -0,0 +1,190 @@
+# insights/jobs.py
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from apps.tracker.models import Tracker
+from .cache import get_cached_insight_content, set_cached_insight_content
+from .models import Insight, InsightJob
+from .services import (
+    InsightGenerationError,
+    fallback_response,
+    insight_input_hash,
+    request_insight_content,
+)
+from .utils import get_tracking_data
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (InsightJob.STATUS_QUEUED, InsightJob.STATUS_RUNNING)
+
+
+def find_cached_insight(user, report_type, period_start, period_end, input_hash):
+    """
+    The user's insight generated from exactly these inputs, from the
+    Insight table or else the content cache.
+
+    Returns:
+        Insight or None
+    """
+    insight = Insight.objects.filter(owner=user, input_hash=input_hash).first()
+    if insight is not None:
+        return insight
+    content = get_cached_insight_content(input_hash)
+    if content is None:
+        return None
+    return save_insight(user, report_type, period_start, period_end, content, input_hash)
+
+
+def save_insight(user, report_type, period_start, period_end, content, input_hash=''):
+    insight, _ = Insight.objects.update_or_create(
+        owner=user,
+        report_type=report_type,
+        period_start=period_start,
+        period_end=period_end,
+        defaults={"content": content, "input_hash": input_hash},
+    )
+    return insight
+
+
+def enqueue_insight_job(user, report_type, period_start, period_end, force=False):
+    """
+    Queue an insight generation, reusing a queued or running job for the
+    same period so repeated clicks don't pile up OpenAI calls.
+
+    Args:
+        force: call OpenAI even if the inputs match an existing insight
+
+    Returns:
+        tuple: (InsightJob, created)
+    """
+    active = InsightJob.objects.filter(
+        owner=user,
+        report_type=report_type,
+        period_start=period_start,
+        period_end=period_end,
+        status__in=ACTIVE_STATUSES,
+    )
+    job = active.first()
+    if job is None:
+        try:
+            with transaction.atomic():
+                job = InsightJob.objects.create(
+                    owner=user,
+                    report_type=report_type,
+                    period_start=period_start,
+                    period_end=period_end,
+                    force=force,
+                    run_after=timezone.now(),
+                )
+            return job, True
+        except IntegrityError:
+            # A concurrent request queued the same period first
+            job = active.first()
+            if job is None:
+                raise
+    if force and not job.force:
+        job.force = True
+        job.save(update_fields=['force', 'updated_at'])
+    return job, False
+
+
+def claim_jobs(limit, visibility_timeout=None):
+    """
+    Lease up to `limit` runnable jobs: queued jobs that are due, and running
+    jobs whose lease expired because their worker died or hung.
+
+    Each job is claimed with a conditional UPDATE, so concurrent workers
+    never lease the same job twice.
+
+    Returns:
+        list: the claimed InsightJob objects
+    """
+    timeout = visibility_timeout or settings.INSIGHT_JOB_VISIBILITY_TIMEOUT
+    now = timezone.now()
+    runnable = (
+        Q(status=InsightJob.STATUS_QUEUED, run_after__lte=now)
+        | Q(status=InsightJob.STATUS_RUNNING, locked_until__lt=now)
+    )
+    candidates = (InsightJob.objects
+        .filter(runnable)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:limit * 2]
+    )
+
+    claimed = []
+    for job_id in candidates:
+        won = InsightJob.objects.filter(runnable, id=job_id).update(
+            status=InsightJob.STATUS_RUNNING,
+            locked_until=now + timedelta(seconds=timeout),
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+        if won:
+            claimed.append(InsightJob.objects.select_related('owner').get(id=job_id))
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def run_job(job, max_attempts=None, retry_delay=None):
+    """
+    Generate the insight of a claimed job.
+
+    Unless the job is forced, inputs matching an earlier insight reuse it
+    without calling OpenAI. Retryable OpenAI failures put the job back in
+    the queue with an exponential backoff; the last attempt and permanent failures save the
+    fallback content (as the synchronous endpoint did) and fail the job.
+
+    Returns:
+        InsightJob: the job with its new status
+    """
+    max_attempts = max_attempts or settings.INSIGHT_JOB_MAX_ATTEMPTS
+    retry_delay = retry_delay if retry_delay is not None else settings.INSIGHT_JOB_RETRY_DELAY
+
+    if job.attempts > max_attempts:
+        # Leased again after its worker died on the last attempt
+        return _finish(job, InsightJob.STATUS_FAILED, error='Worker lease expired')
+
+    period = (job.report_type, job.period_start, job.period_end)
+    trackers = Tracker.objects.filter(user=job.owner, is_active=True)
+    tracking_data = get_tracking_data(job.owner, job.period_start, job.period_end, trackers)
+    input_hash = insight_input_hash(tracking_data, *period, trackers)
+    if not job.force:
+        cached = find_cached_insight(job.owner, *period, input_hash)
+        if cached is not None:
+            return _finish(job, InsightJob.STATUS_SUCCEEDED, insight=cached)
+
+    try:
+        content = request_insight_content(
+            tracking_data, job.report_type, job.period_start, job.period_end, trackers
+        )
+    except InsightGenerationError as e:
+        if e.retryable and job.attempts < max_attempts:
+            job.status = InsightJob.STATUS_QUEUED
+            job.error = e.summary
+            job.locked_until = None
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay * 2 ** (job.attempts - 1))
+            job.save(update_fields=['status', 'error', 'locked_until', 'run_after', 'updated_at'])
+            return job
+        insight = save_insight(job.owner, *period, fallback_response(e.summary))
+        return _finish(job, InsightJob.STATUS_FAILED, insight=insight, error=e.summary)
+    except Exception as e:
+        logger.exception("Insight job %s failed", job.id)
+        return _finish(job, InsightJob.STATUS_FAILED, error=str(e) or e.__class__.__name__)
+
+    set_cached_insight_content(input_hash, content)
+    insight = save_insight(job.owner, *period, content, input_hash)
+    return _finish(job, InsightJob.STATUS_SUCCEEDED, insight=insight)
+
+
+def _finish(job, status, insight=None, error=''):
+    job.status = status
+    job.insight = insight
+    job.error = error
+    job.locked_until = None
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'insight', 'error', 'locked_until', 'finished_at', 'updated_at'])
+    return job
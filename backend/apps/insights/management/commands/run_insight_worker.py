@@ -0,0 +1,91 @@
+"""
+Management command to process queued insight generations.
+
+Usage:
+    python manage.py run_insight_worker
+    python manage.py run_insight_worker --concurrency 4 --max-attempts 5
+    python manage.py run_insight_worker --once
+
+Jobs are leased for --visibility-timeout seconds; a job whose worker
+dies or hangs past its lease is picked up again by any worker.
+"""
+
+import logging
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from apps.insights.jobs import claim_jobs, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Generate queued AI insights'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help='Jobs processed at the same time')
+        parser.add_argument('--max-attempts', type=int, default=settings.INSIGHT_JOB_MAX_ATTEMPTS)
+        parser.add_argument('--retry-delay', type=float, default=settings.INSIGHT_JOB_RETRY_DELAY,
+            help='Seconds before the first retry; doubled after every failed attempt')
+        parser.add_argument('--visibility-timeout', type=int, default=settings.INSIGHT_JOB_VISIBILITY_TIMEOUT,
+            help='Seconds a claimed job stays hidden from other workers')
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency must be at least 1')
+        self.options = options
+        self.stopping = False
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        processed = 0
+        concurrency = options['concurrency']
+        # One job at a time runs inline; more use threads with their own connections
+        pool = ThreadPoolExecutor(max_workers=concurrency) if concurrency > 1 else None
+        running = set()
+        try:
+            while not self.stopping:
+                running = {future for future in running if not future.done()}
+                free = concurrency - len(running)
+                jobs = claim_jobs(free, options['visibility_timeout']) if free else []
+                for job in jobs:
+                    if pool:
+                        running.add(pool.submit(self.process_in_thread, job))
+                    else:
+                        self.process(job)
+                processed += len(jobs)
+
+                if not jobs:
+                    if options['once'] and not running:
+                        break
+                    time.sleep(options['poll_interval'])
+        finally:
+            if pool:
+                pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} insight jobs'))
+
+    def process(self, job):
+        try:
+            job = run_job(job, self.options['max_attempts'], self.options['retry_delay'])
+            self.stdout.write(f'Job {job.id} ({job.owner.get_username()}, {job.report_type}): {job.status}')
+        except Exception:
+            # The lease runs out and the job is retried by the next claim
+            logger.exception('Insight job %s crashed', job.id)
+
+    def process_in_thread(self, job):
+        close_old_connections()
+        try:
+            self.process(job)
+        finally:
+            connections.close_all()
+
+    def stop(self, signum, frame):
+        self.stdout.write('Stopping after the running jobs finish...')
+        self.stopping = True
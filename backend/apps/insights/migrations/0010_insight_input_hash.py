@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-18 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insights', '0009_insight_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='insight',
+            name='input_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='insightjob',
+            name='force',
+            field=models.BooleanField(default=False),
+        ),
+    ]
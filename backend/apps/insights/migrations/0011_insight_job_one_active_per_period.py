@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 07:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fail_duplicate_active_jobs(apps, schema_editor):
+    """Keep the oldest queued or running job of each period."""
+    InsightJob = apps.get_model('insights', 'InsightJob')
+    seen = set()
+    duplicates = []
+    active = InsightJob.objects.filter(status__in=['queued', 'running']).order_by('id')
+    for job in active.values('id', 'owner_id', 'report_type', 'period_start', 'period_end'):
+        key = (job['owner_id'], job['report_type'], job['period_start'], job['period_end'])
+        if key in seen:
+            duplicates.append(job['id'])
+        seen.add(key)
+    InsightJob.objects.filter(id__in=duplicates).update(status='failed', error='Duplicate job')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insights', '0010_insight_input_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='insightjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('owner', 'report_type', 'period_start', 'period_end'), name='insight_job_one_active_per_period'),
+        ),
+    ]
@@ -15,6 +15,8 @@ class Insight(models.Model):
     period_start = models.DateField()
     period_end = models.DateField()
     content = models.JSONField()
+    # SHA-256 of everything sent to OpenAI; blank for fallback content
+    input_hash = models.CharField(max_length=64, blank=True, db_index=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -30,3 +32,57 @@ class Insight(models.Model):
 
     def __str__(self):
         return f"{self.owner.get_username()} - {self.report_type} - {self.period_start}"
+
+
+class InsightJob(models.Model):
+    """A queued insight generation, processed by the run_insight_worker command."""
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    report_type = models.CharField(max_length=50, choices=Insight.REPORT_TYPES)
+    period_start = models.DateField()
+    period_end = models.DateField()
+
+    # Call OpenAI even when an insight with the same inputs exists
+    force = models.BooleanField(default=False)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    insight = models.ForeignKey(Insight, null=True, blank=True, on_delete=models.SET_NULL)
+
+    # Not claimable before this time (retry backoff)
+    run_after = models.DateTimeField()
+    # A running job whose worker doesn't finish by this time is claimed again
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+        constraints = [
+            # At most one queued or running job per period, even for concurrent requests
+            models.UniqueConstraint(
+                fields=['owner', 'report_type', 'period_start', 'period_end'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='insight_job_one_active_per_period',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.owner.get_username()} - {self.report_type} - {self.status}"
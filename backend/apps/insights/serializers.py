@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Insight
+from .models import Insight, InsightJob
 
 
 class InsightSerializer(serializers.ModelSerializer):
@@ -14,4 +14,25 @@ class InsightSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
-        read_only_fields = fields
\ No newline at end of file
+        read_only_fields = fields
+
+
+class InsightJobSerializer(serializers.ModelSerializer):
+    insight = InsightSerializer(read_only=True)
+
+    class Meta:
+        model = InsightJob
+        fields = [
+            'id',
+            'status',
+            'report_type',
+            'period_start',
+            'period_end',
+            'attempts',
+            'error',
+            'insight',
+            'created_at',
+            'updated_at',
+            'finished_at',
+        ]
+        read_only_fields = fields
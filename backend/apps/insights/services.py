@@ -1,6 +1,10 @@
+import hashlib
 import json
+import time
 from openai import OpenAI
 from django.conf import settings
+from config.metrics import OPENAI_FAILURES, OPENAI_LATENCY
+from config.timing import timing_phase
 
 MODEL_NAME = "gpt-4o-mini"
 
@@ -35,8 +39,43 @@ Rules:
 - If there are only 1-2 days of data, focus on summary and advice rather than trends"""
 
 
+def insight_input_hash(tracking_data, report_type, period_start, period_end, trackers):
+    """SHA-256 of every input of an insight, so identical requests can reuse one answer
+
+    Takes the same arguments as generate_insight_content. The model and
+    system prompt are part of the hash, so changing either invalidates
+    every cached insight.
+    """
+    tracker_meta = [
+        [t.name, t.tracker_type, t.unit, t.min_value, t.max_value]
+        for t in trackers
+    ]
+    payload = json.dumps(
+        [MODEL_NAME, SYSTEM_PROMPT, report_type, str(period_start), str(period_end), tracker_meta, tracking_data],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class InsightGenerationError(Exception):
+    """
+    OpenAI didn't produce usable insight content.
+
+    Attributes:
+        summary: user-facing message for the fallback content
+        retryable: whether trying again later may succeed
+    """
+
+    def __init__(self, summary, retryable=True):
+        super().__init__(summary)
+        self.summary = summary
+        self.retryable = retryable
+
+
 def generate_insight_content(tracking_data, report_type, period_start, period_end, trackers):
-    """Call OpenAI and return structured insight content
+    """Call OpenAI and return structured insight content, or fallback content on failure
     
     Args:
         tracking_data: dict of {date_str: {tracker_name: value}}
@@ -45,38 +84,58 @@ def generate_insight_content(tracking_data, report_type, period_start, period_en
         period_end: date object
         trackers: QuerySet of active Tracker objects (provides context like units and scales)
     """
-    
+    try:
+        return request_insight_content(tracking_data, report_type, period_start, period_end, trackers)
+    except InsightGenerationError as e:
+        return fallback_response(e.summary)
+
+
+def request_insight_content(tracking_data, report_type, period_start, period_end, trackers):
+    """Call OpenAI and return structured insight content
+
+    Takes the same arguments as generate_insight_content.
+
+    Raises:
+        InsightGenerationError: when no usable content came back
+    """
     if not settings.OPENAI_API_KEY:
-        return _fallback_response(MISSING_API_KEY_MSG)
+        OPENAI_FAILURES.inc(reason="missing_api_key")
+        raise InsightGenerationError(MISSING_API_KEY_MSG, retryable=False)
 
     client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
     prompt = build_prompt(tracking_data, report_type, period_start, period_end, trackers)
 
-
+    started = time.perf_counter()
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"}
-        )
+        with timing_phase("external"):
+            response = client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
+            )
         content = response.choices[0].message.content
     except Exception:
-        return _fallback_response(GENERATION_FAILED_MSG)
+        OPENAI_LATENCY.observe(time.perf_counter() - started, outcome="error")
+        OPENAI_FAILURES.inc(reason="error")
+        raise InsightGenerationError(GENERATION_FAILED_MSG)
+    OPENAI_LATENCY.observe(time.perf_counter() - started, outcome="ok")
 
     if not content:
-        return _fallback_response(EMPTY_CONTENT_MSG)
+        OPENAI_FAILURES.inc(reason="empty")
+        raise InsightGenerationError(EMPTY_CONTENT_MSG)
 
     try:
         return json.loads(content)
     except json.JSONDecodeError:
-        return _fallback_response(INVALID_JSON_MSG)
+        OPENAI_FAILURES.inc(reason="invalid_json")
+        raise InsightGenerationError(INVALID_JSON_MSG)
 
 
-def _fallback_response(summary):
+def fallback_response(summary):
     """Return a safe fallback when AI generation fails."""
     return {
         'summary': summary,
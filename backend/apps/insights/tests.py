@@ -1,11 +1,27 @@
-from datetime import date
+from datetime import date, timedelta
+from io import StringIO
 from types import SimpleNamespace
 from unittest.mock import patch
 
 # Create your tests here.
-from django.test import SimpleTestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
 
+from apps.insights.jobs import claim_jobs, enqueue_insight_job
+from apps.insights.models import Insight, InsightJob
 from apps.insights.services import generate_insight_content
+from apps.insights.utils import get_tracking_data
+from apps.tracker.models import Entry, Tracker
+from apps.tracker.services import save_entry
+from config.instrumentation import QueryBudgetMixin
+from config.metrics import REGISTRY
+
+User = get_user_model()
 
 
 class GenerateInsightContentTests(SimpleTestCase):
@@ -30,4 +46,278 @@ class GenerateInsightContentTests(SimpleTestCase):
 
         result = generate_insight_content({}, "weekly", date(2026, 2, 1), date(2026, 2, 8), [])
 
-        self.assertEqual(result["summary"], "Unable to generate insights due to a formatting issue.")
\ No newline at end of file
+        self.assertEqual(result["summary"], "Unable to generate insights due to a formatting issue.")
+    @override_settings(OPENAI_API_KEY="test-key", METRICS_ENABLED=True, METRICS_FLUSH_INTERVAL=0)
+    @patch("apps.insights.services.OpenAI")
+    def test_records_openai_latency_and_failures(self, mock_openai):
+        cache.clear()
+        REGISTRY.reset()
+        mock_client = mock_openai.return_value
+        mock_client.chat.completions.create.side_effect = [
+            RuntimeError("timeout"),
+            SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))]),
+        ]
+
+        for _ in range(2):
+            generate_insight_content({}, "weekly", date(2026, 2, 1), date(2026, 2, 8), [])
+
+        text = REGISTRY.collect()
+        self.assertIn('tracked_openai_failures_total{reason="error"} 1', text)
+        self.assertIn('tracked_openai_request_duration_seconds_count{outcome="error"} 1', text)
+        self.assertIn('tracked_openai_request_duration_seconds_count{outcome="ok"} 1', text)
+
+
+class TrackingDataTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.steps = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number", display_order=1)
+        self.prayer = Tracker.objects.create(user=self.user, name="Prayer", tracker_type="prayer", display_order=0)
+        self.trackers = Tracker.objects.filter(user=self.user)
+
+    def _log(self, tracker, day, **values):
+        save_entry(self.user, Entry(tracker=tracker, **values), day)
+
+    def test_custom_range_in_one_query(self):
+        start = date(2025, 11, 15)
+        for offset in range(90):
+            self._log(self.steps, start + timedelta(days=offset), number_value=offset)
+        self._log(self.prayer, date(2026, 1, 1), prayer_values={"fajr": True, "isha": False, "asr": None})
+
+        with self.assertNumQueries(1):
+            data = get_tracking_data(self.user, date(2025, 12, 1), date(2026, 1, 31), self.trackers)
+
+        self.assertEqual(len(data), 62)
+        self.assertEqual(list(data)[0], "2025-12-01")
+        self.assertEqual(data["2025-12-01"], {"Steps": 16.0})
+        self.assertEqual(list(data["2026-01-01"].items()), [
+            ("Prayer", {"fajr": True, "isha": False}),
+            ("Steps", 47.0),
+        ])
+
+    def test_skips_empty_values_but_keeps_zero(self):
+        day = date(2026, 2, 1)
+        self._log(self.steps, day, number_value=0)
+        self._log(self.prayer, day, prayer_values={"fajr": None})
+
+        self.assertEqual(get_tracking_data(self.user, day, day, self.trackers), {"2026-02-01": {"Steps": 0.0}})
+
+
+@override_settings(OPENAI_API_KEY="test-key")
+class InsightJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.client.force_login(self.user)
+        self.tracker = Tracker.objects.create(user=self.user, name="Mood", tracker_type="rating")
+        entry = Entry(tracker=self.tracker, rating_value=4)
+        save_entry(self.user, entry, date.today())
+
+    def _generate(self, **data):
+        data = {"report_type": "weekly", **data}
+        return self.client.post(reverse("insights:generate"), data, content_type="application/json")
+
+    def _work(self, **options):
+        call_command("run_insight_worker", once=True, retry_delay=0, stdout=StringIO(), **options)
+
+    def _openai_returns(self, mock_openai, *results):
+        mock_openai.return_value.chat.completions.create.side_effect = [
+            result if isinstance(result, Exception)
+            else SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=result))])
+            for result in results
+        ]
+
+    def test_generate_queues_a_job_without_calling_openai(self):
+        with patch("apps.insights.services.OpenAI") as mock_openai:
+            response = self._generate()
+
+        self.assertEqual(response.status_code, 202)
+        job = InsightJob.objects.get()
+        self.assertEqual(response.json()["job_id"], job.id)
+        self.assertEqual(response.json()["status"], "queued")
+        self.assertEqual(response.json()["status_url"], reverse("insights:job", args=[job.id]))
+        mock_openai.assert_not_called()
+
+    def test_repeated_clicks_reuse_the_active_job(self):
+        first = self._generate().json()
+        second = self._generate().json()
+
+        self.assertEqual(first["job_id"], second["job_id"])
+        self.assertEqual(InsightJob.objects.count(), 1)
+
+    def test_concurrent_enqueues_share_one_job(self):
+        period = ("weekly", date(2026, 2, 1), date(2026, 2, 8))
+        job, _ = enqueue_insight_job(self.user, *period)
+
+        # The other request checked before this job existed
+        with patch.object(QuerySet, "first", side_effect=[None, job]):
+            again, created = enqueue_insight_job(self.user, *period)
+
+        self.assertEqual((again.id, created), (job.id, False))
+        self.assertEqual(InsightJob.objects.count(), 1)
+
+    def test_no_tracking_data_is_rejected_immediately(self):
+        Entry.objects.all().delete()
+
+        self.assertEqual(self._generate().status_code, 400)
+        self.assertFalse(InsightJob.objects.exists())
+
+    @patch("apps.insights.services.OpenAI")
+    def test_worker_generates_the_insight(self, mock_openai):
+        self._openai_returns(mock_openai, '{"summary": "Good week"}')
+        job_id = self._generate().json()["job_id"]
+
+        self._work()
+
+        data = self.client.get(reverse("insights:job", args=[job_id])).json()
+        self.assertEqual(data["status"], "succeeded")
+        self.assertEqual(data["attempts"], 1)
+        self.assertEqual(data["insight"]["content"], {"summary": "Good week"})
+        self.assertEqual(Insight.objects.get().content, {"summary": "Good week"})
+
+    @patch("apps.insights.services.OpenAI")
+    def test_worker_retries_then_succeeds(self, mock_openai):
+        self._openai_returns(mock_openai, RuntimeError("timeout"), "not-json", '{"summary": "ok"}')
+        job_id = self._generate().json()["job_id"]
+
+        self._work(max_attempts=3)
+
+        job = InsightJob.objects.get(id=job_id)
+        self.assertEqual((job.status, job.attempts), ("succeeded", 3))
+
+    @patch("apps.insights.services.OpenAI")
+    def test_worker_gives_up_after_max_attempts_with_fallback_content(self, mock_openai):
+        self._openai_returns(mock_openai, RuntimeError("timeout"), RuntimeError("timeout"))
+        job_id = self._generate().json()["job_id"]
+
+        self._work(max_attempts=2)
+
+        job = InsightJob.objects.get(id=job_id)
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+        self.assertEqual(job.insight.content["summary"], "Unable to generate insights at this time.")
+
+    def test_backoff_and_expired_leases(self):
+        job, _ = enqueue_insight_job(self.user, "weekly", date(2026, 2, 1), date(2026, 2, 8))
+
+        self.assertEqual(claim_jobs(5), [job])
+        self.assertEqual(claim_jobs(5), [])
+
+        InsightJob.objects.filter(id=job.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        reclaimed = claim_jobs(5)
+        self.assertEqual([(j.id, j.attempts) for j in reclaimed], [(job.id, 2)])
+
+        InsightJob.objects.filter(id=job.id).update(
+            status="queued", run_after=timezone.now() + timedelta(minutes=1)
+        )
+        self.assertEqual(claim_jobs(5), [])
+
+    def test_jobs_of_other_users_are_hidden(self):
+        other = User.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        job, _ = enqueue_insight_job(other, "weekly", date(2026, 2, 1), date(2026, 2, 8))
+
+        self.assertEqual(self.client.get(reverse("insights:job", args=[job.id])).status_code, 404)
+
+    @patch("apps.insights.services.OpenAI")
+    def test_unchanged_inputs_return_the_saved_insight(self, mock_openai):
+        self._openai_returns(mock_openai, '{"summary": "Good week"}')
+        self._generate()
+        self._work()
+
+        response = self._generate()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["cached"])
+        self.assertEqual(response.json()["insight"]["content"], {"summary": "Good week"})
+        self.assertEqual(InsightJob.objects.count(), 1)
+        self.assertEqual(mock_openai.return_value.chat.completions.create.call_count, 1)
+
+    @patch("apps.insights.services.OpenAI")
+    def test_changed_inputs_or_force_generate_again(self, mock_openai):
+        self._openai_returns(mock_openai, '{"summary": "one"}', '{"summary": "two"}', '{"summary": "three"}')
+        self._generate()
+        self._work()
+
+        save_entry(self.user, Entry(tracker=self.tracker, rating_value=2), date.today() - timedelta(days=1))
+        self.assertEqual(self._generate().status_code, 202)
+        self._work()
+        self.assertEqual(self._generate(force=True).status_code, 202)
+        self._work()
+
+        self.assertEqual(Insight.objects.get().content, {"summary": "three"})
+        self.assertEqual(mock_openai.return_value.chat.completions.create.call_count, 3)
+
+    @patch("apps.insights.services.OpenAI")
+    def test_content_cache_outlives_the_insight(self, mock_openai):
+        self._openai_returns(mock_openai, '{"summary": "Good week"}')
+        self._generate()
+        self._work()
+        insight = Insight.objects.get()
+        Insight.objects.all().delete()
+
+        response = self._generate()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["insight"]["content"], {"summary": "Good week"})
+        self.assertEqual(Insight.objects.get().input_hash, insight.input_hash)
+
+    @patch("apps.insights.services.OpenAI")
+    def test_worker_reuses_an_insight_with_the_same_inputs(self, mock_openai):
+        self._openai_returns(mock_openai, '{"summary": "Good week"}')
+        first = self._generate().json()["job_id"]
+        self._work()
+        # Queued before the first job finished
+        job, _ = enqueue_insight_job(self.user, "weekly", *InsightJob.objects.values_list(
+            "period_start", "period_end").get(id=first))
+
+        self._work()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.insight.content, {"summary": "Good week"})
+        self.assertEqual(mock_openai.return_value.chat.completions.create.call_count, 1)
+
+
+@override_settings(OPENAI_API_KEY="test-key")
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.client.force_login(self.user)
+        mood = Tracker.objects.create(user=self.user, name="Mood", tracker_type="rating")
+        steps = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+        for offset in range(7):
+            day = date.today() - timedelta(days=offset)
+            save_entry(self.user, Entry(tracker=mood, rating_value=3), day)
+            save_entry(self.user, Entry(tracker=steps, number_value=1000), day)
+        for offset in range(5):
+            end = date(2026, 1, 31) - timedelta(days=7 * offset)
+            Insight.objects.create(
+                owner=self.user, report_type="weekly",
+                period_start=end - timedelta(days=7), period_end=end, content={"summary": "ok"},
+            )
+
+    def _generate(self):
+        return self.client.post(reverse("insights:generate"), {"report_type": "weekly"}, content_type="application/json")
+
+    def test_endpoints_stay_within_budget(self):
+        with self.assertWithinQueryBudget("insights:list"):
+            response = self.client.get(reverse("insights:list"), {"report_type": "weekly"})
+        self.assertEqual(len(response.json()["insights"]), 5)
+
+        with self.assertWithinQueryBudget("insights:generate"):
+            job_id = self._generate().json()["job_id"]
+
+        with self.assertWithinQueryBudget("insights:job"):
+            response = self.client.get(reverse("insights:job", args=[job_id]))
+        self.assertEqual(response.status_code, 200)
+
+    @patch("apps.insights.services.OpenAI")
+    def test_cached_generate_stays_within_budget(self, mock_openai):
+        mock_openai.return_value.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content='{"summary": "Good week"}'))]
+        )
+        self._generate()
+        call_command("run_insight_worker", once=True, stdout=StringIO())
+
+        with self.assertWithinQueryBudget("insights:generate"):
+            response = self._generate()
+        self.assertEqual(response.status_code, 200)
@@ -1,11 +1,12 @@
 # insights/urls.py
 
 from django.urls import path
-from .views import InsightListView, GenerateInsightView
+from .views import InsightListView, GenerateInsightView, InsightJobView
 
 app_name = 'insights'
 
 urlpatterns = [
     path('', InsightListView.as_view(), name='list'),
     path('generate/', GenerateInsightView.as_view(), name='generate'),
+    path('jobs/<int:pk>/', InsightJobView.as_view(), name='job'),
 ]
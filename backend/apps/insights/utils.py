@@ -1,6 +1,7 @@
 from datetime import date, timedelta
 from rest_framework.exceptions import ValidationError
-from apps.tracker.models import DailySnapshot, Entry
+from apps.tracker.models import Entry
+from apps.tracker.services import VALUE_FIELD_BY_TYPE
 
 def get_report_type(value):
     if value not in {"daily", "weekly", "monthly"}:
@@ -15,41 +16,51 @@ def get_period(report_type):
         return today - timedelta(days=7), today
     return today - timedelta(days=30), today
 
-def get_entry_value(entry):
-    t = entry.tracker.tracker_type
-    if t == "binary":
-        return entry.binary_value
-    if t == "number":
-        return float(entry.number_value) if entry.number_value else None
-    if t == "rating":
-        return entry.rating_value
-    if t == "duration":
-        return entry.duration_minutes
-    if t == "time":
-        return entry.time_value.isoformat() if entry.time_value else None
-    if t == "text":
-        return entry.text_value
-    return None
+def format_entry_value(tracker_type, value):
+    """
+    The JSON-friendly value sent to the model for one entry column.
 
-def get_tracking_data(user, period_start, period_end, trackers):
-    snapshots = DailySnapshot.objects.filter(user=user, date__range=(period_start, period_end))
-    data = {}
+    Returns:
+        None when nothing was recorded
+    """
+    if value is None:
+        return None
+    if tracker_type == "number":
+        return float(value)
+    if tracker_type == "time":
+        return value.isoformat()
+    if tracker_type == "text":
+        return value or None
+    if tracker_type == "prayer":
+        # Only the prayers marked done or missed
+        prayers = {name: done for name, done in value.items() if done is not None}
+        return prayers or None
+    return value
 
-    for snapshot in snapshots:
-        day_key = snapshot.date.isoformat()
-        day_entries = {}
+def get_tracking_data(user, period_start, period_end, trackers):
+    """
+    Values of the given trackers for any date range, in one query.
 
-        entries = (Entry.objects
-            .filter(daily_snapshot=snapshot, tracker__in=trackers)
-            .select_related("tracker")
-        )
+    Reads the denormalized user/date columns of Entry (one index range
+    scan) and only the columns needed, then groups by day in Python.
 
-        for entry in entries:
-            value = get_entry_value(entry)
-            if value is not None:
-                day_entries[entry.tracker.name] = value
+    Returns:
+        dict: {"YYYY-MM-DD": {tracker name: value}}, days in order and
+        trackers in display order
+    """
+    rows = (Entry.objects
+        .filter(user=user, date__range=(period_start, period_end), tracker__in=trackers)
+        .order_by("date", "tracker__display_order", "tracker__created_at")
+        .values_list("date", "tracker__name", "tracker__tracker_type", *VALUE_FIELD_BY_TYPE.values())
+    )
+    columns = {field: i for i, field in enumerate(VALUE_FIELD_BY_TYPE.values(), start=3)}
+    data = {}
 
-        if day_entries:
-            data[day_key] = day_entries
+    for row in rows:
+        day, name, tracker_type = row[:3]
+        field = VALUE_FIELD_BY_TYPE.get(tracker_type)
+        value = format_entry_value(tracker_type, row[columns[field]]) if field else None
+        if value is not None:
+            data.setdefault(day.isoformat(), {})[name] = value
 
     return data
@@ -1,19 +1,25 @@
 import logging
 
 from django.db.models import QuerySet
+from django.urls import reverse
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.tracker.models import Tracker
-from .models import Insight
-from .serializers import InsightSerializer
+from .jobs import enqueue_insight_job, find_cached_insight
+from .models import Insight, InsightJob
+from .serializers import InsightSerializer, InsightJobSerializer
+from .services import insight_input_hash
 from .utils import get_report_type, get_period, get_tracking_data
-from .services import generate_insight_content
 
 logger = logging.getLogger(__name__)
 
 
+def is_truthy(value):
+    return value is True or str(value).lower() in {"1", "true", "yes"}
+
+
 class InsightListView(generics.ListAPIView):
     '''
     get a list of saved insights
@@ -37,46 +43,59 @@ class InsightListView(generics.ListAPIView):
 
 class GenerateInsightView(generics.GenericAPIView):
     '''
-    generates or updates one insight for a period
+    queues the generation of one insight for a period; poll the returned
+    job (or its status_url) until it succeeds or fails. An insight already
+    generated from the same data is returned right away (200, cached)
+    unless force=true is sent
     '''
     permission_classes = [IsAuthenticated]
-    serializer_class = InsightSerializer
+    serializer_class = InsightJobSerializer
 
     def post(self, request):
         try:
             report_type = get_report_type(request.data.get("report_type"))
-            print("report type: ", report_type)
             period_start, period_end = get_period(report_type)
-            print("period: ", period_start, period_end)
             trackers = Tracker.objects.filter(user=request.user, is_active=True)
             tracking_data = get_tracking_data(request.user, period_start, period_end, trackers)
-            print("tracking_data: ", tracking_data)
             if not tracking_data:
                 return Response(
                     {"error": "No tracking data found. Start logging some entries first!"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            
-            content = generate_insight_content(
-                tracking_data,
-                report_type,
-                period_start,
-                period_end,
-                trackers,
-            )
 
-            insight, created = Insight.objects.update_or_create(
-                owner=request.user,
-                report_type=report_type,
-                period_start=period_start,
-                period_end=period_end,
-                defaults={"content": content},
-            )
+            force = is_truthy(request.data.get("force", request.GET.get("force")))
+            if not force:
+                input_hash = insight_input_hash(
+                    tracking_data, report_type, period_start, period_end, trackers
+                )
+                insight = find_cached_insight(
+                    request.user, report_type, period_start, period_end, input_hash
+                )
+                if insight is not None:
+                    return Response({
+                        "status": InsightJob.STATUS_SUCCEEDED,
+                        "insight": InsightSerializer(insight).data,
+                        "cached": True,
+                    })
 
-            return Response(
-                self.get_serializer(insight).data,
-                status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+            job, _ = enqueue_insight_job(
+                request.user, report_type, period_start, period_end, force=force
             )
+            data = self.get_serializer(job).data
+            data["job_id"] = job.id
+            data["status_url"] = reverse("insights:job", args=[job.id])
+            return Response(data, status=status.HTTP_202_ACCEPTED)
         except Exception:
             logger.exception("POST /api/v1/insights/generate/ failed")
             raise
+
+
+class InsightJobView(generics.RetrieveAPIView):
+    '''
+    status of a queued insight generation, with the insight once done
+    '''
+    permission_classes = [IsAuthenticated]
+    serializer_class = InsightJobSerializer
+
+    def get_queryset(self) -> QuerySet[InsightJob]:  # type: ignore[override]
+        return InsightJob.objects.filter(owner=self.request.user).select_related("insight")
@@ -9,6 +9,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.contrib.auth import get_user_model
+from config.timing import timing_phase
 from .models import Subscription
 from stripe import SignatureVerificationError
 
@@ -39,19 +40,20 @@ class CreateCheckoutSessionView(LoginRequiredMixin, View):
     def post(self, request, *args, **kwargs):
         price_id = request.POST.get('priceId')
         
-        session = stripe.checkout.Session.create(
-            customer_email=request.user.email,
-            success_url=request.build_absolute_uri('/payments/success/') + '?session_id={CHECKOUT_SESSION_ID}',
-            cancel_url=request.build_absolute_uri('/payments/upgrade/'),
-            mode='subscription',
-            line_items=[{
-                'price': price_id,
-                'quantity': 1,
-            }],
-            metadata={
-                'user_id': request.user.id,
-            },
-        )
+        with timing_phase('external'):
+            session = stripe.checkout.Session.create(
+                customer_email=request.user.email,
+                success_url=request.build_absolute_uri('/payments/success/') + '?session_id={CHECKOUT_SESSION_ID}',
+                cancel_url=request.build_absolute_uri('/payments/upgrade/'),
+                mode='subscription',
+                line_items=[{
+                    'price': price_id,
+                    'quantity': 1,
+                }],
+                metadata={
+                    'user_id': request.user.id,
+                },
+            )
         
         if not session.url:
             raise ValueError("Stripe didn't return a checkout URL")
@@ -148,9 +150,10 @@ class BillingPortalView(LoginRequiredMixin, View):
         if not subscription.stripe_customer_id:
             return redirect('payments:upgrade')
 
-        session = stripe.billing_portal.Session.create(
-            customer=subscription.stripe_customer_id,
-            return_url=request.build_absolute_uri('/settings/'),
-        )
+        with timing_phase('external'):
+            session = stripe.billing_portal.Session.create(
+                customer=subscription.stripe_customer_id,
+                return_url=request.build_absolute_uri('/settings/'),
+            )
 
         return redirect(session.url, code=303)
\ No newline at end of file
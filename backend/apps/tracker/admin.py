@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Profile, Tracker, DailySnapshot, Entry
+from .models import Profile, Tracker, DailySnapshot, Entry, Tombstone, TrackerRollup, TrackerStreak
 
 
 @admin.register(Profile)
@@ -25,6 +25,26 @@ class DailySnapshotAdmin(admin.ModelAdmin):
 
 @admin.register(Entry)
 class EntryAdmin(admin.ModelAdmin):
-    list_display = ('tracker', 'daily_snapshot', 'updated_at')
+    list_display = ('tracker', 'date', 'updated_at')
     list_filter = ('tracker__tracker_type',)
     search_fields = ('tracker__name',)
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'user', 'deleted_at')
+    list_filter = ('kind',)
+    search_fields = ('user__email',)
+
+
+@admin.register(TrackerRollup)
+class TrackerRollupAdmin(admin.ModelAdmin):
+    list_display = ('tracker', 'granularity', 'period_start', 'entry_count', 'value_sum')
+    list_filter = ('granularity',)
+    search_fields = ('tracker__name',)
+
+
+@admin.register(TrackerStreak)
+class TrackerStreakAdmin(admin.ModelAdmin):
+    list_display = ('tracker', 'run_start', 'run_end', 'longest_start', 'longest_end')
+    search_fields = ('tracker__name',)
@@ -0,0 +1,202 @@
+# tracker/benchmarks.py
+import gc
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.insights.services import build_prompt
+from apps.insights.utils import get_tracking_data
+from .cache import invalidate_month_cache
+from .models import Tracker, Entry
+
+User = get_user_model()
+
+# Sizes of the generate_dataset databases benchmarks run against
+BENCHMARK_DATASETS = {
+    'small': {'users': 1, 'trackers': 12, 'years': 0.25},
+    'medium': {'users': 3, 'trackers': 24, 'years': 2},
+    'large': {'users': 5, 'trackers': 48, 'years': 5},
+}
+
+BENCHMARK_START = date(2024, 1, 1)
+
+# Username prefix of the generated benchmark users
+BENCHMARK_PREFIX = 'bench'
+
+
+class BenchmarkContext:
+    """The first generated user of a dataset, logged in, with the dates cases work on."""
+
+    def __init__(self, num_days):
+        self.user = User.objects.get(username=f'{BENCHMARK_PREFIX}1')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.trackers = Tracker.objects.filter(user=self.user, is_active=True)
+        self.last_day = BENCHMARK_START + timedelta(days=num_days - 1)
+        self.month = (self.last_day.year, self.last_day.month)
+
+
+def benchmark_cases(ctx):
+    """
+    Hot paths measured against a dataset.
+
+    Returns:
+        list: (name, setup, run) tuples; setup runs untimed before every run
+    """
+    month_url = reverse('tracker:month_view', args=ctx.month)
+    month_start = ctx.last_day - timedelta(days=30)
+    year_start = max(BENCHMARK_START, ctx.last_day - timedelta(days=364))
+    month_data = get_tracking_data(ctx.user, month_start, ctx.last_day, ctx.trackers)
+    number_tracker = ctx.trackers.filter(tracker_type='number').first()
+    writes = _entry_writes(number_tracker, ctx.last_day)
+
+    def cold_month():
+        # Same invalidation an entry write does
+        invalidate_month_cache(ctx.user.id, *ctx.month)
+
+    def get(url):
+        def run():
+            response = ctx.client.get(url)
+            assert response.status_code == 200, response.status_code
+        return run
+
+    def create_entry():
+        response = ctx.client.post(
+            reverse('tracker:entry_create'), next(writes), content_type='application/json'
+        )
+        assert response.status_code == 200, response.status_code
+
+    return [
+        ('month_view_cold', cold_month, get(month_url)),
+        ('month_view_warm', None, get(month_url)),
+        ('month_view_stats', cold_month, get(f'{month_url}?stats=1')),
+        ('tracker_list', None, get(reverse('tracker:tracker_list'))),
+        ('entry_create', None, create_entry),
+        ('tracking_data_month', None,
+            lambda: get_tracking_data(ctx.user, month_start, ctx.last_day, ctx.trackers)),
+        ('tracking_data_year', None,
+            lambda: get_tracking_data(ctx.user, year_start, ctx.last_day, ctx.trackers)),
+        ('build_prompt_month', None,
+            lambda: build_prompt(month_data, 'monthly', month_start, ctx.last_day, ctx.trackers)),
+    ]
+
+
+def measure(run, setup=None, rounds=10, warmup=1):
+    """
+    Time a callable, then run it once more to count queries and peak memory.
+
+    Timed rounds run without tracing so tracemalloc and query capture
+    don't inflate the wall times.
+
+    Returns:
+        dict: wall time stats in ms, query count and peak traced KiB
+    """
+    times = []
+    for i in range(warmup + rounds):
+        if setup:
+            setup()
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        if i >= warmup:
+            times.append((time.perf_counter() - started) * 1000)
+
+    if setup:
+        setup()
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'rounds': rounds,
+        'min_ms': round(min(times), 3),
+        'median_ms': round(statistics.median(times), 3),
+        'mean_ms': round(statistics.fmean(times), 3),
+        'max_ms': round(max(times), 3),
+        'queries': len(queries),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(datasets, rounds=10, warmup=1, seed=0, cases=None, on_result=None):
+    """
+    Generate each dataset into the current database and measure every case.
+
+    Args:
+        datasets: dict of name -> generate_dataset options (users, trackers, years)
+        cases: optional case names to run; all cases when None
+        on_result: optional callback(result) for progress output
+
+    Returns:
+        list: one result dict per (dataset, case)
+    """
+    results = []
+    for dataset, size in datasets.items():
+        started = time.perf_counter()
+        call_command(
+            'generate_dataset', prefix=BENCHMARK_PREFIX, seed=seed,
+            start=BENCHMARK_START.isoformat(), stdout=StringIO(), **size
+        )
+        generated_s = time.perf_counter() - started
+
+        ctx = BenchmarkContext(round(size['years'] * 365.25))
+        entries = Entry.objects.filter(user__username__startswith=BENCHMARK_PREFIX).count()
+        for name, setup, run in benchmark_cases(ctx):
+            if cases and name not in cases:
+                continue
+            result = {
+                'dataset': dataset,
+                **size,
+                'entries': entries,
+                'generate_s': round(generated_s, 2),
+                'case': name,
+                **measure(run, setup, rounds, warmup),
+            }
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+def compare_results(baseline, current):
+    """
+    Median wall time and query count changes between two result lists.
+
+    Returns:
+        list: dicts with dataset, case, both medians, the ratio and query delta
+    """
+    before = {(r['dataset'], r['case']): r for r in baseline}
+    changes = []
+    for result in current:
+        old = before.get((result['dataset'], result['case']))
+        if old is None:
+            continue
+        changes.append({
+            'dataset': result['dataset'],
+            'case': result['case'],
+            'before_ms': old['median_ms'],
+            'after_ms': result['median_ms'],
+            'ratio': round(result['median_ms'] / old['median_ms'], 3) if old['median_ms'] else None,
+            'queries': result['queries'] - old['queries'],
+        })
+    return changes
+
+
+def _entry_writes(tracker, last_day):
+    """Endless create payloads overwriting the last 28 days of a tracker."""
+    i = 0
+    while True:
+        day = last_day - timedelta(days=i % 28)
+        yield {'tracker_id': tracker.id, 'date': day.isoformat(), 'number_value': str(i % 500)}
+        i += 1
@@ -1,28 +1,182 @@
 # tracker/cache.py
+import time
 
-from django.core.cache import cache
+from django.core.cache import cache as default_cache
+from config.metrics import REGISTRY
+from config.timing import TimedCache
+
+# Calls count towards the Server-Timing cache phase
+cache = TimedCache(default_cache)
 
 MONTH_VIEW_TIMEOUT = 300  # 5 minutes
 
+# Month view representations that are cached side by side
+MONTH_VIEW_LAYOUTS = ('grid', 'columnar')
+MONTH_VIEW_VARIANTS = tuple(
+    f'{layout}{suffix}' for layout in MONTH_VIEW_LAYOUTS for suffix in ('', '_stats')
+)
+
+MONTH_CACHE_HITS_KEY = 'month_view_cache_hits'
+MONTH_CACHE_MISSES_KEY = 'month_view_cache_misses'
+
+
+def get_generation_key(user_id):
+    """Cache key holding a user's tracker cache generation."""
+    return f'tracker_cache_gen_{user_id}'
+
+
+def get_month_version_key(user_id, year, month):
+    """Cache key holding the version of a user's month data."""
+    return f'month_version_{user_id}_{year}_{month}'
+
+
+def get_streak_version_key(user_id):
+    """Cache key holding the version of a user's streak state."""
+    return f'streak_version_{user_id}'
+
+
+def get_user_cache_generation(user_id):
+    """Current generation of a user's tracker-related cache keys."""
+    return _get_version(get_generation_key(user_id))
+
+
+def bump_user_cache_generation(user_id):
+    """Invalidate every tracker-related cache entry of a user in one increment."""
+    _bump_version(get_generation_key(user_id))
+
+
+def get_month_version(user_id, year, month):
+    """Current version of a user's entries for one month."""
+    return _get_version(get_month_version_key(user_id, year, month))
+
+
+def get_streak_version(user_id):
+    """Current version of a user's streak state."""
+    return _get_version(get_streak_version_key(user_id))
+
+
+def bump_streak_version(user_id):
+    """
+    Mark a user's streaks as changed.
+
+    Streaks span months and aren't part of any cached body, so only the
+    validators of responses that carry them depend on this version.
+    """
+    _bump_version(get_streak_version_key(user_id))
+
 
-def get_month_cache_key(user_id, year, month):
+def get_month_etag(user_id, year, month, variant, today, generation=None, version=None):
+    """
+    Strong validator for a month view response.
+
+    Pass the generation and version used for the cached body so both
+    come from the same read.
+    """
+    if generation is None:
+        generation = get_user_cache_generation(user_id)
+    if version is None:
+        version = get_month_version(user_id, year, month)
+    streaks = get_streak_version(user_id)
+    return f'"month-{user_id}-{generation}-{version}-{streaks}-{variant}-{today.isoformat()}"'
+
+
+def get_tracker_list_etag(user_id, today):
+    """Strong validator for a tracker list response."""
+    generation = get_user_cache_generation(user_id)
+    streaks = get_streak_version(user_id)
+    return f'"trackers-{user_id}-{generation}-{streaks}-{today.isoformat()}"'
+
+
+def get_month_cache_key(user_id, year, month, generation=None, variant='grid', version=None):
     """Generate a cache key for a user's month view."""
-    return f'month_view_{user_id}_{year}_{month}'
+    if generation is None:
+        generation = get_user_cache_generation(user_id)
+    if version is None:
+        version = get_month_version(user_id, year, month)
+    return f'month_view_{user_id}_v{generation}_{year}_{month}_m{version}_{variant}'
 
 
-def get_cached_month_view(user_id, year, month):
+def get_cached_month_view(user_id, year, month, generation=None, variant='grid', version=None):
     """Get cached month view data, returns None if not cached."""
-    key = get_month_cache_key(user_id, year, month)
-    return cache.get(key)
+    key = get_month_cache_key(user_id, year, month, generation, variant, version)
+    data = cache.get(key)
+    _incr_counter(MONTH_CACHE_HITS_KEY if data is not None else MONTH_CACHE_MISSES_KEY)
+    return data
 
 
-def set_month_view_cache(user_id, year, month, data):
-    """Cache month view data."""
-    key = get_month_cache_key(user_id, year, month)
+def set_month_view_cache(user_id, year, month, data, generation=None, variant='grid', version=None):
+    """
+    Cache month view data.
+
+    Pass the generation and month version read before building ``data``
+    so a concurrent tracker or entry change can't get stale data stored
+    under the new key; it lands on a key nothing reads any more.
+    """
+    key = get_month_cache_key(user_id, year, month, generation, variant, version)
     cache.set(key, data, MONTH_VIEW_TIMEOUT)
 
 
 def invalidate_month_cache(user_id, year, month):
-    """Clear cached month view when data changes."""
-    key = get_month_cache_key(user_id, year, month)
-    cache.delete(key)
\ No newline at end of file
+    """Clear cached month view (every variant) when data changes."""
+    generation = get_user_cache_generation(user_id)
+    version = get_month_version(user_id, year, month)
+    _bump_version(get_month_version_key(user_id, year, month))
+    # The bump already orphans these keys; deleting them frees the memory
+    cache.delete_many([
+        get_month_cache_key(user_id, year, month, generation, variant, version)
+        for variant in MONTH_VIEW_VARIANTS
+    ])
+
+
+def get_month_cache_stats():
+    """Return hit/miss counters for the month view cache."""
+    hits = cache.get(MONTH_CACHE_HITS_KEY, 0)
+    misses = cache.get(MONTH_CACHE_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else None,
+    }
+
+
+def _month_cache_samples():
+    stats = get_month_cache_stats()
+    return [({'result': 'hit'}, stats['hits']), ({'result': 'miss'}, stats['misses'])]
+
+
+REGISTRY.collector(
+    'tracked_month_cache_requests_total', 'counter', 'Month view cache lookups by result.', _month_cache_samples
+)
+
+
+def _get_version(key):
+    """
+    Read a never-expiring version counter.
+
+    A missing counter is seeded from the clock rather than 1, so an evicted
+    counter never comes back to a version whose keys may still be cached.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    """Atomically increment a version counter, seeding it if missing."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), None)
+
+
+def _incr_counter(key):
+    """Atomically increment a never-expiring counter."""
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); start over
+        cache.set(key, 1, None)
@@ -0,0 +1,183 @@
+# tracker/datagen.py
+from datetime import time
+from decimal import Decimal
+
+DEMO_TRACKERS = [
+    # Sleep cluster
+    {'name': 'Sleep Time', 'tracker_type': 'time'},
+    {'name': 'Wake Up', 'tracker_type': 'time'},
+    {'name': 'Sleep Duration', 'tracker_type': 'duration', 'unit': 'min'},
+    # Wellness
+    {'name': 'Mood', 'tracker_type': 'rating', 'min_value': 1, 'max_value': 10},
+    {'name': 'Exercise', 'tracker_type': 'binary'},
+    {'name': 'Steps', 'tracker_type': 'number', 'unit': 'steps'},
+    {'name': 'Water', 'tracker_type': 'number', 'unit': 'glasses'},
+    {'name': 'Screen Time', 'tracker_type': 'duration', 'unit': 'min'},
+    # Productivity
+    {'name': 'Planned Day', 'tracker_type': 'binary'},
+    {'name': 'Deep Work', 'tracker_type': 'duration', 'unit': 'min'},
+    {'name': 'Tasks Done', 'tracker_type': 'number', 'unit': '%'},
+    # Reflection
+    {'name': 'Notes', 'tracker_type': 'text'},
+]
+
+NOTES_POOL = [
+    'Good productive day, felt focused.',
+    'Tired today, didn\'t sleep well last night.',
+    'Crushed my morning routine!',
+    'Lazy day, needed the rest though.',
+    'Had a great workout, energy was high.',
+    'Stressful day at work, need to decompress.',
+    'Felt creative and motivated.',
+    'Struggled to focus, too much screen time.',
+    'Went for a long walk, cleared my head.',
+    'Solid day overall, steady progress.',
+    'Woke up late, threw off the whole day.',
+    'Best day this week, everything clicked.',
+    'Felt anxious, journaling helped.',
+    'Meal prepped and planned the week ahead.',
+    'Low energy but still got the basics done.',
+    'Social day - good for morale.',
+    'Deep work session was incredibly productive.',
+    'Need to cut back on phone usage.',
+    'Meditated for 10 min, felt calmer.',
+    'Pushed through resistance, glad I did.',
+    '',  # Some days no notes
+    '',
+    '',
+    '',
+    '',
+]
+
+# Simulate a realistic pattern within every month:
+# - Week 1: settling in, moderate habits
+# - Week 2: building momentum, improving
+# - Week 3: peak performance
+# - Week 4: slight dip, recovery
+# This creates interesting trends for the AI to analyze
+WEEK_QUALITY = {0: 0.5, 1: 0.7, 2: 0.9, 3: 0.65}
+
+
+def tracker_definitions(count):
+    """
+    Tracker fields for `count` trackers, repeating the demo set with a
+    numbered name ("Mood 2") once it runs out.
+    """
+    definitions = []
+    for i in range(count):
+        base = DEMO_TRACKERS[i % len(DEMO_TRACKERS)]
+        copy = i // len(DEMO_TRACKERS)
+        name = base['name'] if copy == 0 else f"{base['name']} {copy + 1}"
+        definitions.append({**base, 'name': name, 'display_order': i + 1})
+    return definitions
+
+
+def day_quality(rng, date_obj):
+    """Quality factor (0.2-1.0) of a day: the week trend plus daily variance."""
+    week_quality = WEEK_QUALITY.get((date_obj.day - 1) // 7, 0.7)
+    daily_variance = rng.uniform(-0.15, 0.15)
+    return max(0.2, min(1.0, week_quality + daily_variance))
+
+
+def day_values(rng, date_obj, quality):
+    """
+    Generate one day of realistic, correlated values for the demo trackers.
+
+    Args:
+        rng: random.Random (or the random module) to draw from
+        date_obj: the day, for weekday effects
+        quality: the day's quality factor from day_quality()
+
+    Returns:
+        dict: demo tracker name -> Entry value fields; days without a
+              Deep Work session or a note leave those trackers out
+    """
+    is_weekend = date_obj.weekday() >= 5
+    values = {}
+
+    # --- Sleep Time ---
+    # Better quality = earlier sleep (22:00-23:00), worse = later (23:30-01:00)
+    sleep_hour = int(22 + (1 - quality) * 3)
+    sleep_min = rng.choice([0, 15, 30, 45])
+    if sleep_hour >= 24:
+        sleep_hour -= 24
+    values['Sleep Time'] = {'time_value': time(sleep_hour, sleep_min)}
+
+    # --- Wake Up Time ---
+    # Better quality = earlier wake (6:00-6:30), worse = later (7:30-8:30)
+    # Weekends: +1 hour
+    wake_base = 6.0 + (1 - quality) * 2.5
+    if is_weekend:
+        wake_base += 1.0
+    wake_min = rng.choice([0, 15, 30, 45])
+    values['Wake Up'] = {'time_value': time(int(wake_base), wake_min)}
+
+    # --- Sleep Duration ---
+    # Target 7-8h on good days, 5-6h on bad days
+    sleep_duration = int((6 + quality * 2.5) * 60 + rng.randint(-30, 30))
+    sleep_duration = max(300, min(600, sleep_duration))  # 5h-10h range
+    values['Sleep Duration'] = {'duration_minutes': sleep_duration}
+
+    # --- Mood ---
+    # Correlated with quality + sleep
+    mood_base = 3 + quality * 6 + rng.uniform(-1, 1)
+    values['Mood'] = {'rating_value': max(1, min(10, round(mood_base)))}
+
+    # --- Exercise ---
+    # Higher quality = more likely to exercise. Weekends slightly less.
+    exercise_chance = quality * 0.8 if not is_weekend else quality * 0.5
+    did_exercise = rng.random() < exercise_chance
+    values['Exercise'] = {'binary_value': did_exercise}
+
+    # --- Steps ---
+    # Exercise days: 7000-12000, non-exercise: 2000-6000
+    if did_exercise:
+        steps = rng.randint(7000, 12000)
+    else:
+        steps = rng.randint(2000, 6000)
+    values['Steps'] = {'number_value': Decimal(steps)}
+
+    # --- Water ---
+    # Good days: 6-10 glasses, bad days: 3-5
+    water = int(4 + quality * 6 + rng.uniform(-1, 1))
+    values['Water'] = {'number_value': Decimal(max(2, min(12, water)))}
+
+    # --- Screen Time ---
+    # Inversely correlated with quality. Weekends higher.
+    screen_base = (1 - quality) * 300 + 60
+    if is_weekend:
+        screen_base += 60
+    screen_time = int(screen_base + rng.randint(-30, 30))
+    values['Screen Time'] = {'duration_minutes': max(30, min(480, screen_time))}
+
+    # --- Planned Day ---
+    # Weekdays more likely, higher quality more likely
+    plan_chance = quality * 0.9 if not is_weekend else quality * 0.3
+    did_plan = rng.random() < plan_chance
+    values['Planned Day'] = {'binary_value': did_plan}
+
+    # --- Deep Work ---
+    # Only on weekdays mostly. Correlated with planning and quality.
+    if is_weekend:
+        deep_work = rng.randint(0, 60) if rng.random() < 0.3 else 0
+    else:
+        deep_base = quality * 180 + (30 if did_plan else 0)
+        deep_work = int(deep_base + rng.randint(-30, 30))
+        deep_work = max(0, min(300, deep_work))
+    if deep_work > 0:
+        values['Deep Work'] = {'duration_minutes': deep_work}
+
+    # --- Tasks Done % ---
+    # Correlated with planning + deep work + quality
+    tasks_base = quality * 70 + (10 if did_plan else 0) + rng.uniform(-10, 10)
+    if is_weekend:
+        tasks_base *= 0.6
+    values['Tasks Done'] = {'number_value': Decimal(max(0, min(100, round(tasks_base))))}
+
+    # --- Notes ---
+    # Not every day has notes (roughly 80% of days)
+    note = rng.choice(NOTES_POOL)
+    if note:
+        values['Notes'] = {'text_value': note}
+
+    return values
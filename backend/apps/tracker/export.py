@@ -0,0 +1,132 @@
+# tracker/export.py
+import csv
+import json
+from itertools import groupby
+from operator import itemgetter
+from .models import Tracker, Entry
+from .services import VALUE_FIELD_BY_TYPE, encode_field_value
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Entries fetched per round trip while streaming
+EXPORT_CHUNK_SIZE = 2000
+
+_VALUE_FIELDS = list(VALUE_FIELD_BY_TYPE.values())
+
+
+def cell_value(tracker_type, value):
+    """
+    JSON-compatible export value of one cell, in the shape the entry APIs
+    accept back (times as HH:MM, decimals as strings).
+    """
+    if value is None:
+        return None
+    if tracker_type == 'time':
+        return value.strftime('%H:%M')
+    return encode_field_value(VALUE_FIELD_BY_TYPE[tracker_type], value)
+
+
+def csv_cell(value):
+    """Spreadsheet text of an exported cell value."""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for streaming csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class EntryExporter:
+    """
+    Service for streaming a user's tracking history as one row per day and
+    one column per tracker (the spreadsheet layout of the month grid).
+
+    Entries are read with a server-side iterator in date order and pivoted
+    one day at a time, so memory doesn't grow with the length of the history.
+    """
+
+    def __init__(self, user, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+        self.user = user
+        self.start = start
+        self.end = end
+        self.chunk_size = chunk_size
+        self.trackers = list(
+            Tracker.objects.filter(user=user).order_by('display_order', 'id')
+        )
+        self.labels = _column_labels(self.trackers)
+
+    def iter_days(self):
+        """
+        Yields:
+            tuple: (date, {tracker_id: cell value}) for days with entries
+        """
+        types = {tracker.id: tracker.tracker_type for tracker in self.trackers}
+        field_index = {field: i for i, field in enumerate(_VALUE_FIELDS, start=2)}
+
+        # Only the trackers whose columns were written in the header, even if
+        # one is created while the export streams
+        entries = Entry.objects.filter(user=self.user, tracker_id__in=types)
+        if self.start:
+            entries = entries.filter(date__gte=self.start)
+        if self.end:
+            entries = entries.filter(date__lte=self.end)
+        rows = (entries
+            .order_by('date', 'tracker_id')
+            .values_list('date', 'tracker_id', *_VALUE_FIELDS)
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+        for day, day_rows in groupby(rows, key=itemgetter(0)):
+            cells = {}
+            for row in day_rows:
+                tracker_type = types[row[1]]
+                field = VALUE_FIELD_BY_TYPE.get(tracker_type)
+                if field is not None:
+                    cells[row[1]] = cell_value(tracker_type, row[field_index[field]])
+            yield day, cells
+
+    def iter_csv(self):
+        """Yields CSV lines: a header, then one line per day."""
+        writer = csv.writer(_Echo())
+        yield writer.writerow(['date'] + self.labels)
+        for day, cells in self.iter_days():
+            yield writer.writerow(
+                [day.isoformat()] + [csv_cell(cells.get(tracker.id)) for tracker in self.trackers]
+            )
+
+    def iter_ndjson(self):
+        """Yields one JSON object per day, holding only the filled cells."""
+        labels = {tracker.id: label for tracker, label in zip(self.trackers, self.labels)}
+        for day, cells in self.iter_days():
+            row = {'date': day.isoformat()}
+            for tracker_id, value in cells.items():
+                if value is not None:
+                    row[labels[tracker_id]] = value
+            yield json.dumps(row) + '\n'
+
+    def stream(self, export_format):
+        if export_format == 'ndjson':
+            return self.iter_ndjson()
+        return self.iter_csv()
+
+
+def _column_labels(trackers):
+    """Tracker names as column headers; repeated names get their id appended."""
+    counts = {}
+    for tracker in trackers:
+        counts[tracker.name] = counts.get(tracker.name, 0) + 1
+    return [
+        tracker.name if counts[tracker.name] == 1 else f'{tracker.name} ({tracker.id})'
+        for tracker in trackers
+    ]
@@ -0,0 +1,309 @@
+# tracker/importer.py
+import csv
+import io
+import json
+import re
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.db.models import Max
+from openpyxl import load_workbook
+from .models import Tracker
+from .rollups import rebuild_rollups
+from .services import EntryBatchUpserter
+from .streaks import rebuild_streak
+
+IMPORT_FORMATS = ('csv', 'xlsx')
+
+# Cells written per EntryBatchUpserter call
+IMPORT_BATCH_SIZE = 5000
+
+# Errors kept in the report; the total is always counted
+IMPORT_MAX_ERRORS = 1000
+
+TRUE_WORDS = {'true', 'yes', 'y', '1', 'x', 'done'}
+FALSE_WORDS = {'false', 'no', 'n', '0'}
+
+# "Sleep [duration]" declares the type of a tracker the import creates
+_TYPED_HEADER = re.compile(r'^(?P<name>.*?)\s*\[(?P<type>\w+)\]$')
+# "Gym (12)" is how exports disambiguate trackers sharing a name
+_ID_HEADER = re.compile(r'^(?P<name>.*?)\s*\((?P<id>\d+)\)$')
+_TIME_TEXT = re.compile(r'^\d{1,2}:\d{2}(:\d{2})?$')
+
+
+def import_format(filename):
+    """Import format of an uploaded file from its extension, or None."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def infer_tracker_type(cell):
+    """Guess the tracker type of a new column from its first filled cell."""
+    if isinstance(cell, bool):
+        return 'binary'
+    if isinstance(cell, (time, datetime)):
+        return 'time'
+    if isinstance(cell, (int, float, Decimal)):
+        return 'number'
+    text = str(cell).strip()
+    if text.lower() in (TRUE_WORDS | FALSE_WORDS) - {'0', '1'}:
+        return 'binary'
+    if _TIME_TEXT.match(text):
+        return 'time'
+    if text.startswith('{'):
+        return 'prayer'
+    try:
+        Decimal(text)
+        return 'number'
+    except InvalidOperation:
+        return 'text'
+
+
+def parse_cell(tracker_type, cell):
+    """
+    Convert a spreadsheet cell into entry data for Entry.set_value_from_data.
+
+    Raises:
+        ValueError: if the cell doesn't fit the tracker type
+    """
+    text = cell.strip() if isinstance(cell, str) else cell
+
+    if tracker_type == 'binary':
+        if isinstance(text, bool):
+            return {'binary_value': text}
+        lowered = str(text).strip().lower()
+        if lowered in TRUE_WORDS:
+            return {'binary_value': True}
+        if lowered in FALSE_WORDS:
+            return {'binary_value': False}
+        raise ValueError(f'Invalid yes/no value: {cell}')
+
+    if tracker_type == 'number':
+        try:
+            number = Decimal(str(text))
+        except InvalidOperation:
+            raise ValueError(f'Invalid number: {cell}')
+        return {'number_value': str(number)}
+
+    if tracker_type == 'time':
+        if isinstance(text, (time, datetime)):
+            return {'time_value': text.strftime('%H:%M')}
+        if not _TIME_TEXT.match(str(text)):
+            raise ValueError(f'Invalid time: {cell}')
+        return {'time_value': ':'.join(str(text).split(':')[:2])}
+
+    if tracker_type in ('duration', 'rating'):
+        try:
+            whole = int(Decimal(str(text)))
+        except (InvalidOperation, ValueError):
+            raise ValueError(f'Invalid whole number: {cell}')
+        field = 'duration_minutes' if tracker_type == 'duration' else 'rating_value'
+        return {field: whole}
+
+    if tracker_type == 'prayer':
+        if isinstance(text, str):
+            try:
+                text = json.loads(text)
+            except ValueError:
+                raise ValueError(f'Invalid prayer values: {cell}')
+        return {'prayer_values': text}
+
+    return {'text_value': str(text)}
+
+
+def parse_row_date(cell):
+    """Date of a row: a YYYY-MM-DD string or a spreadsheet date."""
+    if isinstance(cell, datetime):
+        return cell.date()
+    if isinstance(cell, date):
+        return cell
+    try:
+        return datetime.strptime(str(cell).strip(), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('Invalid date format. Use YYYY-MM-DD.')
+
+
+class _Column:
+    def __init__(self, label, tracker=None, declared_type=None, name=None):
+        self.label = label
+        self.tracker = tracker
+        self.declared_type = declared_type
+        self.name = name or label
+
+
+class EntryImporter:
+    """
+    Service for importing a spreadsheet in the export layout: a 'date'
+    column followed by one column per tracker, one row per day.
+
+    Rows are parsed as a stream and written through EntryBatchUpserter in
+    batches, so every cell goes through the same validation and upserts as
+    the batch endpoint. Rollups and streaks of the imported trackers are
+    rebuilt once at the end instead of per batch. Columns are
+    matched to trackers by name; unknown columns create a tracker whose
+    type comes from a "Name [type]" header or the first filled cell.
+    Empty cells are skipped, never deleted.
+    """
+
+    def __init__(self, user, batch_size=IMPORT_BATCH_SIZE, max_errors=IMPORT_MAX_ERRORS, on_progress=None):
+        self.user = user
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.on_progress = on_progress
+        self.rows = 0
+        self.cells = 0
+        self.error_count = 0
+        self.errors = []
+        self.created_trackers = []
+        self.touched_months = set()
+        self.touched_trackers = {}
+
+    def import_file(self, file, file_format):
+        """
+        Import an uploaded (binary) file.
+
+        Raises:
+            ValueError: for unreadable files or a missing optional dependency
+        """
+        if file_format == 'xlsx':
+            return self.import_rows(self._xlsx_rows(file))
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        try:
+            return self.import_rows(csv.reader(text))
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ValueError(f'Unreadable CSV file: {e}')
+        finally:
+            text.detach()
+
+    def import_rows(self, rows):
+        """
+        Import an iterable of rows whose first row is the header.
+
+        Returns:
+            dict: report with row, cell and error counts
+        """
+        rows = iter(rows)
+        try:
+            header = next(rows)
+        except StopIteration:
+            raise ValueError('The file is empty')
+        if not header or str(header[0] or '').strip().lower() != 'date':
+            raise ValueError("The first column must be 'date'")
+
+        with transaction.atomic():
+            columns = self._map_columns(header[1:])
+            pending, refs = [], []
+            for row_number, row in enumerate(rows, start=2):
+                if not any(cell not in (None, '') for cell in row):
+                    continue
+                self.rows += 1
+                self._read_row(row_number, row, columns, pending, refs)
+                if len(pending) >= self.batch_size:
+                    self._flush(pending, refs)
+                    pending, refs = [], []
+            self._flush(pending, refs)
+
+            trackers = list(self.touched_trackers.values())
+            rebuild_rollups(trackers)
+            for tracker in trackers:
+                rebuild_streak(tracker)
+
+        return self.report()
+
+    def report(self):
+        return {
+            'rows': self.rows,
+            'cells': self.cells,
+            'created_trackers': [tracker.name for tracker in self.created_trackers],
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+    def _read_row(self, row_number, row, columns, pending, refs):
+        try:
+            date_obj = parse_row_date(row[0])
+        except ValueError as e:
+            self._error(row_number, 'date', str(e))
+            return
+
+        for column, cell in zip(columns, row[1:]):
+            if cell is None or (isinstance(cell, str) and not cell.strip()):
+                continue
+            try:
+                tracker = column.tracker or self._create_tracker(column, cell)
+                values = parse_cell(tracker.tracker_type, cell)
+            except ValueError as e:
+                self._error(row_number, column.label, str(e))
+                continue
+            self.touched_trackers[tracker.id] = tracker
+            pending.append({'tracker_id': tracker.id, 'date': date_obj, **values})
+            refs.append((row_number, column.label))
+
+    def _flush(self, pending, refs):
+        if not pending:
+            return
+        results, touched_months = EntryBatchUpserter(self.user, pending, refresh=False).apply()
+        self.touched_months |= touched_months
+        for result, (row_number, label) in zip(results, refs):
+            if result['success']:
+                self.cells += 1
+            else:
+                self._error(row_number, label, result['error'])
+        if self.on_progress:
+            self.on_progress(self.rows, self.cells)
+
+    def _map_columns(self, labels):
+        trackers = list(Tracker.objects.filter(user=self.user).order_by('display_order', 'id'))
+        by_id = {tracker.id: tracker for tracker in trackers}
+        by_name = {}
+        for tracker in trackers:
+            by_name.setdefault(tracker.name.lower(), tracker)
+
+        columns = []
+        for label in labels:
+            label = str(label or '').strip()
+            typed = _TYPED_HEADER.match(label)
+            if typed:
+                declared_type = typed.group('type').lower()
+                if declared_type not in dict(Tracker.TYPE_CHOICES):
+                    raise ValueError(f'Unknown tracker type in column "{label}"')
+                name = typed.group('name')
+                columns.append(_Column(label, by_name.get(name.lower()), declared_type, name))
+                continue
+
+            by_export_id = _ID_HEADER.match(label)
+            if by_export_id and int(by_export_id.group('id')) in by_id:
+                columns.append(_Column(label, by_id[int(by_export_id.group('id'))]))
+                continue
+
+            if not label:
+                raise ValueError('Every column needs a header')
+            columns.append(_Column(label, by_name.get(label.lower())))
+        return columns
+
+    def _create_tracker(self, column, cell):
+        """Create the tracker of an unmatched column on its first filled cell."""
+        last_order = Tracker.objects.filter(user=self.user).aggregate(Max('display_order'))['display_order__max']
+        column.tracker = Tracker.objects.create(
+            user=self.user,
+            name=column.name[:100],
+            tracker_type=column.declared_type or infer_tracker_type(cell),
+            display_order=(last_order or 0) + 1,
+        )
+        self.created_trackers.append(column.tracker)
+        return column.tracker
+
+    def _error(self, row_number, column, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_number, 'column': column, 'error': message})
+
+    def _xlsx_rows(self, file):
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except Exception as e:
+            raise ValueError(f'Unreadable XLSX file: {e}')
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
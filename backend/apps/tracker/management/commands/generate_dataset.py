@@ -0,0 +1,126 @@
+"""
+Management command to generate a large synthetic dataset for benchmarking.
+
+Usage:
+    python manage.py generate_dataset --users 100 --trackers 20 --years 3
+    python manage.py generate_dataset --users 10 --seed 42 --start 2023-01-01
+
+Creates:
+    - N users (dataset1@example.com, ... / dataset1234)
+    - M trackers per user, repeating the demo set ("Mood 2") past 12
+    - Y years of daily data from the create_demo_user correlated model
+
+The same seed always produces the same data, whatever the batch size.
+Existing users with the same username prefix are replaced.
+"""
+
+import random
+import re
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.tracker.datagen import DEMO_TRACKERS, day_quality, day_values, tracker_definitions
+from apps.tracker.models import Tracker, DailySnapshot, Entry
+from apps.tracker.rollups import rebuild_rollups
+from apps.tracker.streaks import rebuild_streak
+
+User = get_user_model()
+
+DATASET_PASSWORD = 'dataset1234'
+
+
+class Command(BaseCommand):
+    help = 'Generate users with years of realistic tracking data using bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1)
+        parser.add_argument('--trackers', type=int, default=len(DEMO_TRACKERS))
+        parser.add_argument('--years', type=float, default=1, help='May be fractional, e.g. 0.25')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--start', default='2024-01-01', help='First day, YYYY-MM-DD')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert')
+        parser.add_argument('--prefix', default='dataset', help='Username prefix of the generated users')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start'])
+        except ValueError:
+            raise CommandError('Invalid --start date. Use YYYY-MM-DD.')
+        num_days = round(options['years'] * 365.25)
+        if options['users'] < 1 or options['trackers'] < 1 or num_days < 1:
+            raise CommandError('--users, --trackers and --years must be positive')
+
+        prefix = options['prefix']
+        existing = User.objects.filter(username__regex=rf'^{re.escape(prefix)}\d+$')
+        deleted = existing.delete()[1].get(User._meta.label, 0)
+        if deleted:
+            self.stdout.write(f'Removed {deleted} existing {prefix} users')
+
+        days = [start + timedelta(days=i) for i in range(num_days)]
+        definitions = tracker_definitions(options['trackers'])
+        password = make_password(DATASET_PASSWORD)
+
+        total = 0
+        for number in range(1, options['users'] + 1):
+            # One generator per user keeps each user's data independent of the others
+            rng = random.Random(f"{options['seed']}:{number}")
+            with transaction.atomic():
+                user = User.objects.create(
+                    username=f'{prefix}{number}',
+                    email=f'{prefix}{number}@example.com',
+                    password=password,
+                )
+                entries = self.generate_user_data(user, definitions, days, rng, options['batch_size'])
+            total += entries
+            self.stdout.write(f'{user.email}: {entries} entries ({total} total)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\nDone! {options['users']} users x {len(definitions)} trackers x {num_days} days, "
+            f'{total} entries. Login with {prefix}1@example.com / {DATASET_PASSWORD}'
+        ))
+
+    def generate_user_data(self, user, definitions, days, rng, batch_size):
+        """
+        Bulk insert a user's trackers, snapshots and entries, then build
+        their rollups and streaks.
+
+        Returns:
+            int: Number of entries created
+        """
+        trackers = Tracker.objects.bulk_create(
+            [Tracker(user=user, **definition) for definition in definitions]
+        )
+        snapshots = DailySnapshot.objects.bulk_create(
+            [DailySnapshot(user=user, date=day) for day in days],
+            batch_size=batch_size,
+        )
+
+        # Copies of a demo tracker draw their own day of values
+        rounds = -(-len(trackers) // len(DEMO_TRACKERS))
+        pending = []
+        created = 0
+        for snapshot in snapshots:
+            quality = day_quality(rng, snapshot.date)
+            for copy in range(rounds):
+                values = day_values(rng, snapshot.date, quality)
+                for i, base in enumerate(DEMO_TRACKERS):
+                    index = copy * len(DEMO_TRACKERS) + i
+                    if index < len(trackers) and base['name'] in values:
+                        pending.append(Entry(
+                            tracker=trackers[index],
+                            daily_snapshot=snapshot,
+                            user=user,
+                            date=snapshot.date,
+                            **values[base['name']]
+                        ))
+            if len(pending) >= batch_size:
+                created += len(Entry.objects.bulk_create(pending, batch_size=batch_size))
+                pending = []
+        created += len(Entry.objects.bulk_create(pending, batch_size=batch_size))
+
+        rebuild_rollups(trackers, batch_size=batch_size)
+        for tracker in trackers:
+            rebuild_streak(tracker)
+        return created
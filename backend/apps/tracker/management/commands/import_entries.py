@@ -0,0 +1,60 @@
+"""
+Management command to import a spreadsheet of entries for a user.
+
+Usage:
+    python manage.py import_entries history.csv --user demo@example.com
+    python manage.py import_entries history.xlsx --user demo@example.com --batch-size 10000
+
+The file uses the export layout: a 'date' column, then one column per
+tracker. See apps.tracker.importer for the accepted cell formats.
+"""
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from apps.tracker.cache import bump_user_cache_generation, bump_streak_version
+from apps.tracker.importer import EntryImporter, IMPORT_BATCH_SIZE, import_format
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import a CSV or XLSX spreadsheet of entries for a user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='.csv or .xlsx file')
+        parser.add_argument('--user', required=True, help='Email of the user to import for')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} not found")
+
+        file_format = import_format(options['path'])
+        if file_format is None:
+            raise CommandError('Only .csv and .xlsx files can be imported')
+
+        def on_progress(rows, cells):
+            self.stdout.write(f'  {rows} rows, {cells} cells written')
+
+        started = time.perf_counter()
+        importer = EntryImporter(user, batch_size=options['batch_size'], on_progress=on_progress)
+        try:
+            with open(options['path'], 'rb') as file:
+                report = importer.import_file(file, file_format)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        bump_user_cache_generation(user.id)
+        bump_streak_version(user.id)
+
+        for error in report['errors']:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}, {error['column']}: {error['error']}"))
+        if report['created_trackers']:
+            self.stdout.write(f"Created trackers: {', '.join(report['created_trackers'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['cells']} cells from {report['rows']} rows "
+            f"with {report['error_count']} errors in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,61 @@
+"""
+Management command to list and summarize captured request profiles.
+
+Usage:
+    python manage.py list_profiles
+    python manage.py list_profiles --view tracker.month_view --slowest
+    python manage.py list_profiles 20261018T061927-1532ms-GET-tracker.month_view-3fa2c1.prof
+    python manage.py list_profiles <file> --sort tottime --limit 40
+
+Profiles are written by config.profiling.ProfilingMiddleware to PROFILE_DIR.
+"""
+
+import os
+import pstats
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from config.profiling import list_profiles
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class Command(BaseCommand):
+    help = 'List captured request profiles, or summarize one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', nargs='?', help='Profile to summarize instead of listing')
+        parser.add_argument('--view', help='Only list profiles of this view, e.g. tracker.month_view')
+        parser.add_argument('--slowest', action='store_true', help='List the slowest first')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='cumulative')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--dir', default=None, help='Defaults to PROFILE_DIR')
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.PROFILE_DIR
+        if options['file']:
+            self.summarize(os.path.join(directory, options['file']), options['sort'], options['limit'])
+            return
+
+        profiles = list_profiles(directory)
+        if options['view']:
+            profiles = [info for info in profiles if info['view'] == options['view']]
+        if options['slowest']:
+            profiles.sort(key=lambda info: info['duration_ms'], reverse=True)
+        if not profiles:
+            self.stdout.write(f'No profiles in {directory}')
+            return
+
+        self.stdout.write(f"{'captured (UTC)':<20} {'duration':>9}  {'request':<40} file")
+        for info in profiles[:options['limit']]:
+            request = f"{info['method']} {info['view']}"
+            self.stdout.write(
+                f"{info['when']:%Y-%m-%d %H:%M:%S}  {info['duration_ms']:>6} ms  {request:<40} {info['file']}"
+            )
+        self.stdout.write(f"\n{len(profiles)} profiles in {directory}")
+
+    def summarize(self, path, sort, limit):
+        try:
+            stats = pstats.Stats(path, stream=self.stdout)
+        except (OSError, TypeError, ValueError) as e:
+            raise CommandError(f"Can't read {path}: {e}")
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
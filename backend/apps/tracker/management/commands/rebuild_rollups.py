@@ -0,0 +1,37 @@
+"""
+Management command to rebuild tracker rollups from raw entries.
+
+Usage:
+    python manage.py rebuild_rollups
+    python manage.py rebuild_rollups --user demo@example.com
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from apps.tracker.models import Tracker
+from apps.tracker.rollups import rebuild_rollups
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild week and month rollups of every tracker from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild trackers of the user with this email')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        trackers = Tracker.objects.all()
+        if options['user']:
+            try:
+                user = User.objects.get(email=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']} not found")
+            trackers = trackers.filter(user=user)
+
+        total = 0
+        for tracker in trackers.iterator():
+            total += rebuild_rollups([tracker], batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} rollups'))
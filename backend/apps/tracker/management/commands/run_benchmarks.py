@@ -0,0 +1,114 @@
+"""
+Management command to benchmark the tracker and insights hot paths.
+
+Usage:
+    python manage.py run_benchmarks
+    python manage.py run_benchmarks --datasets small medium large --rounds 20
+    python manage.py run_benchmarks --output after.json --compare before.json
+
+Every dataset is built with generate_dataset in a throwaway test database
+with a local-memory cache, so the configured database and cache are never
+touched. Results (wall time, query count, peak traced memory per case) are
+written as JSON so runs on different commits can be diffed with --compare.
+"""
+
+import json
+import platform
+import subprocess
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from apps.tracker.benchmarks import BENCHMARK_DATASETS, compare_results, run_benchmarks
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tracked-benchmarks',
+    }
+}
+
+# Median slowdown reported as a regression by --compare
+REGRESSION_RATIO = 1.1
+
+
+class Command(BaseCommand):
+    help = 'Benchmark month view, entry writes, tracker list and insight data against generated datasets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--datasets', nargs='+', choices=list(BENCHMARK_DATASETS), default=['small', 'medium'])
+        parser.add_argument('--cases', nargs='+', help='Only run these cases, e.g. month_view_cold')
+        parser.add_argument('--rounds', type=int, default=10)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark-results.json', help='JSON file to write')
+        parser.add_argument('--compare', help='Earlier results JSON to compare against')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as file:
+                    baseline = json.load(file)['results']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Can't read {options['compare']}: {e}")
+
+        datasets = {name: BENCHMARK_DATASETS[name] for name in options['datasets']}
+        self.stdout.write(f"{'dataset':<8} {'case':<22} {'median':>10} {'queries':>8} {'peak':>12}")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                results = run_benchmarks(
+                    datasets,
+                    rounds=options['rounds'],
+                    warmup=options['warmup'],
+                    seed=options['seed'],
+                    cases=options['cases'],
+                    on_result=self.write_result,
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'commit': _git_commit(),
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'results': results,
+        }
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"\nWrote {len(results)} results to {options['output']}"))
+
+        if baseline is not None:
+            self.write_comparison(compare_results(baseline, results))
+
+    def write_result(self, result):
+        self.stdout.write(
+            f"{result['dataset']:<8} {result['case']:<22} {result['median_ms']:>7.2f} ms "
+            f"{result['queries']:>8} {result['peak_kib']:>8.1f} KiB"
+        )
+
+    def write_comparison(self, changes):
+        self.stdout.write(f"\n{'dataset':<8} {'case':<22} {'before':>10} {'after':>10} {'ratio':>7} {'queries':>8}")
+        for change in changes:
+            line = (
+                f"{change['dataset']:<8} {change['case']:<22} {change['before_ms']:>7.2f} ms "
+                f"{change['after_ms']:>7.2f} ms {change['ratio'] or 0:>7.2f} {change['queries']:>+8}"
+            )
+            regressed = (change['ratio'] or 0) > REGRESSION_RATIO or change['queries'] > 0
+            self.stdout.write(self.style.WARNING(line) if regressed else line)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 05:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0009_delta_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackerRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('entry_count', models.IntegerField(default=0)),
+                ('value_count', models.IntegerField(default=0, help_text='Entries with a numeric value')),
+                ('value_sum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('value_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('value_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('completed_count', models.IntegerField(default=0, help_text='Binary yes answers or prayers prayed')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tracker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tracker.tracker')),
+            ],
+            options={
+                'ordering': ['period_start'],
+                'unique_together': {('tracker', 'granularity', 'period_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.10 on 2026-10-18 05:56
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of apps.tracker.streaks as of this migration
+STREAK_TRACKER_TYPES = ('binary', 'prayer')
+
+PRAYER_NAMES = ['fajr', 'dhuhr', 'asr', 'maghrib', 'isha']
+
+
+def completion_filter(tracker_type):
+    if tracker_type == 'binary':
+        return models.Q(binary_value=True)
+    return models.Q(**{f'prayer_values__{name}': True for name in PRAYER_NAMES})
+
+
+def find_runs(dates):
+    """(latest, longest) runs of consecutive days in ascending distinct dates."""
+    latest = longest = None
+    for day in dates:
+        if latest is not None and day == latest[1] + timedelta(days=1):
+            latest = (latest[0], day)
+        else:
+            latest = (day, day)
+        if longest is None or (latest[1] - latest[0]) > (longest[1] - longest[0]):
+            longest = latest
+    return latest, longest
+
+
+def backfill_streaks(apps, schema_editor):
+    Tracker = apps.get_model('tracker', 'Tracker')
+    Entry = apps.get_model('tracker', 'Entry')
+    TrackerStreak = apps.get_model('tracker', 'TrackerStreak')
+
+    streaks = []
+    for tracker in Tracker.objects.filter(tracker_type__in=STREAK_TRACKER_TYPES).iterator():
+        dates = (Entry.objects
+            .filter(completion_filter(tracker.tracker_type), tracker=tracker)
+            .order_by('daily_snapshot__date')
+            .values_list('daily_snapshot__date', flat=True)
+            .iterator()
+        )
+        latest, longest = find_runs(dates)
+        if latest is None:
+            continue
+        streaks.append(TrackerStreak(
+            tracker=tracker,
+            run_start=latest[0], run_end=latest[1],
+            longest_start=longest[0], longest_end=longest[1],
+        ))
+        if len(streaks) >= 1000:
+            TrackerStreak.objects.bulk_create(streaks)
+            streaks = []
+    TrackerStreak.objects.bulk_create(streaks)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_tracker_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackerStreak',
+            fields=[
+                ('tracker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='streak', serialize=False, to='tracker.tracker')),
+                ('run_start', models.DateField(blank=True, null=True)),
+                ('run_end', models.DateField(blank=True, null=True)),
+                ('longest_start', models.DateField(blank=True, null=True)),
+                ('longest_end', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def backfill_entry_user_date(apps, schema_editor):
+    """Copy user and date from each entry's snapshot, one id range per statement."""
+    Entry = apps.get_model('tracker', 'Entry')
+    DailySnapshot = apps.get_model('tracker', 'DailySnapshot')
+
+    snapshot = DailySnapshot.objects.filter(pk=OuterRef('daily_snapshot_id'))
+    pending = Entry.objects.filter(date__isnull=True)
+    last_id = pending.order_by('-pk').values_list('pk', flat=True).first()
+    if last_id is None:
+        return
+
+    start = pending.order_by('pk').values_list('pk', flat=True).first()
+    while start <= last_id:
+        pending.filter(pk__gte=start, pk__lt=start + BATCH_SIZE).update(
+            user_id=Subquery(snapshot.values('user_id')[:1]),
+            date=Subquery(snapshot.values('date')[:1]),
+        )
+        start += BATCH_SIZE
+
+
+class Migration(migrations.Migration):
+
+    # Each batch commits on its own, so large tables aren't locked for the
+    # whole backfill
+    atomic = False
+
+    dependencies = [
+        ('tracker', '0012_entry_user_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_entry_user_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-18 07:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_entry_user_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='entry',
+            name='tracker_ent_tracker_a97fa3_idx',
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='tracker_ent_user_id_30473d_idx'),
+        ),
+    ]
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Frozen copies of apps.tracker.rollups as of this migration
+GRANULARITIES = ('week', 'month')
+
+VALUE_COLUMNS = {'number': 'number_value', 'rating': 'rating_value', 'duration': 'duration_minutes'}
+
+
+def period_start(granularity, date_obj):
+    if granularity == 'week':
+        return date_obj - timedelta(days=date_obj.weekday())
+    return date_obj.replace(day=1)
+
+
+def entry_measure(tracker_type, row):
+    """(numeric value or None, completed count) of one entry row."""
+    if tracker_type == 'binary':
+        if row['binary_value'] is None:
+            return None, 0
+        return Decimal(int(row['binary_value'])), int(row['binary_value'])
+    if tracker_type == 'prayer':
+        if not isinstance(row['prayer_values'], dict):
+            return None, 0
+        prayed = sum(1 for done in row['prayer_values'].values() if done is True)
+        return Decimal(prayed), prayed
+    if tracker_type == 'time':
+        if row['time_value'] is None:
+            return None, 0
+        return Decimal(row['time_value'].hour * 60 + row['time_value'].minute), 0
+    column = VALUE_COLUMNS.get(tracker_type)
+    if column is None or row[column] is None:
+        return None, 0
+    return Decimal(row[column]), 0
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Rebuild every rollup from raw entries; 0010 created the table empty.
+    Rows stream in (tracker, date) order so only one week and one month
+    per tracker are open at a time.
+    """
+    Entry = apps.get_model('tracker', 'Entry')
+    TrackerRollup = apps.get_model('tracker', 'TrackerRollup')
+
+    TrackerRollup.objects.all().delete()
+    rows = (Entry.objects
+        .order_by('tracker_id', 'date')
+        .values(
+            'tracker_id', 'date', 'tracker__tracker_type', 'binary_value', 'number_value',
+            'time_value', 'duration_minutes', 'rating_value', 'prayer_values',
+        )
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+
+    pending = []
+    open_periods = {}
+
+    def close(key):
+        totals = open_periods.pop(key)
+        pending.append(TrackerRollup(
+            tracker_id=key[0], granularity=key[1], period_start=key[2], **totals
+        ))
+
+    for row in rows:
+        value, completed = entry_measure(row['tracker__tracker_type'], row)
+        for granularity in GRANULARITIES:
+            key = (row['tracker_id'], granularity, period_start(granularity, row['date']))
+            if key not in open_periods:
+                for open_key in [k for k in open_periods if k[1] == granularity]:
+                    close(open_key)
+                open_periods[key] = {
+                    'entry_count': 0, 'value_count': 0, 'value_sum': Decimal(0),
+                    'value_min': None, 'value_max': None, 'completed_count': 0,
+                }
+            totals = open_periods[key]
+            totals['entry_count'] += 1
+            totals['completed_count'] += completed
+            if value is not None:
+                totals['value_count'] += 1
+                totals['value_sum'] += value
+                totals['value_min'] = value if totals['value_min'] is None else min(totals['value_min'], value)
+                totals['value_max'] = value if totals['value_max'] is None else max(totals['value_max'], value)
+
+        if len(pending) >= BATCH_SIZE:
+            TrackerRollup.objects.bulk_create(pending)
+            pending = []
+
+    for key in list(open_periods):
+        close(key)
+    TrackerRollup.objects.bulk_create(pending)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0015_entry_sync_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,15 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from datetime import datetime
 
 User = get_user_model()
 
+PRAYER_NAMES = ['fajr', 'dhuhr', 'asr', 'maghrib', 'isha']
+
+# Largest magnitude Entry.number_value can store (max_digits=10, 2 places)
+NUMBER_VALUE_LIMIT = Decimal('1e8')
+
 class Profile(models.Model):
     """
     Extra information about the user that django's user model doesn't have.
@@ -39,6 +44,7 @@ class Tracker(models.Model):
     display_order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Rating-specific fields
     min_value = models.IntegerField(null=True, blank=True, help_text="Minimum rating value (e.g., 1)")
@@ -46,6 +52,9 @@ class Tracker(models.Model):
     
     class Meta:
         ordering = ['display_order', 'created_at']
+        indexes = [
+            models.Index(fields=['user', 'updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.user.email})"
@@ -67,6 +76,30 @@ class DailySnapshot(models.Model):
         return f"{self.user.email} - {self.date}"
 
 
+class Tombstone(models.Model):
+    """
+    Records a deleted Tracker or Entry so sync clients can drop it.
+    Deleting a tracker only records the tracker; its entries are implied.
+    """
+    KIND_CHOICES = [
+        ('tracker', 'Tracker'),
+        ('entry', 'Entry'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted at {self.deleted_at}"
+
+
 class Entry(models.Model):
     """
     The ACTUAL DATA. This is the value in a cell of your Excel sheet.
@@ -75,6 +108,10 @@ class Entry(models.Model):
     tracker = models.ForeignKey(Tracker, on_delete=models.CASCADE)
     daily_snapshot = models.ForeignKey(DailySnapshot, on_delete=models.CASCADE)
 
+    # Copies of daily_snapshot.user/date so range reads skip the snapshot join
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    date = models.DateField()
+
     # Entry type
     binary_value = models.BooleanField(null=True, blank=True)
     number_value = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
@@ -91,10 +128,21 @@ class Entry(models.Model):
         unique_together = ['tracker', 'daily_snapshot']
         indexes = [
             models.Index(fields=['daily_snapshot', 'tracker']),
+            # Month/range reads: single-table scans by user and date
+            models.Index(fields=['user', 'date', 'tracker']),
+            # Delta sync: one range scan of the user's changes, in cursor order
+            models.Index(fields=['user', 'updated_at', 'id']),
         ]
     
     def __str__(self):
-        return f"{self.tracker.name} - {self.daily_snapshot.date}"
+        return f"{self.tracker.name} - {self.date}"
+
+    def save(self, *args, **kwargs):
+        # Keep the denormalized columns in step with the snapshot
+        if self.daily_snapshot_id is not None:
+            self.user_id = self.daily_snapshot.user_id
+            self.date = self.daily_snapshot.date
+        super().save(*args, **kwargs)
 
     def get_duration_display(self):
         """Format duration as '4h 30min' or '5h' or '45min'"""
@@ -143,10 +191,10 @@ class Entry(models.Model):
         tracker = self.tracker
         
         if tracker.tracker_type == 'binary':
-            self.binary_value = data.get('binary_value')
+            self._set_binary_value(data)
         
         elif tracker.tracker_type == 'number':
-            self.number_value = Decimal(str(data.get('number_value')))
+            self._set_number_value(data)
         
         elif tracker.tracker_type == 'time':
             self.time_value = datetime.strptime(data.get('time_value'), '%H:%M').time()
@@ -164,6 +212,25 @@ class Entry(models.Model):
         elif tracker.tracker_type == 'prayer':
             self._set_prayer_values(data)
     
+    def _set_binary_value(self, data):
+        """Set and validate binary value"""
+        value = data.get('binary_value')
+        if value is not None and not isinstance(value, bool):
+            raise ValueError('Binary value must be true or false')
+        self.binary_value = value
+
+    def _set_number_value(self, data):
+        """Set and validate number value against the column's range"""
+        raw = data.get('number_value')
+        try:
+            number = Decimal(str(raw))
+        except InvalidOperation:
+            raise ValueError(f'Invalid number: {raw}')
+        # Anything that rounds to 2 places at or past the limit overflows the column
+        if not number.is_finite() or abs(number) >= NUMBER_VALUE_LIMIT - Decimal('0.005'):
+            raise ValueError(f'Number out of range: {raw}')
+        self.number_value = number
+
     def _set_rating_value(self, data):
         """Set and validate rating value"""
         rating_val = data.get('rating_value')
@@ -197,9 +264,8 @@ class Entry(models.Model):
         if not isinstance(values, dict):
             raise ValueError('Invalid prayer values')
 
-        prayer_keys = ['fajr', 'dhuhr', 'asr', 'maghrib', 'isha']
         normalized = {}
-        for key in prayer_keys:
+        for key in PRAYER_NAMES:
             raw = values.get(key, None)
             if raw is True or raw is False or raw is None:
                 normalized[key] = raw
@@ -217,3 +283,57 @@ class Entry(models.Model):
                 raise ValueError('Invalid prayer values')
 
         self.prayer_values = normalized
+
+
+class TrackerRollup(models.Model):
+    """
+    Pre-aggregated entry statistics of ONE tracker over ONE week or month.
+    Kept in sync with Entry writes (see apps.tracker.rollups) so range
+    statistics don't have to re-scan raw entries.
+    """
+    GRANULARITY_CHOICES = [
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+
+    tracker = models.ForeignKey(Tracker, on_delete=models.CASCADE)
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    period_start = models.DateField()
+
+    entry_count = models.IntegerField(default=0)
+    value_count = models.IntegerField(default=0, help_text="Entries with a numeric value")
+    value_sum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    value_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    value_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    completed_count = models.IntegerField(default=0, help_text="Binary yes answers or prayers prayed")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['tracker', 'granularity', 'period_start']
+        ordering = ['period_start']
+
+    def __str__(self):
+        return f"{self.tracker.name} - {self.granularity} of {self.period_start}"
+
+
+class TrackerStreak(models.Model):
+    """
+    Streak state of ONE binary or prayer tracker, kept in sync with Entry
+    writes (see apps.tracker.streaks). Runs are stored as date ranges, so
+    whether the latest run is still "current" is decided at read time.
+    """
+    tracker = models.OneToOneField(Tracker, on_delete=models.CASCADE, primary_key=True, related_name='streak')
+
+    # Latest run of consecutive completed days
+    run_start = models.DateField(null=True, blank=True)
+    run_end = models.DateField(null=True, blank=True)
+
+    # Longest run ever (the earliest one on ties)
+    longest_start = models.DateField(null=True, blank=True)
+    longest_end = models.DateField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.tracker.name} streak ({self.run_start} - {self.run_end})"
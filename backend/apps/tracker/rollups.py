@@ -0,0 +1,223 @@
+# tracker/rollups.py
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Q
+from .models import Entry, TrackerRollup
+
+GRANULARITIES = ('week', 'month')
+
+ROLLUP_FIELDS = [
+    'entry_count', 'value_count', 'value_sum', 'value_min', 'value_max',
+    'completed_count', 'updated_at',
+]
+
+# Entry columns needed to reduce a row to its numeric value
+_VALUE_COLUMNS = [
+    'binary_value', 'number_value', 'time_value', 'duration_minutes',
+    'rating_value', 'prayer_values',
+]
+
+
+def period_start(granularity, date_obj):
+    """First day of the week (Monday) or month containing date_obj."""
+    if granularity == 'week':
+        return date_obj - timedelta(days=date_obj.weekday())
+    return date_obj.replace(day=1)
+
+
+def period_end(granularity, start):
+    """Last day of the period that begins on start."""
+    if granularity == 'week':
+        return start + timedelta(days=6)
+    next_month = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return next_month - timedelta(days=1)
+
+
+def entry_measure(tracker_type, values):
+    """
+    Reduce one entry to (numeric value, completed count).
+
+    Args:
+        tracker_type: Tracker.tracker_type
+        values: dict of the entry's value columns
+
+    Returns:
+        tuple: (Decimal or None, int)
+    """
+    if tracker_type == 'binary':
+        binary = values['binary_value']
+        if binary is None:
+            return None, 0
+        return Decimal(int(binary)), int(binary)
+
+    if tracker_type == 'prayer':
+        prayers = values['prayer_values']
+        if not isinstance(prayers, dict):
+            return None, 0
+        prayed = sum(1 for prayed in prayers.values() if prayed is True)
+        return Decimal(prayed), prayed
+
+    if tracker_type == 'time':
+        time_value = values['time_value']
+        if time_value is None:
+            return None, 0
+        return Decimal(time_value.hour * 60 + time_value.minute), 0
+
+    column = {'number': 'number_value', 'rating': 'rating_value', 'duration': 'duration_minutes'}.get(tracker_type)
+    if column is None or values[column] is None:
+        return None, 0
+    return Decimal(values[column]), 0
+
+
+class _Accumulator:
+    """Running totals for one rollup row."""
+
+    def __init__(self):
+        self.entry_count = 0
+        self.value_count = 0
+        self.value_sum = Decimal(0)
+        self.value_min = None
+        self.value_max = None
+        self.completed_count = 0
+
+    def add(self, value, completed):
+        self.entry_count += 1
+        self.completed_count += completed
+        if value is None:
+            return
+        self.value_count += 1
+        self.value_sum += value
+        self.value_min = value if self.value_min is None else min(self.value_min, value)
+        self.value_max = value if self.value_max is None else max(self.value_max, value)
+
+    def to_rollup(self, tracker_id, granularity, start):
+        return TrackerRollup(
+            tracker_id=tracker_id,
+            granularity=granularity,
+            period_start=start,
+            entry_count=self.entry_count,
+            value_count=self.value_count,
+            value_sum=self.value_sum,
+            value_min=self.value_min,
+            value_max=self.value_max,
+            completed_count=self.completed_count,
+        )
+
+
+def refresh_rollups(cells):
+    """
+    Recompute the week and month rollups containing the given cells.
+
+    Call inside the transaction that wrote or deleted the entries. Only the
+    span of affected periods is re-read, with one entry query, one upsert
+    and one delete for emptied periods.
+
+    Args:
+        cells: iterable of (tracker, date) pairs that changed
+    """
+    periods = set()
+    trackers = {}
+    for tracker, date_obj in cells:
+        trackers[tracker.id] = tracker
+        for granularity in GRANULARITIES:
+            periods.add((tracker.id, granularity, period_start(granularity, date_obj)))
+    if not periods:
+        return
+
+    # Read every entry of the affected periods in one query, with one date
+    # span per tracker so large batches don't build a huge OR expression
+    spans = {}
+    for tracker_id, granularity, start in periods:
+        first, last = spans.get(tracker_id, (start, period_end(granularity, start)))
+        spans[tracker_id] = (min(first, start), max(last, period_end(granularity, start)))
+    span_filter = Q()
+    for tracker_id, span in spans.items():
+        span_filter |= Q(user_id=trackers[tracker_id].user_id, tracker_id=tracker_id, date__range=span)
+    rows = Entry.objects.filter(span_filter).values('tracker_id', 'date', *_VALUE_COLUMNS)
+
+    accumulators = defaultdict(_Accumulator)
+    for row in rows:
+        tracker_id, date_obj = row['tracker_id'], row['date']
+        value, completed = entry_measure(trackers[tracker_id].tracker_type, row)
+        for granularity in GRANULARITIES:
+            key = (tracker_id, granularity, period_start(granularity, date_obj))
+            if key in periods:
+                accumulators[key].add(value, completed)
+
+    rollups = [accumulators[key].to_rollup(*key) for key in periods if key in accumulators]
+    if rollups:
+        TrackerRollup.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=['tracker', 'granularity', 'period_start'],
+            update_fields=ROLLUP_FIELDS,
+        )
+
+    emptied = defaultdict(list)
+    for tracker_id, granularity, start in periods:
+        if (tracker_id, granularity, start) not in accumulators:
+            emptied[(tracker_id, granularity)].append(start)
+    if emptied:
+        empty_filter = Q()
+        for (tracker_id, granularity), starts in emptied.items():
+            empty_filter |= Q(tracker_id=tracker_id, granularity=granularity, period_start__in=starts)
+        TrackerRollup.objects.filter(empty_filter).delete()
+
+
+def rebuild_rollups(trackers, batch_size=1000):
+    """
+    Rebuild all rollups of the given trackers from raw entries.
+
+    Entries are streamed in (tracker, date) order, so memory stays bounded
+    by one tracker's open week and month.
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    with transaction.atomic():
+        return _rebuild_rollups({tracker.id: tracker.tracker_type for tracker in trackers}, batch_size)
+
+
+def _rebuild_rollups(tracker_types, batch_size):
+    TrackerRollup.objects.filter(tracker_id__in=tracker_types).delete()
+
+    rows = (Entry.objects
+        .filter(tracker_id__in=tracker_types)
+        .order_by('tracker_id', 'date')
+        .values('tracker_id', 'date', *_VALUE_COLUMNS)
+        .iterator(chunk_size=batch_size)
+    )
+
+    pending = []
+    written = 0
+    open_periods = {}
+
+    def close(key):
+        pending.append(open_periods.pop(key).to_rollup(*key))
+
+    for row in rows:
+        tracker_id, date_obj = row['tracker_id'], row['date']
+        value, completed = entry_measure(tracker_types[tracker_id], row)
+        for granularity in GRANULARITIES:
+            key = (tracker_id, granularity, period_start(granularity, date_obj))
+            if key not in open_periods:
+                # Rows are ordered, so any other open period of this granularity is finished
+                for open_key in [k for k in open_periods if k[1] == granularity]:
+                    close(open_key)
+                open_periods[key] = _Accumulator()
+            open_periods[key].add(value, completed)
+
+        if len(pending) >= batch_size:
+            TrackerRollup.objects.bulk_create(pending)
+            written += len(pending)
+            pending.clear()
+
+    for key in list(open_periods):
+        close(key)
+    if pending:
+        TrackerRollup.objects.bulk_create(pending)
+        written += len(pending)
+
+    return written
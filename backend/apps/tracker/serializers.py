@@ -1,5 +1,10 @@
+from datetime import date
+import decimal
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Profile, Tracker, DailySnapshot, Entry
+from .models import Profile, Tracker, DailySnapshot, Entry, TrackerRollup
+from .streaks import STREAK_TRACKER_TYPES, summarize_streak
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -16,6 +21,18 @@ class TrackerSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'user', 'created_at']
 
+class TrackerWithStreakSerializer(TrackerSerializer):
+    """Tracker plus its streak (null for non-streak types); select_related('streak')"""
+    streak = serializers.SerializerMethodField()
+
+    class Meta(TrackerSerializer.Meta):
+        fields = TrackerSerializer.Meta.fields + ['streak']
+
+    def get_streak(self, tracker):
+        if tracker.tracker_type not in STREAK_TRACKER_TYPES:
+            return None
+        return summarize_streak(getattr(tracker, 'streak', None), date.today())
+
 class EntrySerializer(serializers.ModelSerializer):
     class Meta:
         model = Entry
@@ -26,8 +43,81 @@ class EntrySerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
 
+class SyncEntrySerializer(EntrySerializer):
+    """Entry with its date, so sync clients don't need the snapshot"""
+    class Meta(EntrySerializer.Meta):
+        fields = EntrySerializer.Meta.fields + ['date']
+
+class EntryEncoder:
+    """
+    values_list()-based encoder producing the same data as an Entry
+    ModelSerializer, without building model instances or serializer fields
+    per entry. Column encoders are resolved once from the model fields.
+
+    Usage:
+        rows = queryset.values_list(*encoder.columns)
+        data = [encoder.encode(row) for row in rows]
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        model_fields = [Entry._meta.get_field(field) for field in self.fields]
+        self.columns = [model_field.attname for model_field in model_fields]
+        self.encoders = [column_encoder(model_field) for model_field in model_fields]
+        self._plan = list(zip(self.fields, self.encoders))
+
+    def encode(self, row):
+        """Encode one row; extra trailing columns are ignored."""
+        return {
+            field: value if encoder is None or value is None else encoder(value)
+            for (field, encoder), value in zip(self._plan, row)
+        }
+
+    def encode_queryset(self, queryset):
+        return [self.encode(row) for row in queryset.values_list(*self.columns)]
+
+
+def column_encoder(model_field):
+    """
+    Encoder matching DRF's default representation of a model field, None
+    for identity. Shared by every fast path that renders entry values.
+    """
+    if isinstance(model_field, models.DecimalField):
+        exponent = decimal.Decimal('.1') ** model_field.decimal_places
+        context = decimal.Context(prec=model_field.max_digits)
+        return lambda value: f'{value.quantize(exponent, context=context):f}'
+    if isinstance(model_field, models.DateTimeField):
+        return _encode_datetime
+    if isinstance(model_field, (models.DateField, models.TimeField)):
+        return _encode_isoformat
+    return None
+
+
+def _encode_isoformat(value):
+    return value.isoformat()
+
+
+def _encode_datetime(value):
+    if timezone.is_aware(value):
+        value = value.astimezone(timezone.get_current_timezone())
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+ENTRY_ENCODER = EntryEncoder(EntrySerializer.Meta.fields)
+SYNC_ENTRY_ENCODER = EntryEncoder(SyncEntrySerializer.Meta.fields)
+
 class DailySnapshotSerializer(serializers.ModelSerializer):
     class Meta:
         model = DailySnapshot
         fields = ['id', 'user', 'date']
 
+class TrackerRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TrackerRollup
+        fields = [
+            'granularity', 'period_start', 'entry_count', 'value_count',
+            'value_sum', 'value_min', 'value_max', 'completed_count'
+        ]
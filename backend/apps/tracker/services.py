@@ -1,67 +1,597 @@
 # tracker/services.py
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import calendar
-from .models import DailySnapshot, Entry
-from .serializers import EntrySerializer
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+from .models import Tracker, DailySnapshot, Entry, Tombstone, PRAYER_NAMES
+from .serializers import TrackerSerializer, ENTRY_ENCODER, SYNC_ENTRY_ENCODER, column_encoder
+from .rollups import refresh_rollups
+from .streaks import refresh_streaks
+from .utils import encode_sync_cursor
+
+# The single Entry field that holds the value for each tracker type
+VALUE_FIELD_BY_TYPE = {
+    'binary': 'binary_value',
+    'number': 'number_value',
+    'time': 'time_value',
+    'duration': 'duration_minutes',
+    'text': 'text_value',
+    'rating': 'rating_value',
+    'prayer': 'prayer_values',
+}
+
+# Per-column encoders of the value fields, built from the model fields
+VALUE_ENCODERS = {
+    field: column_encoder(Entry._meta.get_field(field)) for field in VALUE_FIELD_BY_TYPE.values()
+}
+
+# Columns overwritten when an entry upsert hits an existing cell
+ENTRY_UPSERT_FIELDS = list(VALUE_FIELD_BY_TYPE.values()) + ['updated_at']
 
 class MonthDataBuilder:
     """Service for building month view data structure"""
-    
+
     def __init__(self, user, year, month):
         self.user = user
         self.year = year
         self.month = month
-    
+        self.num_days = calendar.monthrange(year, month)[1]
+        self.first_day = date(year, month, 1)
+        self.last_day = date(year, month, self.num_days)
+
     def build_weeks(self, trackers):
         """
         Build week structure for the month with entries.
-        
+
+        The whole month is loaded with a single entry query on the
+        (user, date, tracker) index, independent of days or trackers.
+        Days without a DailySnapshot are
+        synthesized in memory, so building a month never writes.
+
         Returns:
             list: List of weeks, where each week is a list of day data
         """
+        entries_by_date = self._load_entries(trackers)
+
         weeks = []
-        
+
         current_week = []
-        num_days = calendar.monthrange(self.year, self.month)[1]
-        for day in range(1, num_days + 1):
-            date_obj = datetime(self.year, self.month, day).date()
-            day_data = self._build_day_data(date_obj, trackers)
+        for day in range(1, self.num_days + 1):
+            date_obj = date(self.year, self.month, day)
+            day_data = self._build_day_data(date_obj, entries_by_date.get(date_obj, {}))
             current_week.append(day_data)
-            
-            if date_obj.weekday() == 6 or day == num_days:
+
+            if date_obj.weekday() == 6 or day == self.num_days:
                 weeks.append(current_week)
                 current_week = []
 
         return weeks
-    
-    def _build_day_data(self, date_obj, trackers):
+
+    def build_columns(self, trackers):
+        """
+        Build the compact columnar representation of the month.
+
+        Each tracker gets one array indexed by day (day 1 at index 0) that
+        only holds the value field relevant to its tracker_type, plus a
+        sparse {day: entry_id} map for cells that have an entry.
+
+        Returns:
+            dict: weeks (day numbers per week), values and entry_ids
+        """
+        value_fields = {
+            tracker.id: VALUE_FIELD_BY_TYPE.get(tracker.tracker_type)
+            for tracker in trackers
+        }
+        values = {tracker_id: [None] * self.num_days for tracker_id in value_fields}
+        entry_ids = {tracker_id: {} for tracker_id in value_fields}
+
+        rows = Entry.objects.filter(
+            user=self.user,
+            date__range=(self.first_day, self.last_day),
+            tracker__in=trackers
+        ).values_list('id', 'tracker_id', 'date', *VALUE_FIELD_BY_TYPE.values())
+
+        field_index = {field: i for i, field in enumerate(VALUE_FIELD_BY_TYPE.values(), start=3)}
+        for row in rows:
+            entry_id, tracker_id, entry_date = row[0], row[1], row[2]
+            field = value_fields[tracker_id]
+            if field is not None:
+                values[tracker_id][entry_date.day - 1] = encode_field_value(field, row[field_index[field]])
+            entry_ids[tracker_id][entry_date.day] = entry_id
+
+        return {
+            'weeks': self._week_days(),
+            'values': values,
+            'entry_ids': entry_ids,
+        }
+
+    def build_stats(self, trackers):
+        """
+        Per-tracker statistics for every week of the month and the whole
+        month, aggregated in the database in a single grouped query.
+
+        Stats are type-aware: completion for binary and prayer, mean for
+        number and rating, total for duration and coverage otherwise.
+        Period lengths count every day of the (month-clipped) week, like
+        the grid's WEEK/MONTH rows.
+
+        Returns:
+            dict: {'weeks': [{tracker_id: stat}, ...], 'month': {tracker_id: stat}}
         """
-        Build data for a single day including all entries.
-        
+        week_days = self._week_days()
+        # TruncWeek yields the Monday of each week, even for a clipped first week
+        week_index = {}
+        for i, days in enumerate(week_days):
+            first = date(self.year, self.month, days[0])
+            week_index[first - timedelta(days=first.weekday())] = i
+
+        rows = Entry.objects.filter(
+            user=self.user,
+            date__range=(self.first_day, self.last_day),
+            tracker__in=trackers
+        ).annotate(
+            week=TruncWeek('date')
+        ).values('tracker_id', 'week').annotate(
+            **STAT_AGGREGATES
+        ).order_by()
+
+        week_totals = [{} for _ in week_days]
+        month_totals = {}
+        for row in rows:
+            tracker_id = row['tracker_id']
+            week = row['week'].date() if isinstance(row['week'], datetime) else row['week']
+            aggregates = {key: row[key] for key in STAT_AGGREGATES}
+            week_totals[week_index[week]][tracker_id] = aggregates
+            month_totals[tracker_id] = _add_aggregates(month_totals.get(tracker_id), aggregates)
+
+        def summarize_all(totals, days):
+            return {
+                tracker.id: summarize_stat(tracker.tracker_type, totals.get(tracker.id), days)
+                for tracker in trackers
+            }
+
+        return {
+            'weeks': [summarize_all(totals, len(days)) for totals, days in zip(week_totals, week_days)],
+            'month': summarize_all(month_totals, self.num_days),
+        }
+
+    def _week_days(self):
+        """Day numbers of the month grouped into Monday-Sunday weeks."""
+        weeks = []
+        current_week = []
+        for day in range(1, self.num_days + 1):
+            current_week.append(day)
+            if date(self.year, self.month, day).weekday() == 6 or day == self.num_days:
+                weeks.append(current_week)
+                current_week = []
+        return weeks
+
+    def _load_entries(self, trackers):
+        """
+        Fetch every entry of the month in a single query.
+
+        Returns:
+            dict: {date: {tracker_id: serialized entry}}
+        """
+        rows = Entry.objects.filter(
+            user=self.user,
+            date__range=(self.first_day, self.last_day),
+            tracker__in=trackers
+        ).values_list(*ENTRY_ENCODER.columns, 'tracker_id', 'date')
+
+        entries_by_date = {}
+        for row in rows:
+            day_entries = entries_by_date.setdefault(row[-1], {})
+            day_entries[row[-2]] = ENTRY_ENCODER.encode(row)
+
+        return entries_by_date
+
+    def _build_day_data(self, date_obj, entries_dict):
+        """
+        Build data for a single day from already loaded entries.
+
         Args:
             date_obj: Date object for the day
-            trackers: QuerySet of trackers to include
-        
+            entries_dict: Serialized entries for the day keyed by tracker id
+
         Returns:
             dict: Day data with date and entries
         """
-        snapshot, _ = DailySnapshot.objects.get_or_create(
-            user=self.user,
-            date=date_obj
-        )
-        
-        entries = Entry.objects.filter(
-            daily_snapshot=snapshot,
-            tracker__in=trackers
-        ).select_related('tracker')
-        
-        # Serialize entries
-        entries_dict = {}
-        for entry in entries:
-            entries_dict[entry.tracker.id] = EntrySerializer(entry).data
-        
         return {
             'date': date_obj.isoformat(),
             'day': date_obj.day,
             'entries': entries_dict
-        }
\ No newline at end of file
+        }
+
+
+# Aggregates computed per (tracker, week) for the month stats
+STAT_AGGREGATES = {
+    'binary_count': Count('binary_value'),
+    'binary_true': Count('id', filter=Q(binary_value=True)),
+    'number_count': Count('number_value'),
+    'number_sum': Sum('number_value'),
+    'rating_count': Count('rating_value'),
+    'rating_sum': Sum('rating_value'),
+    'duration_count': Count('duration_minutes'),
+    'duration_sum': Sum('duration_minutes'),
+    'time_count': Count('time_value'),
+    'text_count': Count('text_value', filter=~Q(text_value='')),
+    **{
+        f'prayer_{name}': Count('id', filter=Q(**{f'prayer_values__{name}': True}))
+        for name in PRAYER_NAMES
+    },
+}
+
+
+def _add_aggregates(total, aggregates):
+    """Sum two aggregate rows, treating None as 0."""
+    if total is None:
+        return dict(aggregates)
+    return {key: (total[key] or 0) + (value or 0) for key, value in aggregates.items()}
+
+
+def summarize_stat(tracker_type, aggregates, days):
+    """
+    Turn raw aggregates of one tracker over a period into its type's stat.
+
+    Args:
+        tracker_type: Tracker.tracker_type
+        aggregates: STAT_AGGREGATES values for the period, or None if empty
+        days: Number of days in the period
+    """
+    aggregates = aggregates or {}
+
+    def value(key):
+        return aggregates.get(key) or 0
+
+    if tracker_type == 'binary':
+        completed = value('binary_true')
+        return {'days': days, 'completed': completed, 'completion_rate': round(completed / days, 4)}
+
+    if tracker_type in ('number', 'rating'):
+        count = value(f'{tracker_type}_count')
+        total = value(f'{tracker_type}_sum')
+        return {'count': count, 'mean': round(float(total) / count, 2) if count else None}
+
+    if tracker_type == 'duration':
+        return {'count': value('duration_count'), 'total': value('duration_sum')}
+
+    if tracker_type == 'prayer':
+        per_prayer = {name: value(f'prayer_{name}') for name in PRAYER_NAMES}
+        completed = sum(per_prayer.values())
+        possible = days * len(PRAYER_NAMES)
+        return {
+            'days': days,
+            'completed': completed,
+            'possible': possible,
+            'completion_rate': round(completed / possible, 4),
+            'per_prayer': per_prayer,
+        }
+
+    # time/text: coverage
+    filled = value(f'{tracker_type}_count') if tracker_type in ('time', 'text') else 0
+    return {'days': days, 'filled': filled}
+
+
+def encode_field_value(field, value):
+    """Encode a raw value of an Entry column the way EntrySerializer renders it."""
+    encoder = VALUE_ENCODERS[field]
+    return value if encoder is None or value is None else encoder(value)
+
+
+# Final cursors trail "now" by this much, so rows from transactions that
+# committed late are sent again rather than missed (clients upsert by id).
+SYNC_CURSOR_OVERLAP = timedelta(seconds=5)
+
+
+class DeltaSyncBuilder:
+    """Service for collecting a user's trackers and entries changed since a cursor"""
+
+    def __init__(self, user, since=None, last_id=0, limit=1000):
+        self.user = user
+        self.since = since
+        self.last_id = last_id
+        self.limit = limit
+
+    def build(self):
+        """
+        Build one page of changes.
+
+        Entries are paged in (updated_at, id) order; trackers and tombstones
+        are small and returned in full on every page.
+
+        Returns:
+            dict: cursor, has_more, trackers, entries and deleted ids
+        """
+        started_at = timezone.now()
+
+        rows = list(
+            self._changed_entries()
+            .order_by('updated_at', 'id')
+            .values_list(*SYNC_ENTRY_ENCODER.columns, 'updated_at', 'id')[:self.limit + 1]
+        )
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+
+        if has_more:
+            cursor = encode_sync_cursor(rows[-1][-2], rows[-1][-1])
+        else:
+            cursor = encode_sync_cursor(started_at - SYNC_CURSOR_OVERLAP)
+
+        trackers = Tracker.objects.filter(user=self.user)
+        tombstones = Tombstone.objects.filter(user=self.user)
+        if self.since is not None:
+            trackers = trackers.filter(updated_at__gt=self.since)
+            tombstones = tombstones.filter(deleted_at__gt=self.since)
+
+        deleted = {'tracker': [], 'entry': []}
+        for kind, object_id in tombstones.values_list('kind', 'object_id'):
+            deleted[kind].append(object_id)
+
+        return {
+            'cursor': cursor,
+            'has_more': has_more,
+            'trackers': TrackerSerializer(trackers, many=True).data,
+            'entries': [SYNC_ENTRY_ENCODER.encode(row) for row in rows],
+            'deleted': {'trackers': deleted['tracker'], 'entries': deleted['entry']},
+        }
+
+    def _changed_entries(self):
+        # The (user, updated_at, id) index returns pages in cursor order
+        # without a join or sort
+        entries = Entry.objects.filter(user=self.user)
+        if self.since is None:
+            return entries
+        return entries.filter(
+            Q(updated_at__gt=self.since) |
+            Q(updated_at=self.since, id__gt=self.last_id)
+        )
+
+
+def save_entry(user, entry, date_obj):
+    """
+    Write a validated, unsaved entry for a day: snapshot upsert, entry
+    upsert, rollup and streak refresh in one transaction.
+    """
+    with transaction.atomic():
+        entry.daily_snapshot = upsert_snapshot(user, date_obj)
+        entry.user, entry.date = user, date_obj
+        upsert_entry(entry)
+        refresh_rollups([(entry.tracker, date_obj)])
+        refresh_streaks([(entry.tracker, date_obj)])
+    return entry
+
+
+def delete_entries(user, entries):
+    """
+    Delete entries, recording tombstones and refreshing rollups and streaks
+    in the same transaction.
+
+    Args:
+        entries: Entry queryset, already scoped to the user
+
+    Returns:
+        set: Dates that lost an entry
+    """
+    with transaction.atomic():
+        rows = list(entries.values_list('id', 'tracker_id', 'date'))
+        if not rows:
+            return set()
+        record_deletions(user, 'entry', [entry_id for entry_id, _, _ in rows])
+        Entry.objects.filter(id__in=[entry_id for entry_id, _, _ in rows]).delete()
+        trackers = Tracker.objects.in_bulk({tracker_id for _, tracker_id, _ in rows})
+        cells = [(trackers[tracker_id], date_obj) for _, tracker_id, date_obj in rows]
+        refresh_rollups(cells)
+        refresh_streaks(cells)
+    return {date_obj for _, _, date_obj in rows}
+
+
+def upsert_snapshot(user, date_obj):
+    """
+    Get or create a user's snapshot for a day in a single statement
+    (INSERT ... ON CONFLICT (user, date) DO UPDATE ... RETURNING id).
+    """
+    snapshot = DailySnapshot(user=user, date=date_obj)
+    DailySnapshot.objects.bulk_create(
+        [snapshot],
+        update_conflicts=True,
+        unique_fields=['user', 'date'],
+        update_fields=['date'],
+    )
+    if snapshot.pk is None:
+        # Backends that can't return ids from upserts
+        snapshot = DailySnapshot.objects.get(user=user, date=date_obj)
+    return snapshot
+
+
+def upsert_entry(entry):
+    """
+    Insert or overwrite the values of a validated, unsaved entry in a single
+    statement on the (tracker, daily_snapshot) unique constraint.
+    """
+    Entry.objects.bulk_create(
+        [entry],
+        update_conflicts=True,
+        unique_fields=['tracker', 'daily_snapshot'],
+        update_fields=ENTRY_UPSERT_FIELDS,
+    )
+    if entry.pk is None:
+        entry.pk = Entry.objects.get(
+            tracker=entry.tracker, daily_snapshot=entry.daily_snapshot
+        ).pk
+    return entry
+
+
+def record_deletions(user, kind, object_ids):
+    """Store tombstones for deleted trackers or entries in one insert."""
+    Tombstone.objects.bulk_create([
+        Tombstone(user=user, kind=kind, object_id=object_id)
+        for object_id in object_ids
+    ])
+
+
+class EntryBatchUpserter:
+    """
+    Service for applying many cell writes/deletes at once.
+
+    Items are validated with Entry.set_value_from_data on unsaved entries,
+    then written with a fixed number of bulk queries in one transaction:
+    snapshots are inserted ignoring conflicts and entries are upserted on
+    the (tracker, daily_snapshot) unique constraint.
+
+    Pass refresh=False to skip rollup and streak maintenance when the
+    caller rebuilds them itself after many batches (imports).
+    """
+
+    def __init__(self, user, items, refresh=True):
+        self.user = user
+        self.items = items
+        self.refresh = refresh
+
+    def apply(self):
+        """
+        Validate and apply all items.
+
+        Returns:
+            tuple: (results, touched_months) where results holds one dict
+            per item in input order and touched_months is a set of
+            (year, month) pairs that were written to
+        """
+        results = [None] * len(self.items)
+        trackers = self._load_trackers()
+
+        # Later items for the same cell win, like sequential requests would
+        cells = {}
+        cell_by_index = {}
+        for index, item in enumerate(self.items):
+            try:
+                tracker_id, date_obj, entry = self._validate(item, trackers)
+            except (ValueError, TypeError, ArithmeticError) as e:
+                results[index] = {'success': False, 'error': str(e)}
+                continue
+            cells[(tracker_id, date_obj)] = (index, entry)
+            cell_by_index[index] = (tracker_id, date_obj)
+
+        writes = {key: op for key, op in cells.items() if op[1] is not None}
+        deletes = {key: op for key, op in cells.items() if op[1] is None}
+
+        with transaction.atomic():
+            snapshots = self._ensure_snapshots({date_obj for _, date_obj in writes})
+            entry_ids, created = self._upsert(writes, snapshots)
+            self._delete(deletes)
+            if self.refresh:
+                changed = [(trackers[tracker_id], date_obj) for tracker_id, date_obj in cells]
+                refresh_rollups(changed)
+                refresh_streaks(changed)
+
+        for key, (index, _) in writes.items():
+            results[index] = {'success': True, 'entry_id': entry_ids[key], 'created': key in created}
+        for key, (index, _) in deletes.items():
+            results[index] = {'success': True}
+
+        # Items superseded by a later write to the same cell share its result
+        for index, key in cell_by_index.items():
+            if results[index] is None:
+                results[index] = results[cells[key][0]]
+
+        touched_months = {(date_obj.year, date_obj.month) for _, date_obj in cells}
+        return results, touched_months
+
+    def _load_trackers(self):
+        tracker_ids = set()
+        for item in self.items:
+            try:
+                tracker_ids.add(int(item.get('tracker_id')))
+            except (AttributeError, TypeError, ValueError):
+                continue
+        return Tracker.objects.filter(user=self.user, id__in=tracker_ids).in_bulk()
+
+    def _validate(self, item, trackers):
+        """
+        Returns:
+            tuple: (tracker_id, date, unsaved Entry or None for a delete)
+        """
+        if not isinstance(item, dict):
+            raise ValueError('Each item must be an object')
+
+        try:
+            tracker = trackers.get(int(item.get('tracker_id')))
+        except (TypeError, ValueError):
+            tracker = None
+        if tracker is None:
+            raise ValueError('Tracker not found')
+
+        date_obj = item.get('date')
+        if not isinstance(date_obj, date):
+            # JSON bodies carry strings; internal callers may pass dates
+            try:
+                date_obj = datetime.strptime(date_obj, '%Y-%m-%d').date()
+            except (ValueError, TypeError):
+                raise ValueError('Invalid date format. Use YYYY-MM-DD.')
+
+        if item.get('delete_entry'):
+            return tracker.id, date_obj, None
+
+        entry = Entry(tracker=tracker)
+        entry.set_value_from_data(item)
+        return tracker.id, date_obj, entry
+
+    def _ensure_snapshots(self, dates):
+        """Insert missing snapshots and return {date: snapshot} (2 queries)."""
+        if not dates:
+            return {}
+        DailySnapshot.objects.bulk_create(
+            [DailySnapshot(user=self.user, date=date_obj) for date_obj in dates],
+            ignore_conflicts=True
+        )
+        return {
+            snapshot.date: snapshot
+            for snapshot in DailySnapshot.objects.filter(user=self.user, date__in=dates)
+        }
+
+    def _upsert(self, writes, snapshots):
+        """Upsert all entries; returns ({cell: entry_id}, set of created cells)."""
+        if not writes:
+            return {}, set()
+
+        existing = {
+            (tracker_id, entry_date): entry_id
+            for entry_id, tracker_id, entry_date in Entry.objects.filter(
+                user=self.user,
+                date__in=snapshots.keys(),
+                tracker_id__in={tracker_id for tracker_id, _ in writes}
+            ).values_list('id', 'tracker_id', 'date')
+        }
+
+        entries = []
+        for (tracker_id, date_obj), (_, entry) in writes.items():
+            entry.daily_snapshot = snapshots[date_obj]
+            entry.user, entry.date = self.user, date_obj
+            entries.append(entry)
+
+        Entry.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=['tracker', 'daily_snapshot'],
+            update_fields=ENTRY_UPSERT_FIELDS,
+        )
+
+        entry_ids = {}
+        for key, (_, entry) in writes.items():
+            entry_ids[key] = entry.id or existing.get(key)
+        created = {key for key in writes if key not in existing}
+        return entry_ids, created
+
+    def _delete(self, deletes):
+        if not deletes:
+            return
+        cell_filter = Q()
+        for tracker_id, date_obj in deletes:
+            cell_filter |= Q(tracker_id=tracker_id, date=date_obj)
+        entries = Entry.objects.filter(cell_filter, user=self.user)
+        entry_ids = list(entries.values_list('id', flat=True))
+        record_deletions(self.user, 'entry', entry_ids)
+        Entry.objects.filter(id__in=entry_ids).delete()
+        # Rollups and streaks are refreshed by apply() together with the writes
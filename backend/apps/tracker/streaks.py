@@ -0,0 +1,283 @@
+# tracker/streaks.py
+from collections import defaultdict
+from datetime import timedelta
+from django.db.models import Q
+from .models import Entry, Tracker, TrackerStreak, PRAYER_NAMES
+
+STREAK_TRACKER_TYPES = ('binary', 'prayer')
+
+STREAK_FIELDS = ['run_start', 'run_end', 'longest_start', 'longest_end', 'updated_at']
+
+# Days read by the first probe for the edge of a run; doubled until found
+STREAK_SCAN_WINDOW = 32
+
+ONE_DAY = timedelta(days=1)
+
+
+def completion_filter(tracker_type):
+    """
+    Entries that complete their day: a yes for binary trackers, all five
+    prayers prayed for prayer trackers.
+    """
+    if tracker_type == 'binary':
+        return Q(binary_value=True)
+    return Q(**{f'prayer_values__{name}': True for name in PRAYER_NAMES})
+
+
+def run_length(run):
+    """Number of days in a (start, end) run, 0 for None."""
+    if run is None:
+        return 0
+    return (run[1] - run[0]).days + 1
+
+
+def find_runs(dates):
+    """
+    Find the latest and the longest run of consecutive days.
+
+    Args:
+        dates: ascending iterable of distinct dates
+
+    Returns:
+        tuple: (latest, longest) as (start, end) pairs, None when empty
+    """
+    latest = longest = None
+    for day in dates:
+        if latest is not None and day == latest[1] + ONE_DAY:
+            latest = (latest[0], day)
+        else:
+            latest = (day, day)
+        if run_length(latest) > run_length(longest):
+            longest = latest
+    return latest, longest
+
+
+def summarize_streak(streak, today):
+    """
+    Public streak numbers of a tracker.
+
+    The latest run is current while it reaches yesterday, so a streak
+    isn't lost before today's cell has been filled in.
+
+    Args:
+        streak: TrackerStreak or None when nothing was completed yet
+        today: date the current streak is relative to
+    """
+    if streak is None or streak.run_end is None:
+        return {'current': 0, 'longest': 0, 'last_completed': None}
+
+    current = 0
+    if streak.run_start <= today and streak.run_end >= today - ONE_DAY:
+        current = run_length((streak.run_start, min(streak.run_end, today)))
+    return {
+        'current': current,
+        'longest': run_length(_longest_run(streak)),
+        'last_completed': streak.run_end.isoformat(),
+    }
+
+
+def get_streaks(user, today):
+    """Streak numbers of a user's active binary and prayer trackers (1 query)."""
+    trackers = Tracker.objects.filter(
+        user=user,
+        is_active=True,
+        tracker_type__in=STREAK_TRACKER_TYPES
+    ).select_related('streak')
+    return {
+        tracker.id: summarize_streak(getattr(tracker, 'streak', None), today)
+        for tracker in trackers
+    }
+
+
+def refresh_streaks(cells):
+    """
+    Update the streak state of binary and prayer trackers after entry changes.
+
+    Call inside the transaction that wrote or deleted the entries. A single
+    changed day of a tracker is applied incrementally; several changed days
+    of one tracker (batch writes) rebuild that tracker's state.
+
+    Args:
+        cells: iterable of (tracker, date) pairs that changed
+    """
+    trackers = {}
+    days = defaultdict(set)
+    for tracker, date_obj in cells:
+        if tracker.tracker_type in STREAK_TRACKER_TYPES:
+            trackers[tracker.id] = tracker
+            days[tracker.id].add(date_obj)
+
+    for tracker_id, changed_days in days.items():
+        if len(changed_days) == 1:
+            apply_streak_change(trackers[tracker_id], next(iter(changed_days)))
+        else:
+            rebuild_streak(trackers[tracker_id])
+
+
+def apply_streak_change(tracker, day):
+    """
+    Update a tracker's streak after the entry of one day changed.
+
+    Edits at the head of the latest run (extending it, starting a new one,
+    or removing days from it) cost a constant number of queries. Back-dated
+    completions only scan the run around the edited day; only breaking the
+    longest run needs a rescan of the tracker's completed days.
+
+    Returns:
+        TrackerStreak: the updated state
+    """
+    streak = TrackerStreak.objects.select_for_update().filter(tracker=tracker).first()
+    if streak is None:
+        return rebuild_streak(tracker)
+
+    latest, longest = _latest_run(streak), _longest_run(streak)
+    if _completed_days(tracker).filter(date=day).exists():
+        latest, longest = _after_completion(tracker, day, latest, longest)
+    else:
+        latest, longest = _after_removal(tracker, day, latest, longest)
+
+    if (latest, longest) != (_latest_run(streak), _longest_run(streak)):
+        _set_runs(streak, latest, longest)
+        streak.save()
+    return streak
+
+
+def rebuild_streak(tracker):
+    """
+    Recompute a tracker's streak state from all of its completed days.
+
+    Returns:
+        TrackerStreak or None for trackers without streaks
+    """
+    if tracker.tracker_type not in STREAK_TRACKER_TYPES:
+        TrackerStreak.objects.filter(tracker=tracker).delete()
+        return None
+
+    dates = (_completed_days(tracker)
+        .order_by('date')
+        .values_list('date', flat=True)
+        .iterator()
+    )
+    streak = TrackerStreak(tracker=tracker)
+    _set_runs(streak, *find_runs(dates))
+    TrackerStreak.objects.bulk_create(
+        [streak],
+        update_conflicts=True,
+        unique_fields=['tracker'],
+        update_fields=STREAK_FIELDS,
+    )
+    return streak
+
+
+def _after_completion(tracker, day, latest, longest):
+    if latest is None or day > latest[1] + ONE_DAY:
+        # A new run after a gap
+        run = latest = (day, day)
+    elif day == latest[1] + ONE_DAY:
+        # Extends the head of the latest run
+        run = latest = (latest[0], day)
+    elif day >= latest[0]:
+        # Already part of the latest run
+        return latest, longest
+    else:
+        # Back-dated: may join an older run and even bridge into the latest
+        run = _run_containing(tracker, day)
+        if run[1] >= latest[0]:
+            latest = run
+
+    if run_length(run) > run_length(longest):
+        longest = run
+    return latest, longest
+
+
+def _after_removal(tracker, day, latest, longest):
+    if latest is None or day > latest[1]:
+        # Nothing was completed after the latest run
+        return latest, longest
+
+    if day == latest[1]:
+        if day > latest[0]:
+            latest = (latest[0], day - ONE_DAY)
+        else:
+            latest = _previous_run(tracker, day)
+    elif day >= latest[0]:
+        latest = (day + ONE_DAY, latest[1])
+
+    if longest is not None and longest[0] <= day <= longest[1]:
+        # The record was broken; any older run may be the longest now
+        longest = find_runs(
+            _completed_days(tracker)
+            .order_by('date')
+            .values_list('date', flat=True)
+            .iterator()
+        )[1]
+    return latest, longest
+
+
+def _previous_run(tracker, before):
+    """The last run that ends before a date, or None."""
+    last_day = (_completed_days(tracker)
+        .filter(date__lt=before)
+        .order_by('-date')
+        .values_list('date', flat=True)
+        .first()
+    )
+    if last_day is None:
+        return None
+    return (_run_edge(tracker, last_day, -1), last_day)
+
+
+def _run_containing(tracker, day):
+    """The run of a completed day, scanned outwards from it."""
+    return (_run_edge(tracker, day, -1), _run_edge(tracker, day, 1))
+
+
+def _run_edge(tracker, day, step):
+    """
+    Walk from a completed day to the end of its run in one direction.
+
+    Args:
+        step: 1 to walk forwards, -1 to walk backwards
+
+    Returns:
+        date: the last completed day of the run in that direction
+    """
+    edge = day
+    window = STREAK_SCAN_WINDOW
+    while True:
+        span = sorted([edge + step * ONE_DAY, edge + step * timedelta(days=window)])
+        completed = set(_completed_days(tracker)
+            .filter(date__range=span)
+            .values_list('date', flat=True)
+        )
+        for _ in range(window):
+            if edge + step * ONE_DAY not in completed:
+                return edge
+            edge += step * ONE_DAY
+        window *= 2
+
+
+def _completed_days(tracker):
+    # Filtering on the owner too lets the (user, date, tracker) index serve it
+    return Entry.objects.filter(
+        completion_filter(tracker.tracker_type),
+        user_id=tracker.user_id,
+        tracker=tracker
+    )
+
+
+def _latest_run(streak):
+    if streak.run_end is None:
+        return None
+    return (streak.run_start, streak.run_end)
+
+
+def _longest_run(streak):
+    if streak.longest_end is None:
+        return None
+    return (streak.longest_start, streak.longest_end)
+
+
+def _set_runs(streak, latest, longest):
+    streak.run_start, streak.run_end = latest or (None, None)
+    streak.longest_start, streak.longest_end = longest or (None, None)
@@ -1,3 +1,1406 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+import json
+import os
+import random
+import shutil
+import tempfile
+from unittest.mock import patch
 
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
 
+from config.instrumentation import QueryBudgetMixin, fingerprint
+from config.metrics import OPENAI_FAILURES, REGISTRY, MetricsMiddleware, MetricsRegistry
+from config.profiling import list_profiles, parse_profile_filename
+from config.timing import ServerTiming
+from apps.tracker.cache import (
+    bump_user_cache_generation,
+    get_month_cache_key,
+    get_month_cache_stats,
+    get_user_cache_generation,
+)
+from apps.tracker.models import Tracker, DailySnapshot, Entry, TrackerRollup, TrackerStreak, PRAYER_NAMES
+from apps.tracker.services import MonthDataBuilder, EntryBatchUpserter, save_entry, delete_entries
+from apps.tracker.benchmarks import compare_results, measure, run_benchmarks
+from apps.tracker.serializers import ENTRY_ENCODER, SYNC_ENTRY_ENCODER, EntrySerializer, SyncEntrySerializer
+from apps.tracker.streaks import apply_streak_change, find_runs, run_length
+from apps.tracker.export import EntryExporter
+from apps.tracker.views import MonthView
+
+User = get_user_model()
+
+
+class MonthDataBuilderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+
+    def _make_trackers(self, count):
+        return [
+            Tracker.objects.create(user=self.user, name=f"T{i}", tracker_type="number", display_order=i)
+            for i in range(count)
+        ]
+
+    def _fill_month(self, trackers, year, month, days):
+        for day in range(1, days + 1):
+            snapshot, _ = DailySnapshot.objects.get_or_create(user=self.user, date=date(year, month, day))
+            for tracker in trackers:
+                Entry.objects.create(tracker=tracker, daily_snapshot=snapshot, number_value=Decimal(day))
+
+    def _build(self, year, month):
+        trackers = Tracker.objects.filter(user=self.user, is_active=True).order_by("display_order")
+        return MonthDataBuilder(self.user, year, month).build_weeks(trackers)
+
+    def test_week_structure_and_entries(self):
+        tracker = self._make_trackers(1)[0]
+        self._fill_month([tracker], 2026, 2, 3)
+
+        weeks = self._build(2026, 2)
+
+        days = [day for week in weeks for day in week]
+        self.assertEqual(len(days), 28)
+        # 1 Feb 2026 is a Sunday, so the first week holds a single day.
+        self.assertEqual(len(weeks[0]), 1)
+        self.assertEqual(days[0]["date"], "2026-02-01")
+        self.assertEqual(days[2]["entries"][tracker.id]["number_value"], "3.00")
+        self.assertEqual(days[3]["entries"], {})
+
+    def test_ignores_other_users_and_months(self):
+        tracker = self._make_trackers(1)[0]
+        self._fill_month([tracker], 2026, 1, 31)
+        other = User.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        snapshot = DailySnapshot.objects.create(user=other, date=date(2026, 2, 1))
+        other_tracker = Tracker.objects.create(user=other, name="X", tracker_type="number")
+        Entry.objects.create(tracker=other_tracker, daily_snapshot=snapshot, number_value=Decimal(1))
+
+        weeks = self._build(2026, 2)
+
+        self.assertTrue(all(not day["entries"] for week in weeks for day in week))
+
+    def test_query_count_is_constant(self):
+        self._make_trackers(1)
+        with self.assertNumQueries(1):
+            self._build(2026, 3)
+
+        trackers = self._make_trackers(10)
+        self._fill_month(trackers, 2026, 3, 31)
+        with self.assertNumQueries(1):
+            self._build(2026, 3)
+
+    def test_build_does_not_create_snapshots(self):
+        self._make_trackers(2)
+
+        weeks = self._build(2030, 12)
+
+        self.assertEqual(sum(len(week) for week in weeks), 31)
+        self.assertFalse(DailySnapshot.objects.filter(user=self.user).exists())
+
+    def test_entries_mirror_snapshot_user_and_date(self):
+        tracker = self._make_trackers(1)[0]
+        self._fill_month([tracker], 2026, 3, 2)
+
+        entry = Entry.objects.get(daily_snapshot__date=date(2026, 3, 2))
+        self.assertEqual((entry.user_id, entry.date), (self.user.id, date(2026, 3, 2)))
+
+    def test_month_reads_skip_the_snapshot_join(self):
+        trackers = self._make_trackers(2)
+        self._fill_month(trackers, 2026, 3, 5)
+        builder = MonthDataBuilder(self.user, 2026, 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            builder.build_weeks(trackers)
+            builder.build_columns(trackers)
+            builder.build_stats(trackers)
+
+        self.assertFalse(any("tracker_dailysnapshot" in query["sql"] for query in queries))
+
+
+class EntryCreateViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.tracker = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+        self.client.force_login(self.user)
+
+    def _post(self, payload):
+        return self.client.post(reverse("tracker:entry_create"), payload, content_type="application/json")
+
+    def test_month_view_get_is_read_only(self):
+        response = self.client.get(reverse("tracker:month_view", args=[2026, 5]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(DailySnapshot.objects.exists())
+
+    def test_first_write_creates_snapshot(self):
+        response = self._post({"tracker_id": self.tracker.id, "date": "2026-05-04", "number_value": "12"})
+
+        self.assertEqual(response.status_code, 200)
+        snapshot = DailySnapshot.objects.get(user=self.user)
+        self.assertEqual(snapshot.date, date(2026, 5, 4))
+        self.assertEqual(Entry.objects.get(daily_snapshot=snapshot).number_value, Decimal("12"))
+
+    def test_update_overwrites_same_entry(self):
+        first = self._post({"tracker_id": self.tracker.id, "date": "2026-05-04", "number_value": "12"}).json()
+        second = self._post({"tracker_id": self.tracker.id, "date": "2026-05-04", "number_value": "15"}).json()
+
+        self.assertEqual(first["entry_id"], second["entry_id"])
+        self.assertEqual(Entry.objects.get().number_value, Decimal("15"))
+
+    def test_invalid_value_writes_nothing(self):
+        rating = Tracker.objects.create(user=self.user, name="Mood", tracker_type="rating", min_value=1, max_value=5)
+
+        response = self._post({"tracker_id": rating.id, "date": "2026-05-04", "rating_value": 8})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(DailySnapshot.objects.exists())
+        self.assertFalse(Entry.objects.exists())
+
+    def test_invalid_number_is_a_validation_error(self):
+        response = self._post({"tracker_id": self.tracker.id, "date": "2026-05-04", "number_value": "abc"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_cell_edit_uses_two_write_statements(self):
+        self._post({"tracker_id": self.tracker.id, "date": "2026-05-04", "number_value": "12"})
+
+        # session, user, tracker lookup, savepoint, snapshot upsert,
+        # entry upsert, rollup read + upsert, release
+        with self.assertNumQueries(9):
+            self._post({"tracker_id": self.tracker.id, "date": "2026-05-04", "number_value": "13"})
+
+    def test_delete_without_snapshot_does_not_create_one(self):
+        response = self._post({"tracker_id": self.tracker.id, "date": "2026-05-04", "delete_entry": True})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(DailySnapshot.objects.exists())
+
+
+class CacheGenerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_changes_month_keys(self):
+        before = get_month_cache_key(1, 2026, 5)
+
+        bump_user_cache_generation(1)
+
+        self.assertNotEqual(get_month_cache_key(1, 2026, 5), before)
+        self.assertEqual(get_month_cache_key(2, 2026, 5), get_month_cache_key(2, 2026, 5))
+
+    def test_bump_without_counter_seeds_generation(self):
+        bump_user_cache_generation(1)
+
+        self.assertIsNotNone(get_user_cache_generation(1))
+
+    def test_evicted_generation_does_not_restart_at_old_value(self):
+        old = get_user_cache_generation(1)
+        cache.delete("tracker_cache_gen_1")
+
+        self.assertGreaterEqual(get_user_cache_generation(1), old)
+
+
+class MonthViewCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.tracker = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+        self.client.force_login(self.user)
+        self.url = reverse("tracker:month_view", args=[2026, 5])
+
+    def _cell(self, response, day):
+        days = [d for week in response.json()["weeks"] for d in week]
+        return days[day - 1]["entries"].get(str(self.tracker.id))
+
+    def _save(self, date_str, value):
+        return self.client.post(
+            reverse("tracker:entry_create"),
+            {"tracker_id": self.tracker.id, "date": date_str, "number_value": value},
+            content_type="application/json",
+        )
+
+    def test_second_request_is_served_from_cache(self):
+        self.client.get(self.url)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("today", response.json())
+        self.assertEqual(get_month_cache_stats()["hits"], 1)
+        self.assertEqual(get_month_cache_stats()["misses"], 1)
+
+    def test_entry_write_invalidates_month(self):
+        self.client.get(self.url)
+        self._save("2026-05-03", "7")
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(self._cell(response, 3)["number_value"], "7.00")
+
+    def test_build_racing_an_entry_write_is_not_cached(self):
+        build = MonthView.build_month_data
+
+        def build_then_write(view, *args, **kwargs):
+            data = build(view, *args, **kwargs)
+            self._save("2026-05-03", "7")
+            return data
+
+        with patch.object(MonthView, "build_month_data", build_then_write):
+            self.client.get(self.url)
+        response = self.client.get(self.url)
+
+        self.assertEqual(self._cell(response, 3)["number_value"], "7.00")
+        self.assertEqual(get_month_cache_stats()["hits"], 0)
+
+    def test_entry_delete_invalidates_month(self):
+        entry_id = self._save("2026-05-03", "7").json()["entry_id"]
+        self.client.get(self.url)
+
+        self.client.delete(reverse("tracker:entry_delete", args=[entry_id]))
+        response = self.client.get(self.url)
+
+        self.assertIsNone(self._cell(response, 3))
+
+    def test_tracker_update_invalidates_all_months(self):
+        self.client.get(self.url)
+        self.client.get(reverse("tracker:month_view", args=[2026, 6]))
+
+        self.client.patch(
+            reverse("tracker:tracker_update", args=[self.tracker.id]),
+            {"name": "Walk"},
+            content_type="application/json",
+        )
+
+        for month in (5, 6):
+            response = self.client.get(reverse("tracker:month_view", args=[2026, month]))
+            self.assertEqual(response.json()["trackers"][0]["name"], "Walk")
+
+    def test_tracker_delete_invalidates_months(self):
+        self.client.get(self.url)
+
+        self.client.delete(reverse("tracker:tracker_delete", args=[self.tracker.id]))
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()["trackers"], [])
+
+
+class MonthViewColumnarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.client.force_login(self.user)
+        self.trackers = {
+            tracker_type: Tracker.objects.create(
+                user=self.user, name=tracker_type, tracker_type=tracker_type, display_order=i,
+                min_value=1 if tracker_type == "rating" else None,
+                max_value=5 if tracker_type == "rating" else None,
+            )
+            for i, tracker_type in enumerate(["binary", "number", "time", "duration", "text", "rating", "prayer"])
+        }
+        values = {
+            "binary": {"binary_value": True},
+            "number": {"number_value": "2.5"},
+            "time": {"time_value": "07:30"},
+            "duration": {"duration_minutes": 90},
+            "text": {"text_value": "hello"},
+            "rating": {"rating_value": 4},
+            "prayer": {"prayer_values": {"fajr": True, "isha": False}},
+        }
+        for tracker_type, payload in values.items():
+            self.client.post(
+                reverse("tracker:entry_create"),
+                {"tracker_id": self.trackers[tracker_type].id, "date": "2026-05-10", **payload},
+                content_type="application/json",
+            )
+
+    def test_columnar_matches_grid(self):
+        url = reverse("tracker:month_view", args=[2026, 5])
+        grid = self.client.get(url).json()
+        columnar = self.client.get(url, {"layout": "columnar"}).json()
+
+        self.assertEqual(columnar["layout"], "columnar")
+        self.assertEqual(columnar["weeks"], [[day["day"] for day in week] for week in grid["weeks"]])
+        grid_cells = grid["weeks"][1][6]["entries"]
+        for tracker_type, tracker in self.trackers.items():
+            column = columnar["values"][str(tracker.id)]
+            cell = grid_cells[str(tracker.id)]
+            field = {"duration": "duration_minutes", "prayer": "prayer_values"}.get(tracker_type, f"{tracker_type}_value")
+            self.assertEqual(len(column), 31)
+            self.assertEqual(column[9], cell[field])
+            self.assertEqual(column[8], None)
+            self.assertEqual(columnar["entry_ids"][str(tracker.id)], {"10": cell["id"]})
+
+    def test_unknown_layout_is_rejected(self):
+        response = self.client.get(reverse("tracker:month_view", args=[2026, 5]), {"layout": "xml"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.tracker = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+        self.client.force_login(self.user)
+        self.month_url = reverse("tracker:month_view", args=[2026, 5])
+        self.list_url = reverse("tracker:tracker_list")
+
+    def test_month_view_returns_304_for_matching_etag(self):
+        etag = self.client.get(self.month_url)["ETag"]
+
+        response = self.client.get(self.month_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_month_etag_changes_after_entry_write(self):
+        etag = self.client.get(self.month_url)["ETag"]
+        self.client.post(
+            reverse("tracker:entry_create"),
+            {"tracker_id": self.tracker.id, "date": "2026-05-02", "number_value": "3"},
+            content_type="application/json",
+        )
+
+        response = self.client.get(self.month_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_month_etag_depends_on_layout(self):
+        grid = self.client.get(self.month_url)["ETag"]
+
+        response = self.client.get(self.month_url, {"layout": "columnar"}, HTTP_IF_NONE_MATCH=grid)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_tracker_list_returns_304_until_tracker_changes(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.patch(
+            reverse("tracker:tracker_update", args=[self.tracker.id]),
+            {"name": "Walk"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class SyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.tracker = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+        self.client.force_login(self.user)
+        self.url = reverse("tracker:sync")
+
+    def _save(self, date_str, value):
+        return self.client.post(
+            reverse("tracker:entry_create"),
+            {"tracker_id": self.tracker.id, "date": date_str, "number_value": value},
+            content_type="application/json",
+        ).json()["entry_id"]
+
+    def _rewind_cursor(self, cursor):
+        # Move everything written so far before the cursor
+        Entry.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        Tracker.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        return cursor
+
+    def test_full_sync_returns_everything(self):
+        entry_id = self._save("2026-05-01", "3")
+
+        data = self.client.get(self.url).json()
+
+        self.assertEqual([t["id"] for t in data["trackers"]], [self.tracker.id])
+        self.assertEqual([e["id"] for e in data["entries"]], [entry_id])
+        self.assertEqual(data["entries"][0]["date"], "2026-05-01")
+        self.assertFalse(data["has_more"])
+
+    def test_entry_page_reads_only_the_entry_table(self):
+        self._save("2026-05-01", "3")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+
+        entry_queries = [q["sql"] for q in queries if 'FROM "tracker_entry"' in q["sql"]]
+        self.assertEqual(len(entry_queries), 1)
+        self.assertNotIn("JOIN", entry_queries[0])
+
+    def test_incremental_sync_returns_only_changes_and_deletions(self):
+        old_id = self._save("2026-05-01", "3")
+        gone_id = self._save("2026-05-02", "4")
+        cursor = self._rewind_cursor(self.client.get(self.url).json()["cursor"])
+
+        new_id = self._save("2026-05-03", "5")
+        self.client.delete(reverse("tracker:entry_delete", args=[gone_id]))
+        data = self.client.get(self.url, {"cursor": cursor}).json()
+
+        self.assertEqual([e["id"] for e in data["entries"]], [new_id])
+        self.assertNotIn(old_id, [e["id"] for e in data["entries"]])
+        self.assertEqual(data["trackers"], [])
+        self.assertEqual(data["deleted"]["entries"], [gone_id])
+
+    def test_tracker_deletion_is_reported(self):
+        cursor = self._rewind_cursor(self.client.get(self.url).json()["cursor"])
+
+        self.client.delete(reverse("tracker:tracker_delete", args=[self.tracker.id]))
+        data = self.client.get(self.url, {"cursor": cursor}).json()
+
+        self.assertEqual(data["deleted"]["trackers"], [self.tracker.id])
+
+    def test_paging_walks_all_entries(self):
+        ids = [self._save(f"2026-05-{day:02d}", str(day)) for day in range(1, 6)]
+        Entry.objects.update(updated_at=timezone.now())  # identical timestamps
+
+        seen, cursor = [], None
+        for _ in range(10):
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            data = self.client.get(self.url, params).json()
+            seen += [e["id"] for e in data["entries"]]
+            cursor = data["cursor"]
+            if not data["has_more"]:
+                break
+
+        self.assertEqual(sorted(seen), sorted(ids))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {"cursor": "yesterday"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class EntryBatchViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.steps = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+        self.mood = Tracker.objects.create(user=self.user, name="Mood", tracker_type="rating", min_value=1, max_value=5)
+        self.client.force_login(self.user)
+        self.url = reverse("tracker:entry_batch")
+
+    def _post(self, items):
+        return self.client.post(self.url, {"items": items}, content_type="application/json")
+
+    def test_creates_updates_and_reports_per_item(self):
+        existing = DailySnapshot.objects.create(user=self.user, date=date(2026, 5, 1))
+        old = Entry.objects.create(tracker=self.steps, daily_snapshot=existing, number_value=Decimal("1"))
+
+        response = self._post([
+            {"tracker_id": self.steps.id, "date": "2026-05-01", "number_value": "10"},
+            {"tracker_id": self.steps.id, "date": "2026-05-02", "number_value": "20"},
+            {"tracker_id": self.mood.id, "date": "2026-05-02", "rating_value": 9},
+            {"tracker_id": 999, "date": "2026-05-02", "number_value": "1"},
+        ])
+
+        results = response.json()["results"]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(results[0], {"success": True, "entry_id": old.id, "created": False})
+        self.assertTrue(results[1]["created"])
+        self.assertEqual(results[2], {"success": False, "error": "Rating must be at most 5"})
+        self.assertEqual(results[3], {"success": False, "error": "Tracker not found"})
+        self.assertEqual(Entry.objects.get(id=old.id).number_value, Decimal("10"))
+        self.assertEqual(Entry.objects.get(id=results[1]["entry_id"]).number_value, Decimal("20"))
+        self.assertEqual(Entry.objects.count(), 2)
+
+    def test_out_of_range_values_fail_per_item(self):
+        gym = Tracker.objects.create(user=self.user, name="Gym", tracker_type="binary")
+
+        response = self._post([
+            {"tracker_id": self.steps.id, "date": "2026-05-01", "number_value": "1e20"},
+            {"tracker_id": self.steps.id, "date": "2026-05-02", "number_value": "Infinity"},
+            {"tracker_id": self.steps.id, "date": "2026-05-03", "number_value": "NaN"},
+            {"tracker_id": self.steps.id, "date": "2026-05-04", "number_value": "99999999.999"},
+            {"tracker_id": gym.id, "date": "2026-05-05", "binary_value": "yes"},
+            {"tracker_id": self.steps.id, "date": "2026-05-06", "number_value": "-99999999.99"},
+        ])
+
+        results = response.json()["results"]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(results[0], {"success": False, "error": "Number out of range: 1e20"})
+        self.assertEqual(results[1], {"success": False, "error": "Number out of range: Infinity"})
+        self.assertEqual(results[2], {"success": False, "error": "Number out of range: NaN"})
+        self.assertFalse(results[3]["success"])
+        self.assertEqual(results[4], {"success": False, "error": "Binary value must be true or false"})
+        self.assertTrue(results[5]["success"])
+        self.assertEqual(Entry.objects.get().number_value, Decimal("-99999999.99"))
+
+    def test_later_item_for_same_cell_wins(self):
+        results = self._post([
+            {"tracker_id": self.steps.id, "date": "2026-05-01", "number_value": "1"},
+            {"tracker_id": self.steps.id, "date": "2026-05-01", "number_value": "2"},
+        ]).json()["results"]
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(Entry.objects.get().number_value, Decimal("2"))
+
+    def test_delete_items(self):
+        entry_id = self._post([{"tracker_id": self.steps.id, "date": "2026-05-01", "number_value": "1"}]).json()["results"][0]["entry_id"]
+
+        results = self._post([{"tracker_id": self.steps.id, "date": "2026-05-01", "delete_entry": True}]).json()["results"]
+
+        self.assertEqual(results, [{"success": True}])
+        self.assertFalse(Entry.objects.filter(id=entry_id).exists())
+
+    def test_query_count_is_bounded(self):
+        items = [
+            {"tracker_id": tracker.id, "date": f"2026-05-{day:02d}", **value}
+            for day in range(1, 29)
+            for tracker, value in ((self.steps, {"number_value": day}), (self.mood, {"rating_value": 3}))
+        ]
+        # session, user, trackers, savepoint, snapshot insert + select,
+        # existing entries, upsert, rollup read + upsert, release
+        with self.assertNumQueries(11):
+            self._post(items)
+
+    def test_invalidates_touched_months(self):
+        month_url = reverse("tracker:month_view", args=[2026, 5])
+        self.client.get(month_url)
+
+        self._post([{"tracker_id": self.steps.id, "date": "2026-05-03", "number_value": "7"}])
+        days = [d for week in self.client.get(month_url).json()["weeks"] for d in week]
+
+        self.assertEqual(days[2]["entries"][str(self.steps.id)]["number_value"], "7.00")
+
+    def test_rejects_empty_or_oversized_batches(self):
+        self.assertEqual(self._post([]).status_code, 400)
+        self.assertEqual(self._post([{}] * 501).status_code, 400)
+
+
+class MonthStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.client.force_login(self.user)
+
+    def _tracker(self, tracker_type, **kwargs):
+        return Tracker.objects.create(user=self.user, name=tracker_type, tracker_type=tracker_type, **kwargs)
+
+    def _entry(self, tracker, day, **values):
+        snapshot, _ = DailySnapshot.objects.get_or_create(user=self.user, date=date(2026, 6, day))
+        Entry.objects.create(tracker=tracker, daily_snapshot=snapshot, **values)
+
+    def test_type_aware_week_and_month_stats(self):
+        # June 2026 starts on a Monday: weeks are 1-7, 8-14, 15-21, 22-28, 29-30
+        binary = self._tracker("binary")
+        number = self._tracker("number")
+        duration = self._tracker("duration")
+        prayer = self._tracker("prayer")
+        text = self._tracker("text")
+        self._entry(binary, 1, binary_value=True)
+        self._entry(binary, 2, binary_value=False)
+        self._entry(binary, 9, binary_value=True)
+        self._entry(number, 1, number_value=Decimal("2"))
+        self._entry(number, 3, number_value=Decimal("5"))
+        self._entry(number, 30, number_value=Decimal("8"))
+        self._entry(duration, 4, duration_minutes=30)
+        self._entry(duration, 5, duration_minutes=45)
+        self._entry(prayer, 1, prayer_values={"fajr": True, "dhuhr": True, "asr": False, "maghrib": None, "isha": True})
+        self._entry(prayer, 2, prayer_values={"fajr": True, "dhuhr": False, "asr": False, "maghrib": False, "isha": False})
+        self._entry(text, 2, text_value="note")
+        self._entry(text, 3, text_value="")
+
+        trackers = Tracker.objects.filter(user=self.user)
+        with self.assertNumQueries(2):
+            stats = MonthDataBuilder(self.user, 2026, 6).build_stats(trackers)
+
+        week1, month = stats["weeks"][0], stats["month"]
+        self.assertEqual(len(stats["weeks"]), 5)
+        self.assertEqual(week1[binary.id], {"days": 7, "completed": 1, "completion_rate": round(1 / 7, 4)})
+        self.assertEqual(month[binary.id]["completed"], 2)
+        self.assertEqual(week1[number.id], {"count": 2, "mean": 3.5})
+        self.assertEqual(stats["weeks"][4][number.id], {"count": 1, "mean": 8.0})
+        self.assertEqual(month[number.id], {"count": 3, "mean": 5.0})
+        self.assertEqual(month[duration.id], {"count": 2, "total": 75})
+        self.assertEqual(week1[prayer.id]["per_prayer"], {"fajr": 2, "dhuhr": 1, "asr": 0, "maghrib": 0, "isha": 1})
+        self.assertEqual(week1[prayer.id]["possible"], 35)
+        self.assertEqual(week1[text.id], {"days": 7, "filled": 1})
+        self.assertEqual(stats["weeks"][1][number.id], {"count": 0, "mean": None})
+
+    def test_month_view_includes_stats_on_request(self):
+        tracker = self._tracker("binary")
+        self._entry(tracker, 1, binary_value=True)
+        url = reverse("tracker:month_view", args=[2026, 6])
+
+        self.assertNotIn("stats", self.client.get(url).json())
+        data = self.client.get(url, {"stats": "1"}).json()
+
+        self.assertEqual(data["stats"]["month"][str(tracker.id)]["completed"], 1)
+
+
+class TrackerRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.steps = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+        self.gym = Tracker.objects.create(user=self.user, name="Gym", tracker_type="binary")
+        self.client.force_login(self.user)
+
+    def _save(self, tracker, date_str, **values):
+        return self.client.post(
+            reverse("tracker:entry_create"),
+            {"tracker_id": tracker.id, "date": date_str, **values},
+            content_type="application/json",
+        )
+
+    def _rollups(self):
+        return {
+            (r.tracker_id, r.granularity, r.period_start): (
+                r.entry_count, r.value_count, r.value_sum, r.value_min, r.value_max, r.completed_count
+            )
+            for r in TrackerRollup.objects.all()
+        }
+
+    def test_writes_maintain_week_and_month_rollups(self):
+        # 2026-05-31 is a Sunday; 2026-06-01 starts a new week and month
+        self._save(self.steps, "2026-05-30", number_value="10")
+        self._save(self.steps, "2026-05-31", number_value="4")
+        self._save(self.steps, "2026-06-01", number_value="7")
+        self._save(self.steps, "2026-05-31", number_value="6")
+
+        month = TrackerRollup.objects.get(tracker=self.steps, granularity="month", period_start=date(2026, 5, 1))
+        week = TrackerRollup.objects.get(tracker=self.steps, granularity="week", period_start=date(2026, 5, 25))
+        self.assertEqual((month.entry_count, month.value_sum, month.value_min, month.value_max), (2, 16, 6, 10))
+        self.assertEqual((week.entry_count, week.value_sum), (2, 16))
+        self.assertTrue(TrackerRollup.objects.filter(granularity="week", period_start=date(2026, 6, 1)).exists())
+
+    def test_deletes_update_and_drop_rollups(self):
+        entry_id = self._save(self.gym, "2026-05-05", binary_value=True).json()["entry_id"]
+        self._save(self.gym, "2026-05-06", binary_value=False)
+        self.assertEqual(TrackerRollup.objects.get(granularity="month").completed_count, 1)
+
+        self.client.delete(reverse("tracker:entry_delete", args=[entry_id]))
+        self.assertEqual(TrackerRollup.objects.get(granularity="month").completed_count, 0)
+
+        self._save(self.gym, "2026-05-06", delete_entry=True)
+        self.assertFalse(TrackerRollup.objects.exists())
+
+    def test_incremental_rollups_match_rebuild(self):
+        self.client.post(
+            reverse("tracker:entry_batch"),
+            {"items": [
+                {"tracker_id": tracker.id, "date": f"2026-04-{day:02d}", **values}
+                for day in range(1, 31)
+                for tracker, values in (
+                    (self.steps, {"number_value": str(day * 3 % 7)}),
+                    (self.gym, {"binary_value": day % 3 == 0}),
+                )
+            ]},
+            content_type="application/json",
+        )
+        self._save(self.steps, "2026-04-10", delete_entry=True)
+        incremental = self._rollups()
+
+        call_command("rebuild_rollups", stdout=StringIO())
+
+        self.assertEqual(self._rollups(), incremental)
+
+    def test_rollup_endpoint(self):
+        self._save(self.steps, "2026-05-30", number_value="10")
+        self._save(self.steps, "2026-07-01", number_value="2")
+
+        response = self.client.get(
+            reverse("tracker:tracker_rollups", args=[self.steps.id]),
+            {"granularity": "month", "from": "2026-06-01"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["period_start"] for r in response.json()], ["2026-07-01"])
+
+
+class TrackerStreakTests(TestCase):
+    """Incremental streak state against a brute-force recomputation."""
+
+    START = date(2026, 3, 1)
+    DAYS = 40
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.gym = Tracker.objects.create(user=self.user, name="Gym", tracker_type="binary")
+        self.salah = Tracker.objects.create(user=self.user, name="Salah", tracker_type="prayer")
+        self.client.force_login(self.user)
+
+    def _values(self, tracker, rng):
+        if tracker.tracker_type == "binary":
+            return {"binary_value": rng.random() < 0.7}
+        missed = rng.random() < 0.3
+        return {"prayer_values": {name: not (missed and name == "asr") for name in PRAYER_NAMES}}
+
+    def _write(self, tracker, day, values):
+        entry = Entry(tracker=tracker)
+        entry.set_value_from_data(values)
+        save_entry(self.user, entry, day)
+
+    def _delete(self, tracker, day):
+        delete_entries(self.user, Entry.objects.filter(tracker=tracker, daily_snapshot__date=day))
+
+    def _brute_force(self, tracker):
+        completed = []
+        for entry in Entry.objects.filter(tracker=tracker).select_related("daily_snapshot"):
+            if tracker.tracker_type == "binary":
+                done = entry.binary_value is True
+            else:
+                done = all(entry.prayer_values.get(name) is True for name in PRAYER_NAMES)
+            if done:
+                completed.append(entry.daily_snapshot.date)
+        latest, longest = find_runs(sorted(completed))
+        return latest, run_length(longest)
+
+    def _assert_matches_brute_force(self, tracker, context):
+        streak = TrackerStreak.objects.filter(tracker=tracker).first()
+        latest = (streak.run_start, streak.run_end) if streak and streak.run_end else None
+        longest = run_length((streak.longest_start, streak.longest_end)) if streak and streak.longest_end else 0
+        self.assertEqual((latest, longest), self._brute_force(tracker), context)
+
+    def test_random_single_day_edits_match_brute_force(self):
+        for seed in range(4):
+            rng = random.Random(seed)
+            for step in range(80):
+                tracker = rng.choice([self.gym, self.salah])
+                day = self.START + timedelta(days=rng.randrange(self.DAYS))
+                if rng.random() < 0.2:
+                    self._delete(tracker, day)
+                else:
+                    self._write(tracker, day, self._values(tracker, rng))
+                self._assert_matches_brute_force(tracker, f"seed {seed}, step {step}")
+            Entry.objects.all().delete()
+            TrackerStreak.objects.all().delete()
+
+    def test_random_batches_match_brute_force(self):
+        rng = random.Random(42)
+        for step in range(15):
+            items = []
+            for _ in range(rng.randint(1, 10)):
+                tracker = rng.choice([self.gym, self.salah])
+                day = self.START + timedelta(days=rng.randrange(self.DAYS))
+                if rng.random() < 0.2:
+                    values = {"delete_entry": True}
+                else:
+                    values = self._values(tracker, rng)
+                items.append({"tracker_id": tracker.id, "date": day.isoformat(), **values})
+            EntryBatchUpserter(self.user, items).apply()
+            for tracker in (self.gym, self.salah):
+                self._assert_matches_brute_force(tracker, f"step {step}")
+
+    def test_head_edits_use_constant_queries(self):
+        for offset in range(200):
+            self._write(self.gym, self.START + timedelta(days=offset), {"binary_value": True})
+
+        head = self.START + timedelta(days=200)
+        snapshot = DailySnapshot.objects.create(user=self.user, date=head)
+        Entry.objects.create(tracker=self.gym, daily_snapshot=snapshot, binary_value=True)
+
+        # state, completion check, state update
+        with self.assertNumQueries(3):
+            streak = apply_streak_change(self.gym, head)
+        self.assertEqual((streak.run_start, streak.run_end), (self.START, head))
+
+    def test_tracker_list_and_month_view_expose_streaks(self):
+        today = date.today()
+        for offset in range(1, 4):
+            self._write(self.gym, today - timedelta(days=offset), {"binary_value": True})
+        steps = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+
+        trackers = {t["id"]: t for t in self.client.get(reverse("tracker:tracker_list")).json()}
+        month = self.client.get(reverse("tracker:month_view", args=[today.year, today.month])).json()
+
+        expected = {"current": 3, "longest": 3, "last_completed": (today - timedelta(days=1)).isoformat()}
+        self.assertEqual(trackers[self.gym.id]["streak"], expected)
+        self.assertEqual(trackers[self.salah.id]["streak"], {"current": 0, "longest": 0, "last_completed": None})
+        self.assertIsNone(trackers[steps.id]["streak"])
+        self.assertEqual(month["streaks"][str(self.gym.id)], expected)
+
+    def test_streak_is_not_current_after_a_missed_day(self):
+        today = date.today()
+        for offset in range(2, 6):
+            self._write(self.gym, today - timedelta(days=offset), {"binary_value": True})
+
+        streak = self.client.get(reverse("tracker:tracker_list")).json()[0]["streak"]
+
+        self.assertEqual((streak["current"], streak["longest"]), (0, 4))
+
+    def test_entry_write_changes_tracker_list_etag(self):
+        url = reverse("tracker:tracker_list")
+        etag = self.client.get(url)["ETag"]
+
+        self.client.post(
+            reverse("tracker:entry_create"),
+            {"tracker_id": self.gym.id, "date": date.today().isoformat(), "binary_value": True},
+            content_type="application/json",
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["streak"]["current"], 1)
+
+
+class EntryEncoderTests(TestCase):
+    """The values()-based encoder must render exactly like the DRF serializers."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        snapshot = DailySnapshot.objects.create(user=self.user, date=date(2026, 5, 4))
+        values = [
+            ("binary", {"binary_value": True}),
+            ("binary", {"binary_value": None}),
+            ("number", {"number_value": Decimal("12.5")}),
+            ("number", {"number_value": Decimal("-0.07")}),
+            ("time", {"time_value": "07:45"}),
+            ("duration", {"duration_minutes": 95}),
+            ("text", {"text_value": "Felt great"}),
+            ("rating", {"rating_value": 4}),
+            ("prayer", {"prayer_values": {"fajr": True, "dhuhr": False, "asr": None}}),
+        ]
+        for i, (tracker_type, data) in enumerate(values):
+            tracker = Tracker.objects.create(user=self.user, name=f"T{i}", tracker_type=tracker_type)
+            entry = Entry(tracker=tracker, daily_snapshot=snapshot)
+            entry.set_value_from_data(data)
+            entry.save()
+
+    def test_matches_entry_serializer(self):
+        entries = Entry.objects.order_by("id")
+
+        self.assertEqual(
+            ENTRY_ENCODER.encode_queryset(entries),
+            [dict(data) for data in EntrySerializer(entries, many=True).data],
+        )
+
+    def test_matches_sync_entry_serializer(self):
+        entries = Entry.objects.order_by("id")
+
+        self.assertEqual(
+            SYNC_ENTRY_ENCODER.encode_queryset(entries),
+            [dict(data) for data in SyncEntrySerializer(entries, many=True).data],
+        )
+
+    def test_matches_in_other_time_zones(self):
+        entries = Entry.objects.order_by("id")
+
+        with timezone.override("Asia/Karachi"):
+            encoded = ENTRY_ENCODER.encode_queryset(entries)
+            serialized = [dict(data) for data in EntrySerializer(entries, many=True).data]
+
+        self.assertEqual(encoded, serialized)
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.steps = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number", display_order=0)
+        self.gym = Tracker.objects.create(user=self.user, name="Gym", tracker_type="binary", display_order=1)
+        self.wake = Tracker.objects.create(user=self.user, name="Wake", tracker_type="time", display_order=2)
+        self.salah = Tracker.objects.create(user=self.user, name="Salah", tracker_type="prayer", display_order=3)
+        self.client.force_login(self.user)
+
+        self._write(self.steps, date(2026, 5, 1), number_value="12.5")
+        self._write(self.gym, date(2026, 5, 1), binary_value=True)
+        self._write(self.wake, date(2026, 5, 3), time_value="06:45")
+        self._write(self.salah, date(2026, 5, 3), prayer_values={"fajr": True})
+        self._write(self.gym, date(2026, 6, 1), binary_value=False)
+
+    def _write(self, tracker, day, **values):
+        entry = Entry(tracker=tracker)
+        entry.set_value_from_data(values)
+        save_entry(self.user, entry, day)
+
+    def _export(self, **params):
+        response = self.client.get(reverse("tracker:export"), params)
+        return response, b"".join(response.streaming_content).decode() if response.streaming else None
+
+    def test_tracker_created_while_streaming_is_left_out(self):
+        exporter = EntryExporter(self.user)
+        mood = Tracker.objects.create(user=self.user, name="Mood", tracker_type="rating")
+        self._write(mood, date(2026, 5, 1), rating_value=4)
+
+        days = dict(exporter.iter_days())
+
+        self.assertNotIn(mood.id, days[date(2026, 5, 1)])
+        self.assertEqual(days[date(2026, 5, 1)][self.steps.id], "12.50")
+
+    def test_csv_pivots_trackers_into_columns(self):
+        response, content = self._export(format="csv")
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(content.splitlines(), [
+            "date,Steps,Gym,Wake,Salah",
+            "2026-05-01,12.50,true,,",
+            '2026-05-03,,,06:45,"{""fajr"": true, ""dhuhr"": null, ""asr"": null, ""maghrib"": null, ""isha"": null}"',
+            "2026-06-01,,false,,",
+        ])
+
+    def test_ndjson_with_date_range(self):
+        response, content = self._export(format="ndjson", **{"from": "2026-05-02", "to": "2026-05-31"})
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["date"], "2026-05-03")
+        self.assertEqual(rows[0]["Wake"], "06:45")
+        self.assertIs(rows[0]["Salah"]["fajr"], True)
+
+    def test_only_exports_own_entries(self):
+        other = User.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        tracker = Tracker.objects.create(user=other, name="Secret", tracker_type="number")
+        entry = Entry(tracker=tracker, number_value=Decimal(1))
+        save_entry(other, entry, date(2026, 5, 2))
+
+        _, content = self._export(format="csv")
+
+        self.assertNotIn("Secret", content)
+        self.assertNotIn("2026-05-02", content)
+
+    def test_rejects_unknown_format_and_bad_dates(self):
+        self.assertEqual(self._export(format="xml")[0].status_code, 400)
+        self.assertEqual(self._export(**{"from": "May"})[0].status_code, 400)
+        self.assertEqual(self._export(**{"from": "2026-06-01", "to": "2026-05-01"})[0].status_code, 400)
+
+
+class EntryImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.steps = Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+        self.client.force_login(self.user)
+
+    def _upload(self, content, name="history.csv"):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(reverse("tracker:import"), {"file": upload})
+
+    def test_imports_rows_and_creates_trackers(self):
+        response = self._upload(
+            "date,steps,Gym,Sleep [duration],Wake\n"
+            "2026-05-01,1200,yes,420,06:30\n"
+            "2026-05-02,,no,390,07:05:00\n"
+        )
+
+        report = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((report["rows"], report["cells"], report["error_count"]), (2, 7, 0))
+        self.assertEqual(report["created_trackers"], ["Gym", "Sleep", "Wake"])
+        types = dict(Tracker.objects.filter(user=self.user).values_list("name", "tracker_type"))
+        self.assertEqual(types, {"Steps": "number", "Gym": "binary", "Sleep": "duration", "Wake": "time"})
+        self.assertEqual(Entry.objects.get(tracker=self.steps).number_value, Decimal("1200"))
+        self.assertEqual(Entry.objects.get(tracker__name="Wake", date=date(2026, 5, 2)).time_value.minute, 5)
+        self.assertEqual(TrackerRollup.objects.get(tracker__name="Gym", granularity="month").completed_count, 1)
+
+    def test_reports_errors_per_row_and_column(self):
+        Tracker.objects.create(user=self.user, name="Mood", tracker_type="rating", min_value=1, max_value=5)
+
+        report = self._upload(
+            "date,Steps,Mood\n"
+            "2026-05-01,lots,3\n"
+            "yesterday,10,3\n"
+            "2026-05-03,10,9\n"
+        ).json()
+
+        self.assertEqual(report["cells"], 2)
+        self.assertEqual(report["errors"], [
+            {"row": 2, "column": "Steps", "error": "Invalid number: lots"},
+            {"row": 3, "column": "date", "error": "Invalid date format. Use YYYY-MM-DD."},
+            {"row": 4, "column": "Mood", "error": "Rating must be at most 5"},
+        ])
+
+    def test_reimporting_an_export_overwrites_cells(self):
+        gym = Tracker.objects.create(user=self.user, name="Gym", tracker_type="binary")
+        for day, steps in ((1, "10"), (2, "20")):
+            entry = Entry(tracker=self.steps)
+            entry.set_value_from_data({"number_value": steps})
+            save_entry(self.user, entry, date(2026, 5, day))
+        entry = Entry(tracker=gym)
+        entry.set_value_from_data({"binary_value": True})
+        save_entry(self.user, entry, date(2026, 5, 2))
+        exported = b"".join(self.client.get(reverse("tracker:export")).streaming_content).decode()
+
+        report = self._upload(exported.replace("10.00", "15"), "export.csv").json()
+
+        self.assertEqual(report["error_count"], 0)
+        self.assertEqual(report["created_trackers"], [])
+        self.assertEqual(Entry.objects.count(), 3)
+        self.assertEqual(Entry.objects.get(tracker=self.steps, date=date(2026, 5, 1)).number_value, Decimal("15"))
+
+    def test_rejects_bad_files(self):
+        self.assertEqual(self._upload("day,Steps\n2026-05-01,1\n").status_code, 400)
+        self.assertEqual(self._upload("", "empty.csv").status_code, 400)
+        self.assertEqual(self._upload("date\n", "notes.txt").status_code, 400)
+
+    def test_imports_xlsx_workbook(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["date", "Steps", "Gym", "Wake"])
+        sheet.append([datetime(2026, 5, 1), 1200, True, time(6, 30)])
+        sheet.append([date(2026, 5, 2), 800.5, False, "07:05"])
+        sheet.append(["2026-05-03", None, True, None])
+        buffer = BytesIO()
+        workbook.save(buffer)
+        upload = SimpleUploadedFile("history.xlsx", buffer.getvalue())
+
+        response = self.client.post(reverse("tracker:import"), {"file": upload})
+
+        report = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((report["rows"], report["cells"], report["error_count"]), (3, 7, 0))
+        self.assertEqual(report["created_trackers"], ["Gym", "Wake"])
+        steps = dict(Entry.objects.filter(tracker=self.steps).values_list("date", "number_value"))
+        self.assertEqual(steps, {date(2026, 5, 1): Decimal("1200"), date(2026, 5, 2): Decimal("800.50")})
+        self.assertEqual(Entry.objects.get(tracker__name="Wake", date=date(2026, 5, 1)).time_value, time(6, 30))
+        gym = Tracker.objects.get(user=self.user, name="Gym")
+        self.assertEqual(gym.tracker_type, "binary")
+        self.assertEqual(TrackerRollup.objects.get(tracker=gym, granularity="month").completed_count, 2)
+        self.assertEqual(TrackerRollup.objects.get(tracker=self.steps, granularity="month").entry_count, 2)
+
+    def test_rejects_unreadable_xlsx(self):
+        response = self._upload("not a workbook", "history.xlsx")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unreadable XLSX file", response.json()["error"])
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as file:
+            file.write("date,Steps\n2026-05-01,5\n2026-05-02,6\n")
+        self.addCleanup(os.remove, file.name)
+        out = StringIO()
+
+        call_command("import_entries", file.name, user="alice@example.com", stdout=out)
+
+        self.assertIn("Imported 2 cells from 2 rows", out.getvalue())
+        self.assertEqual(Entry.objects.filter(tracker=self.steps).count(), 2)
+
+
+class CreateDemoUserTests(TestCase):
+    def test_demo_data_has_rollups_and_streaks(self):
+        call_command("create_demo_user", stdout=StringIO())
+
+        demo = User.objects.get(username="demo")
+        self.assertEqual(Tracker.objects.filter(user=demo).count(), 12)
+        rollups = TrackerRollup.objects.filter(tracker__user=demo, tracker__name="Mood", granularity="month")
+        self.assertEqual(rollups.get().entry_count, 31)
+        streak = TrackerStreak.objects.get(tracker__user=demo, tracker__name="Exercise")
+        self.assertIsNotNone(streak.longest_start)
+
+
+class GenerateDatasetTests(TestCase):
+    def _generate(self, **options):
+        options = {"users": 2, "trackers": 14, "years": 0.1, "seed": 7, "stdout": StringIO(), **options}
+        call_command("generate_dataset", **options)
+        return list(Entry.objects.order_by("user__username", "tracker__display_order", "date").values_list(
+            "user__username", "tracker__name", "date", "time_value", "duration_minutes",
+            "rating_value", "binary_value", "number_value", "text_value",
+        ))
+
+    def test_generates_users_trackers_and_derived_state(self):
+        entries = self._generate()
+
+        self.assertEqual(User.objects.filter(username__startswith="dataset").count(), 2)
+        trackers = Tracker.objects.filter(user__username="dataset1").order_by("display_order")
+        self.assertEqual(trackers.count(), 14)
+        self.assertEqual([tracker.name for tracker in trackers][11:], ["Notes", "Sleep Time 2", "Wake Up 2"])
+        self.assertEqual(DailySnapshot.objects.filter(user__username="dataset1").count(), 37)
+        self.assertEqual(
+            sum(1 for entry in entries if entry[0] == "dataset1" and entry[1] == "Mood"), 37
+        )
+        self.assertFalse(Entry.objects.exclude(user=F("daily_snapshot__user")).exists())
+        self.assertTrue(TrackerRollup.objects.filter(tracker__name="Steps").exists())
+        self.assertEqual(TrackerStreak.objects.filter(tracker__name="Exercise").count(), 2)
+
+    def test_same_seed_reproduces_data_whatever_the_batch_size(self):
+        first = self._generate(batch_size=50)
+        second = self._generate(batch_size=5000)
+        other_seed = self._generate(seed=8)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other_seed)
+        self.assertEqual(User.objects.filter(username__startswith="dataset").count(), 2)
+
+
+class BenchmarkTests(TestCase):
+    def test_measure_counts_queries_and_memory(self):
+        calls = []
+
+        result = measure(lambda: list(Tracker.objects.all()), setup=lambda: calls.append(1), rounds=3, warmup=2)
+
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(result["rounds"], 3)
+        self.assertEqual(result["queries"], 1)
+        self.assertLessEqual(result["min_ms"], result["median_ms"])
+        self.assertGreater(result["peak_kib"], 0)
+
+    def test_runs_every_case_against_a_generated_dataset(self):
+        results = run_benchmarks({"tiny": {"users": 1, "trackers": 12, "years": 0.1}}, rounds=1, warmup=0)
+
+        self.assertEqual({result["case"] for result in results}, {
+            "month_view_cold", "month_view_warm", "month_view_stats", "tracker_list", "entry_create",
+            "tracking_data_month", "tracking_data_year", "build_prompt_month",
+        })
+        by_case = {result["case"]: result for result in results}
+        self.assertEqual(by_case["tracking_data_month"]["queries"], 1)
+        self.assertLess(by_case["month_view_warm"]["queries"], by_case["month_view_cold"]["queries"])
+
+        changes = compare_results(results, results)
+        self.assertEqual({change["ratio"] for change in changes} - {None}, {1.0})
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command("generate_dataset", users=1, trackers=24, years=0.1, stdout=StringIO())
+        self.user = User.objects.get(username="dataset1")
+        self.steps = Tracker.objects.get(user=self.user, name="Steps")
+        self.client.force_login(self.user)
+
+    def test_read_endpoints_stay_within_budget(self):
+        for name, args in (("tracker:month_view", [2024, 1]), ("tracker:tracker_list", []), ("tracker:sync", [])):
+            with self.subTest(name), self.assertWithinQueryBudget(name):
+                self.assertEqual(self.client.get(reverse(name, args=args)).status_code, 200)
+
+    def test_write_endpoints_stay_within_budget(self):
+        with self.assertWithinQueryBudget("tracker:entry_create"):
+            response = self.client.post(
+                reverse("tracker:entry_create"),
+                {"tracker_id": self.steps.id, "date": "2024-01-15", "number_value": "10"},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+
+        exercise = Tracker.objects.get(user=self.user, name="Exercise")
+        items = [{"tracker_id": self.steps.id, "date": f"2024-01-{day}", "number_value": "5"} for day in range(20, 25)]
+        items.append({"tracker_id": exercise.id, "date": "2024-01-20", "binary_value": True})
+        with self.assertWithinQueryBudget("tracker:entry_batch"):
+            response = self.client.post(reverse("tracker:entry_batch"), {"items": items}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+        entry = Entry.objects.filter(tracker=self.steps).latest("date")
+        with self.assertWithinQueryBudget("tracker:entry_delete"):
+            self.assertEqual(self.client.delete(reverse("tracker:entry_delete", args=[entry.id])).status_code, 204)
+
+    def test_assert_max_queries_reports_repeated_queries(self):
+        with self.assertRaisesMessage(AssertionError, "3x SELECT"):
+            with self.assertMaxQueries(2):
+                for tracker_id in (1, 2, 3):
+                    Tracker.objects.filter(id=tracker_id).exists()
+
+    def test_fingerprint_collapses_literals_and_in_lists(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'  AND n > 10"),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? AND n > ?",
+        )
+
+    @override_settings(QUERY_INSTRUMENTATION=True, QUERY_BUDGETS={"tracker:tracker_list": 1})
+    def test_middleware_logs_requests_over_budget(self):
+        with self.assertLogs("config.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("tracker:tracker_list"))
+
+        self.assertIn("(tracker:tracker_list) over query budget 1", logs.output[0])
+
+    @override_settings(QUERY_INSTRUMENTATION=True)
+    def test_middleware_is_quiet_within_budget(self):
+        with self.assertNoLogs("config.instrumentation", "WARNING"):
+            self.client.get(reverse("tracker:tracker_list"))
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        Tracker.objects.create(user=self.user, name="Steps", tracker_type="number")
+        self.client.force_login(self.user)
+
+    def _metrics(self, response):
+        return {metric.split(";")[0]: metric for metric in response["Server-Timing"].split(", ")}
+
+    @override_settings(SERVER_TIMING=True)
+    def test_header_splits_request_into_phases(self):
+        response = self.client.get(reverse("tracker:month_view", args=[2026, 5]))
+
+        metrics = self._metrics(response)
+        self.assertEqual(list(metrics), ["auth", "db", "cache", "serialization", "total"])
+        self.assertRegex(metrics["db"], r'^db;dur=\d+\.\d;desc="\d+ calls"$')
+
+    @override_settings(SERVER_TIMING=True)
+    def test_cross_origin_pages_are_allowed_to_read_timings(self):
+        response = self.client.get(reverse("tracker:tracker_list"), HTTP_ORIGIN="http://localhost:5173")
+
+        other = self.client.get(reverse("tracker:tracker_list"), HTTP_ORIGIN="https://evil.example")
+
+        self.assertEqual(response["Timing-Allow-Origin"], "http://localhost:5173")
+        self.assertFalse(other.has_header("Timing-Allow-Origin"))
+
+    def test_off_by_default(self):
+        response = self.client.get(reverse("tracker:tracker_list"))
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_nested_phases_count_once(self):
+        timing = ServerTiming()
+        with timing.phase("cache"):
+            with timing.phase("cache"):
+                pass
+
+        self.assertEqual(timing.counts, {"cache": 1})
+        self.assertIn('cache;dur=', timing.header(1.0))
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.client.force_login(self.user)
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        self.url = reverse("tracker:tracker_list")
+
+    def _settings(self, **overrides):
+        return override_settings(**{"PROFILING": True, "PROFILE_DIR": self.profile_dir, **overrides})
+
+    def test_staff_can_ask_for_a_profile(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        with self._settings():
+            response = self.client.get(self.url, HTTP_X_PROFILE="1")
+            self.client.get(f"{self.url}?profile=1")
+
+        self.assertEqual(len(list_profiles(self.profile_dir)), 2)
+        info = parse_profile_filename(response["X-Profile-File"])
+        self.assertEqual((info["method"], info["view"]), ("GET", "tracker.tracker_list"))
+
+    def test_staff_session_token_can_ask_for_a_profile(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.logout()
+        session = SessionStore()
+        session[SESSION_KEY] = str(self.user.pk)
+        session.create()
+
+        with self._settings():
+            response = self.client.get(self.url, HTTP_X_PROFILE="1", HTTP_X_SESSION_TOKEN=session.session_key)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("X-Profile-File"))
+
+    def test_profile_flag_of_other_users_is_ignored(self):
+        with self._settings(), patch("config.profiling.cProfile.Profile") as profile:
+            response = self.client.get(self.url, HTTP_X_PROFILE="1")
+            self.client.logout()
+            self.client.get(f"{self.url}?profile=1")
+
+        profile.assert_not_called()
+        self.assertFalse(response.has_header("X-Profile-File"))
+        self.assertEqual(list_profiles(self.profile_dir), [])
+
+    def test_sampling_and_pruning(self):
+        with self._settings(PROFILE_SAMPLE_RATE=1.0, PROFILE_MAX_FILES=2):
+            for _ in range(3):
+                self.client.get(self.url)
+
+        self.assertEqual(len(list_profiles(self.profile_dir)), 2)
+
+    def test_management_command_lists_and_summarizes(self):
+        with self._settings(PROFILE_SAMPLE_RATE=1.0):
+            self.client.get(self.url)
+        name = list_profiles(self.profile_dir)[0]["file"]
+
+        listed = StringIO()
+        call_command("list_profiles", dir=self.profile_dir, stdout=listed)
+        summary = StringIO()
+        call_command("list_profiles", name, dir=self.profile_dir, limit=5, stdout=summary)
+
+        self.assertIn("GET tracker.tracker_list", listed.getvalue())
+        self.assertIn("1 profiles in", listed.getvalue())
+        self.assertIn("function calls", summary.getvalue())
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_FLUSH_INTERVAL=0)
+@patch("config.metrics._warned_process_local", True)
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        REGISTRY.reset()
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.client.force_login(self.user)
+        self.url = reverse("metrics")
+
+    def _scrape(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode()
+
+    def test_counts_requests_latency_and_queries_per_view(self):
+        self.client.get(reverse("tracker:tracker_list"))
+        self.client.get(reverse("tracker:tracker_list"))
+        self.client.get("/api/v1/nowhere/")
+
+        text = self._scrape()
+
+        self.assertIn('tracked_http_requests_total{view="tracker:tracker_list",method="GET",status="2xx"} 2', text)
+        self.assertIn('tracked_http_requests_total{view="unmatched",method="GET",status="4xx"} 1', text)
+        self.assertIn('tracked_http_request_duration_seconds_bucket{view="tracker:tracker_list",le="+Inf"} 2', text)
+        self.assertIn('tracked_http_request_duration_seconds_count{view="tracker:tracker_list"} 2', text)
+        self.assertRegex(text, r'tracked_db_queries_total\{view="tracker:tracker_list"\} [1-9]\d*')
+        self.assertNotIn('view="metrics"', text)
+
+    def test_exports_month_cache_hits_and_misses(self):
+        for _ in range(2):
+            self.client.get(reverse("tracker:month_view", args=[2026, 5]))
+
+        text = self._scrape()
+
+        self.assertIn('tracked_month_cache_requests_total{result="hit"} 1', text)
+        self.assertIn('tracked_month_cache_requests_total{result="miss"} 1', text)
+
+    def test_processes_aggregate_through_the_cache(self):
+        other_process = MetricsRegistry()
+        other_process.counter("tracked_openai_failures_total", "", ["reason"]).inc(reason="error")
+        other_process.flush()
+        OPENAI_FAILURES.inc(2, reason="error")
+
+        self.assertIn('tracked_openai_failures_total{reason="error"} 3', REGISTRY.collect())
+
+    def test_series_first_seen_by_several_processes_are_all_indexed(self):
+        processes = [MetricsRegistry() for _ in range(3)]
+        for reason, registry in zip(("error", "timeout", "parse"), processes):
+            registry.counter("tracked_openai_failures_total", "", ["reason"]).inc(reason=reason)
+        for registry in processes:
+            registry.flush()
+        # A second process announcing a known series adds nothing
+        MetricsRegistry().counter("tracked_openai_failures_total", "", ["reason"]).inc(reason="error")
+
+        text = REGISTRY.collect()
+
+        for reason, count in (("error", 2), ("timeout", 1), ("parse", 1)):
+            self.assertIn(f'tracked_openai_failures_total{{reason="{reason}"}} {count}', text)
+        self.assertEqual(text.count('tracked_openai_failures_total{reason="error"}'), 1)
+
+    def test_warns_when_the_metrics_cache_is_per_process(self):
+        with patch("config.metrics._warned_process_local", False), self.assertLogs("config.metrics", "WARNING") as logs:
+            MetricsMiddleware(lambda request: None)
+
+        self.assertIn("not shared between processes", logs.output[0])
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_registry_records_nothing(self):
+        OPENAI_FAILURES.inc(reason="error")
+
+        self.assertNotIn('reason="error"', REGISTRY.collect())
+
+    def test_endpoint_is_protected(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.logout()
+
+        with override_settings(METRICS_TOKEN="s3cret"):
+            self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200)
+            self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION="Bearer guess").status_code, 403)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION="Bearer ").status_code, 403)
@@ -8,6 +8,11 @@ from .views import (
     TrackerDeleteView,
     EntryCreateView,
     EntryDeleteView,
+    EntryBatchView,
+    SyncView,
+    TrackerRollupListView,
+    ExportView,
+    EntryImportView,
 )
 
 app_name = 'tracker'
@@ -21,8 +26,17 @@ urlpatterns = [
     path('trackers/create/', TrackerCreateView.as_view(), name='tracker_create'),  # POST (create)
     path('trackers/<int:pk>/', TrackerUpdateView.as_view(), name='tracker_update'),  # PUT/PATCH
     path('trackers/<int:pk>/delete/', TrackerDeleteView.as_view(), name='tracker_delete'),  # DELETE
+    path('trackers/<int:pk>/rollups/', TrackerRollupListView.as_view(), name='tracker_rollups'),  # GET
     
     # Entry CRUD
     path('entries/create/', EntryCreateView.as_view(), name='entry_create'),
+    path('entries/batch/', EntryBatchView.as_view(), name='entry_batch'),  # POST (bulk upsert)
     path('entries/<int:pk>/delete/', EntryDeleteView.as_view(), name='entry_delete'),  # DELETE
+
+    # Delta sync
+    path('sync/', SyncView.as_view(), name='sync'),
+
+    # Export
+    path('export/', ExportView.as_view(), name='export'),  # GET (streamed)
+    path('import/', EntryImportView.as_view(), name='import'),  # POST (multipart)
 ]
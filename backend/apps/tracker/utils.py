@@ -1,4 +1,7 @@
 # tracker/utils.py
+from datetime import datetime, timezone as dt_timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
 
 def get_month_navigation(year, month):
     """
@@ -26,4 +29,51 @@ def get_month_navigation(year, month):
         'prev_month': prev_month,
         'next_year': next_year,
         'next_month': next_month,
-    }
\ No newline at end of file
+    }
+
+
+def encode_sync_cursor(timestamp, last_id=0):
+    """
+    Encode a delta sync position as '<iso timestamp>|<last entry id>'.
+
+    Args:
+        timestamp (datetime): Rows updated after this moment are new
+        last_id (int): Tie-breaker for entries sharing the same timestamp
+
+    Returns:
+        str: Opaque cursor for the client to send back
+    """
+    # UTC with a 'Z' suffix keeps the cursor free of '+' in query strings
+    utc_iso = timestamp.astimezone(dt_timezone.utc).isoformat().replace('+00:00', 'Z')
+    return f"{utc_iso}|{last_id}"
+
+
+def decode_sync_cursor(cursor):
+    """
+    Decode a cursor produced by encode_sync_cursor.
+
+    Returns:
+        tuple: (datetime, int), or None if the cursor is malformed
+    """
+    timestamp_str, _, last_id = cursor.partition('|')
+    try:
+        timestamp = parse_datetime(timestamp_str)
+        last_id = int(last_id or 0)
+    except ValueError:
+        return None
+    if timestamp is None or timestamp.tzinfo is None:
+        return None
+    return timestamp, last_id
+
+
+def parse_date_param(value, field):
+    """
+    Parse a YYYY-MM-DD request parameter.
+
+    Raises:
+        ValidationError: keyed by field when the value is malformed
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        raise ValidationError({field: "Invalid date format. Use YYYY-MM-DD."})
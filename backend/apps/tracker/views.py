@@ -1,56 +1,149 @@
 from datetime import datetime, date
 import calendar
-from .models import Tracker, DailySnapshot, Entry
+from .models import Tracker, Entry
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .serializers import TrackerSerializer, EntrySerializer
-from .services import MonthDataBuilder
-from .utils import get_month_navigation
+from .serializers import TrackerSerializer, TrackerWithStreakSerializer, EntrySerializer, TrackerRollupSerializer
+from .models import TrackerRollup
+from .rollups import GRANULARITIES, rebuild_rollups
+from .streaks import get_streaks, rebuild_streak
+from .export import EXPORT_FORMATS, EntryExporter
+from .importer import EntryImporter, import_format
+from .services import (
+    MonthDataBuilder,
+    DeltaSyncBuilder,
+    EntryBatchUpserter,
+    record_deletions,
+    save_entry,
+    delete_entries,
+)
+from .cache import (
+    MONTH_VIEW_LAYOUTS,
+    get_month_etag,
+    get_month_version,
+    get_tracker_list_etag,
+    get_user_cache_generation,
+    get_cached_month_view,
+    set_month_view_cache,
+    invalidate_month_cache,
+    bump_user_cache_generation,
+    bump_streak_version,
+)
+from .utils import get_month_navigation, decode_sync_cursor, parse_date_param
 from .permissions import CanCreateTracker, IsOwner, IsEntryOwner
 from rest_framework import generics, status
 from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
 from rest_framework.exceptions import ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import MultiPartParser
+
+
+def conditional_response(request, etag):
+    """Return a 304 response if the client's If-None-Match matches etag."""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return with_etag(response, etag)
+    return None
+
+def with_etag(response, etag):
+    """Attach etag and make clients revalidate before reusing the body."""
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 class MonthView(generics.GenericAPIView):
-    """The main Excel-like grid view API for a specific month"""
+    """
+    The main Excel-like grid view API for a specific month
+
+    ?layout=columnar returns one value array per tracker instead of the
+    nested week/day/entry grid (``format`` is reserved by DRF).
+    ?stats=1 adds per-tracker weekly and monthly statistics.
+    Streaks of binary and prayer trackers are always included.
+    """
     permission_classes = [IsAuthenticated]
     serializer_class = TrackerSerializer
     
     def get(self, request, year, month):
+        layout = request.query_params.get('layout', 'grid')
+        if layout not in MONTH_VIEW_LAYOUTS:
+            raise ValidationError({"layout": f"layout must be one of: {', '.join(MONTH_VIEW_LAYOUTS)}."})
+        include_stats = request.query_params.get('stats', '').lower() in {'1', 'true', 'yes'}
+        variant = f"{layout}_stats" if include_stats else layout
+
+        # Answer revalidations from the cached version counters alone. The
+        # same generation and version key the cached body, so a body built
+        # while an entry is written is stored under an already dead key
+        today = date.today()
+        generation = get_user_cache_generation(request.user.id)
+        version = get_month_version(request.user.id, year, month)
+        etag = get_month_etag(request.user.id, year, month, variant, today, generation, version)
+        not_modified = conditional_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        data = get_cached_month_view(request.user.id, year, month, generation, variant, version)
+        if data is None:
+            data = self.build_month_data(year, month, layout, include_stats)
+            set_month_view_cache(request.user.id, year, month, data, generation, variant, version)
+
+        # 'today' and streaks change independently of the month, so they're never cached
+        response = Response(
+            {**data, 'today': today.isoformat(), 'streaks': get_streaks(request.user, today)},
+            status=status.HTTP_200_OK
+        )
+        return with_etag(response, etag)
+
+    def build_month_data(self, year, month, layout='grid', include_stats=False):
         trackers = Tracker.objects.filter(
-            user=request.user,
+            user=self.request.user,
             is_active=True
         ).order_by('display_order')
         
         # Use the MonthDataBuilder service
-        month_builder = MonthDataBuilder(request.user, year, month)
-        weeks = month_builder.build_weeks(trackers)
+        month_builder = MonthDataBuilder(self.request.user, year, month)
+        if layout == 'columnar':
+            month_data = month_builder.build_columns(trackers)
+        else:
+            month_data = {'weeks': month_builder.build_weeks(trackers)}
+        if include_stats:
+            month_data['stats'] = month_builder.build_stats(trackers)
         
         # Serialize trackers
         tracker_serializer = self.get_serializer(trackers, many=True)
         
-        data = {
+        return {
+            'layout': layout,
             'trackers': tracker_serializer.data,
-            'weeks': weeks,
+            **month_data,
             'month_name': calendar.month_name[month],
             'months': [{'name': calendar.month_abbr[m], 'number': m} for m in range(1, 13)],
             
             'total_days': calendar.monthrange(year, month)[1],
-            'today': date.today().isoformat(),
             **get_month_navigation(year, month),
         }
 
-        return Response(data, status=status.HTTP_200_OK)
-
 class TrackerListView(generics.ListAPIView):
-    """Returns all user's trackers in a list format"""
+    """Returns all user's trackers in a list format, with their streaks"""
     permission_classes = [IsAuthenticated, IsOwner]
-    serializer_class = TrackerSerializer
+    serializer_class = TrackerWithStreakSerializer
 
     def get_queryset(self) -> QuerySet[Tracker]: # type: ignore[override]
-        return Tracker.objects.filter(user=self.request.user).order_by('-is_active', 'display_order', 'name')
+        return (Tracker.objects
+            .filter(user=self.request.user)
+            .select_related('streak')
+            .order_by('-is_active', 'display_order', 'name')
+        )
+
+    def list(self, request, *args, **kwargs):
+        etag = get_tracker_list_etag(request.user.id, date.today())
+        not_modified = conditional_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return with_etag(super().list(request, *args, **kwargs), etag)
         
 class TrackerCreateView(generics.CreateAPIView):
     serializer_class = TrackerSerializer
@@ -59,12 +152,22 @@ class TrackerCreateView(generics.CreateAPIView):
     # sets the owner at creation time
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+        bump_user_cache_generation(self.request.user.id)
 
 class TrackerUpdateView(generics.UpdateAPIView):
     queryset = Tracker.objects.all()
     serializer_class = TrackerSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    # tracker metadata is part of every cached month
+    def perform_update(self, serializer):
+        old_type = serializer.instance.tracker_type
+        tracker = serializer.save()
+        if tracker.tracker_type != old_type:
+            rebuild_rollups([tracker])
+            rebuild_streak(tracker)
+        bump_user_cache_generation(self.request.user.id)
+
 class EntryCreateView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
 
@@ -73,38 +176,38 @@ class EntryCreateView(generics.GenericAPIView):
 
         tracker = get_object_or_404(Tracker, id=data.get('tracker_id'), user=request.user)
         date_obj = self.parse_date(data.get('date'))
-        snapshot, _ = DailySnapshot.objects.get_or_create(user=request.user, date=date_obj)
 
-        # Handle delete request (no need to fetch first)
+        # Handle delete request (no need to fetch first, never creates a snapshot)
         if data.get("delete_entry"):
-            Entry.objects.filter(tracker=tracker, daily_snapshot=snapshot).delete()
+            delete_entries(request.user, Entry.objects.filter(
+                tracker=tracker,
+                user=request.user,
+                date=date_obj
+            ))
+            invalidate_month_cache(request.user.id, date_obj.year, date_obj.month)
+            bump_streak_version(request.user.id)
             return Response({"success": True}, status=status.HTTP_200_OK)
 
-        # Get or create the entry
-        entry, created = Entry.objects.get_or_create(
-            tracker=tracker,
-            daily_snapshot=snapshot
-        )
-
-        # If updating existing entry, clear old values first
-        if not created:
-            entry.clear_values()
-
+        # Validate on an unsaved entry first, so a bad value never touches the DB
+        entry = Entry(tracker=tracker)
         try:
             entry.set_value_from_data(data)
-            entry.save()
-        except ValueError as e:
-            # keep your old behavior: if we created it and validation fails, remove it
-            if created:
-                entry.delete()
+        except (ValueError, TypeError, ArithmeticError) as e:
             return Response(
                 {"success": False, "error": str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Snapshots are only materialized on the first real write for a day.
+        # Both writes are native upserts, so concurrent edits of the same
+        # cell can't race into an IntegrityError.
+        save_entry(request.user, entry, date_obj)
+
+        invalidate_month_cache(request.user.id, date_obj.year, date_obj.month)
+        bump_streak_version(request.user.id)
         return Response(
             {"success": True, "entry_id": entry.id},
-            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+            status=status.HTTP_200_OK
         )
 
     def parse_date(self, date_str):
@@ -113,12 +216,161 @@ class EntryCreateView(generics.GenericAPIView):
         except (ValueError, TypeError):
             raise ValidationError({"date": "Invalid date format. Use YYYY-MM-DD."})
 
+class EntryBatchView(generics.GenericAPIView):
+    """
+    Create, update or delete many cells in one request.
+    Body: {"items": [{tracker_id, date, <value fields> | delete_entry}, ...]}
+    """
+    permission_classes = [IsAuthenticated]
+    max_items = 500
+
+    def post(self, request):
+        items = request.data.get('items')
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"items": "items must be a non-empty list."})
+        if len(items) > self.max_items:
+            raise ValidationError({"items": f"At most {self.max_items} items per request."})
+
+        results, touched_months = EntryBatchUpserter(request.user, items).apply()
+
+        for year, month in touched_months:
+            invalidate_month_cache(request.user.id, year, month)
+        bump_streak_version(request.user.id)
+
+        return Response(
+            {"success": all(result["success"] for result in results), "results": results},
+            status=status.HTTP_200_OK
+        )
+
 class TrackerDeleteView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated, IsOwner]
     queryset = Tracker.objects.all()
     serializer_class = TrackerSerializer
 
+    def perform_destroy(self, instance):
+        record_deletions(self.request.user, 'tracker', [instance.id])
+        instance.delete()
+        bump_user_cache_generation(self.request.user.id)
+
 class EntryDeleteView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated, IsEntryOwner]
-    queryset = Entry.objects.all()
+    queryset = Entry.objects.select_related('tracker')
     serializer_class = EntrySerializer
+
+    def perform_destroy(self, instance):
+        entry_date = instance.date
+        delete_entries(self.request.user, Entry.objects.filter(id=instance.id))
+        invalidate_month_cache(self.request.user.id, entry_date.year, entry_date.month)
+        bump_streak_version(self.request.user.id)
+
+class SyncView(generics.GenericAPIView):
+    """
+    Delta sync: trackers and entries changed since a cursor, plus deletions.
+    Omit ?cursor= for a full sync, then pass back the returned cursor.
+    """
+    permission_classes = [IsAuthenticated]
+    max_limit = 5000
+
+    def get(self, request):
+        since, last_id = None, 0
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            decoded = decode_sync_cursor(cursor)
+            if decoded is None:
+                raise ValidationError({"cursor": "Invalid cursor."})
+            since, last_id = decoded
+
+        try:
+            limit = int(request.query_params.get('limit', 1000))
+        except ValueError:
+            raise ValidationError({"limit": "limit must be an integer."})
+        limit = max(1, min(limit, self.max_limit))
+
+        data = DeltaSyncBuilder(request.user, since, last_id, limit).build()
+        return Response(data, status=status.HTTP_200_OK)
+
+class TrackerRollupListView(generics.ListAPIView):
+    """
+    Pre-aggregated week or month statistics of one tracker.
+    ?granularity=week|month&from=YYYY-MM-DD&to=YYYY-MM-DD (period starts)
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = TrackerRollupSerializer
+    pagination_class = None
+
+    def get_queryset(self) -> QuerySet[TrackerRollup]: # type: ignore[override]
+        tracker = get_object_or_404(Tracker, id=self.kwargs['pk'], user=self.request.user)
+        params = self.request.query_params
+
+        granularity = params.get('granularity', 'month')
+        if granularity not in GRANULARITIES:
+            raise ValidationError({"granularity": f"granularity must be one of: {', '.join(GRANULARITIES)}."})
+
+        rollups = TrackerRollup.objects.filter(tracker=tracker, granularity=granularity)
+        if params.get('from'):
+            rollups = rollups.filter(period_start__gte=parse_date_param(params['from'], 'from'))
+        if params.get('to'):
+            rollups = rollups.filter(period_start__lte=parse_date_param(params['to'], 'to'))
+        return rollups.order_by('period_start')
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """Leaves ?format= to the export view; errors still render as JSON."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+class ExportView(generics.GenericAPIView):
+    """
+    Stream the user's whole history, one row per day and one column per tracker.
+    ?format=csv|ndjson&from=YYYY-MM-DD&to=YYYY-MM-DD
+    """
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = ExportContentNegotiation
+
+    def get(self, request):
+        params = request.query_params
+        export_format = params.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({"format": f"format must be one of: {', '.join(EXPORT_FORMATS)}."})
+
+        start = parse_date_param(params['from'], 'from') if params.get('from') else None
+        end = parse_date_param(params['to'], 'to') if params.get('to') else None
+        if start and end and start > end:
+            raise ValidationError({"to": "to must not be before from."})
+
+        exporter = EntryExporter(request.user, start, end)
+        response = StreamingHttpResponse(
+            exporter.stream(export_format),
+            content_type=EXPORT_FORMATS[export_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="tracked-export.{export_format}"'
+        return response
+
+class EntryImportView(generics.GenericAPIView):
+    """
+    Import a .csv or .xlsx spreadsheet in the export layout (multipart field 'file').
+    Unknown columns create trackers; errors are reported per row and column.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({"file": "Upload a .csv or .xlsx file."})
+        file_format = import_format(upload.name)
+        if file_format is None:
+            raise ValidationError({"file": "Only .csv and .xlsx files can be imported."})
+
+        try:
+            report = EntryImporter(request.user).import_file(upload, file_format)
+        except ValueError as e:
+            return Response(
+                {"success": False, "error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # New trackers and any number of months changed
+        bump_user_cache_generation(request.user.id)
+        bump_streak_version(request.user.id)
+        return Response({"success": True, **report}, status=status.HTTP_200_OK)
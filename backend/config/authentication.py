@@ -0,0 +1,20 @@
+from allauth.headless.contrib.rest_framework.authentication import XSessionTokenAuthentication
+from rest_framework.authentication import SessionAuthentication
+
+from .timing import timing_phase
+
+
+class TimedXSessionTokenAuthentication(XSessionTokenAuthentication):
+    """allauth's X-Session-Token authentication, timed as the 'auth' phase."""
+
+    def authenticate(self, request):
+        with timing_phase("auth"):
+            return super().authenticate(request)
+
+
+class TimedSessionAuthentication(SessionAuthentication):
+    """DRF session authentication, timed as the 'auth' phase."""
+
+    def authenticate(self, request):
+        with timing_phase("auth"):
+            return super().authenticate(request)
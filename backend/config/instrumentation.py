@@ -0,0 +1,134 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\bIN \((?:%s, )*%s\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """SQL with literals and IN lists collapsed, so repeats of one query group together."""
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _LITERAL.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that counts and times queries.
+
+    Runs on every query without needing DEBUG, so it is cheap enough
+    to keep installed outside of tests.
+    """
+
+    def __init__(self, slow_ms=None):
+        self.slow_ms = slow_ms
+        self.count = 0
+        self.time_ms = 0.0
+        self.fingerprints = Counter()
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.time_ms += elapsed
+            self.fingerprints[fingerprint(sql)] += 1
+            if self.slow_ms is not None and elapsed >= self.slow_ms:
+                self.slow.append((round(elapsed, 1), sql))
+
+    def duplicates(self, limit=5):
+        """
+        Returns:
+            list: (fingerprint, count) of queries run more than once, most repeated first
+        """
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1][:limit]
+
+    def summary(self):
+        lines = [f"{self.count} queries, {self.time_ms:.1f} ms"]
+        lines += [f"  {count}x {sql[:300]}" for sql, count in self.duplicates()]
+        lines += [f"  slow {elapsed} ms: {sql[:300]}" for elapsed, sql in self.slow]
+        return "\n".join(lines)
+
+
+@contextmanager
+def record_queries(slow_ms=None, using=None):
+    """
+    Record the queries run inside the block.
+
+    Args:
+        slow_ms: queries at least this slow are kept with their SQL
+        using: database alias to watch; all databases when None
+    """
+    recorder = QueryRecorder(slow_ms)
+    aliases = [using] if using else list(connections)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield recorder
+
+
+def query_budget(view_name):
+    """Maximum number of queries a view may run per request."""
+    return settings.QUERY_BUDGETS.get(view_name, settings.QUERY_COUNT_BUDGET)
+
+
+class QueryCountMiddleware:
+    """
+    Log requests that run more queries or spend more time in the database
+    than their budget, with the repeated query fingerprints that usually
+    point at an N+1.
+
+    Opt-in with the QUERY_INSTRUMENTATION setting. Queries run while a
+    streaming response is consumed happen after the middleware returns
+    and aren't counted.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_queries(slow_ms=settings.SLOW_QUERY_MS) as recorder:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        view_name = match.view_name if match else request.path
+        budget = query_budget(view_name)
+        if recorder.count > budget or recorder.time_ms > settings.QUERY_TIME_BUDGET_MS or recorder.slow:
+            logger.warning(
+                "%s %s (%s) over query budget %s: %s",
+                request.method, request.path, view_name, budget, recorder.summary(),
+            )
+        return response
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting an upper bound on queries, which unlike
+    assertNumQueries doesn't break when a change saves a query.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using="default"):
+        with record_queries(using=using) as recorder:
+            yield recorder
+        if recorder.count > budget:
+            self.fail(f"{recorder.count} queries exceed the budget of {budget}: {recorder.summary()}")
+
+    def assertWithinQueryBudget(self, view_name, using="default"):
+        """Assert the QUERY_BUDGETS entry of a view (or the default budget)."""
+        return self.assertMaxQueries(query_budget(view_name), using)
@@ -0,0 +1,285 @@
+import logging
+import math
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Latency histogram upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+# Processes re-announce their series this often, healing evicted index keys
+_REGISTER_INTERVAL = 300
+
+# Series are indexed in numbered slots: a counter hands out slot numbers
+# atomically and each slot key holds one series
+_SLOT_COUNT_KEY = "metrics:series:count"
+
+logger = logging.getLogger(__name__)
+
+# Middleware instances of a process warn about a per-process cache once
+_warned_process_local = False
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = (
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, amount=1, **labels):
+        self.registry.add(self.name, self._labels(labels), "", amount)
+
+    def _labels(self, labels):
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def suffixes(self):
+        return [""]
+
+    def samples(self, values, series):
+        for labels in series:
+            yield self.name, labels, values.get((self.name, labels, ""), 0)
+
+
+class Histogram(Counter):
+    # Sums are stored as integer microseconds so they can use cache.incr
+    _SCALE = 1_000_000
+
+    def __init__(self, registry, name, documentation, labelnames, buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        labels = self._labels(labels)
+        bucket = next(bound for bound in self.buckets if value <= bound)
+        self.registry.add(self.name, labels, f"bucket:{bucket}", 1)
+        self.registry.add(self.name, labels, "sum", round(value * self._SCALE))
+
+    def suffixes(self):
+        return [f"bucket:{bound}" for bound in self.buckets] + ["sum"]
+
+    def samples(self, values, series):
+        for labels in series:
+            cumulative = 0
+            for bound in self.buckets:
+                cumulative += values.get((self.name, labels, f"bucket:{bound}"), 0)
+                yield f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative
+            yield f"{self.name}_sum", labels, values.get((self.name, labels, "sum"), 0) / self._SCALE
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """
+    Counters and histograms shared by every process through the cache.
+
+    Each process buffers increments and adds them with cache.incr() at most
+    every METRICS_FLUSH_INTERVAL seconds, which is atomic on Redis, so
+    gunicorn workers aggregate into the same numbers. Every series seen so
+    far gets its own slot key, numbered by an incr() counter, so processes
+    announcing series at the same time never overwrite each other; a race
+    only indexes a series twice, which collect() ignores.
+    Nothing is recorded unless METRICS_ENABLED.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self._pending = {}
+        self._announced = {}
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[settings.METRICS_CACHE]
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.metrics.setdefault(name, Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.metrics.setdefault(name, Histogram(self, name, documentation, labelnames, buckets))
+
+    def collector(self, name, kind, documentation, samples):
+        """
+        Export values kept elsewhere.
+
+        Args:
+            samples: callable returning [(labels dict, value)]
+        """
+        self.collectors.append((name, kind, documentation, samples))
+
+    def add(self, name, labels, suffix, amount):
+        if not settings.METRICS_ENABLED:
+            return
+        key = (name, labels, suffix)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + amount
+        if time.monotonic() - self._last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+
+        for key, amount in pending.items():
+            self._incr(self._cache_key(*key), amount)
+
+        now = time.monotonic()
+        for series in {key[:2] for key in pending}:
+            if now - self._announced.get(series, -math.inf) > _REGISTER_INTERVAL:
+                self._announce(series)
+                self._announced[series] = now
+
+    def reset(self):
+        """Forget buffered increments and announced series (tests clear the cache)."""
+        with self._lock:
+            self._pending = {}
+            self._announced = {}
+
+    def collect(self):
+        """Every metric in the Prometheus text exposition format."""
+        self.flush()
+        slots = [self._slot_key(slot) for slot in range(1, self.cache.get(_SLOT_COUNT_KEY, 0) + 1)]
+        series = {}
+        for name, labels in sorted(set(self.cache.get_many(slots).values())):
+            if name in self.metrics:
+                series.setdefault(name, []).append(labels)
+
+        keys = {}
+        for name, labels_list in series.items():
+            metric = self.metrics[name]
+            for labels in labels_list:
+                for suffix in metric.suffixes():
+                    keys[self._cache_key(name, labels, suffix)] = (name, labels, suffix)
+        stored = self.cache.get_many(list(keys))
+        values = {keys[key]: value for key, value in stored.items()}
+
+        lines = []
+        for name, metric in self.metrics.items():
+            kind = "histogram" if isinstance(metric, Histogram) else "counter"
+            lines += [f"# HELP {name} {metric.documentation}", f"# TYPE {name} {kind}"]
+            for sample, labels, value in metric.samples(values, series.get(name, [])):
+                lines.append(f"{sample}{_format_labels(labels)} {_format_value(value)}")
+        for name, kind, documentation, samples in self.collectors:
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+            for labels, value in samples():
+                lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _announce(self, series):
+        """Index a series unless its slot still holds it."""
+        slot_of_series = "metrics:series-slot:" + self._cache_key(*series, "")
+        slot = self.cache.get(slot_of_series)
+        if slot is not None and self.cache.get(self._slot_key(slot)) == series:
+            return
+        slot = self._incr(_SLOT_COUNT_KEY, 1)
+        self.cache.set(self._slot_key(slot), series, None)
+        self.cache.set(slot_of_series, slot, None)
+
+    def _incr(self, key, amount):
+        try:
+            return self.cache.incr(key, amount)
+        except ValueError:
+            self.cache.add(key, 0, None)
+            return self.cache.incr(key, amount)
+
+    def _slot_key(self, slot):
+        return f"metrics:series:{slot}"
+
+    def _cache_key(self, name, labels, suffix):
+        label_part = ",".join(f"{key}={value}" for key, value in labels)
+        return f"metrics:{name}:{label_part}:{suffix}"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "tracked_http_requests_total", "HTTP requests by URL name, method and status class.",
+    ["view", "method", "status"],
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "tracked_http_request_duration_seconds", "Request latency by URL name.", ["view"],
+)
+DB_QUERIES = REGISTRY.counter(
+    "tracked_db_queries_total", "SQL queries run while handling requests, by URL name.", ["view"],
+)
+OPENAI_LATENCY = REGISTRY.histogram(
+    "tracked_openai_request_duration_seconds", "OpenAI call latency by outcome.", ["outcome"],
+)
+OPENAI_FAILURES = REGISTRY.counter(
+    "tracked_openai_failures_total", "Failed OpenAI insight generations by reason.", ["reason"],
+)
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    Count requests, their latency and their SQL queries per URL name.
+
+    Requests that don't resolve are grouped as 'unmatched' to keep the
+    number of series bounded. Enabled with the METRICS_ENABLED setting.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        global _warned_process_local
+        if not _warned_process_local and isinstance(REGISTRY.cache, (LocMemCache, DummyCache)):
+            _warned_process_local = True
+            logger.warning(
+                "METRICS_CACHE %r is not shared between processes; /metrics will only "
+                "report the process that serves it. Point it at a Redis cache.",
+                settings.METRICS_CACHE,
+            )
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = _QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(queries))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        if view != "metrics":
+            HTTP_REQUESTS.inc(view=view, method=request.method, status=f"{response.status_code // 100}xx")
+            HTTP_LATENCY.observe(elapsed, view=view)
+            DB_QUERIES.inc(queries.count, view=view)
+        return response
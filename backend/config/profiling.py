@@ -0,0 +1,131 @@
+import cProfile
+import os
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from importlib import import_module
+from types import SimpleNamespace
+
+from allauth.headless.contrib.rest_framework.authentication import XSessionTokenAuthentication
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.core.exceptions import MiddlewareNotUsed
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "profile"
+
+# 20261018T061927-1532ms-GET-tracker.month_view-3fa2c1.prof
+_PROFILE_FILE = re.compile(
+    r"^(?P<when>\d{8}T\d{6})-(?P<ms>\d+)ms-(?P<method>[A-Z]+)-(?P<view>.+)-[0-9a-f]{6}\.prof$"
+)
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.]+")
+
+
+def profile_filename(method, view_name, duration_ms, when=None):
+    when = when or datetime.now(timezone.utc)
+    view = _UNSAFE.sub(".", view_name).strip(".") or "unknown"
+    return f"{when:%Y%m%dT%H%M%S}-{duration_ms:.0f}ms-{method}-{view}-{uuid.uuid4().hex[:6]}.prof"
+
+
+def parse_profile_filename(name):
+    """
+    Returns:
+        dict: when, duration_ms, method and view of a profile file, or None
+    """
+    match = _PROFILE_FILE.match(name)
+    if match is None:
+        return None
+    return {
+        "file": name,
+        "when": datetime.strptime(match["when"], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc),
+        "duration_ms": int(match["ms"]),
+        "method": match["method"],
+        "view": match["view"],
+    }
+
+
+def list_profiles(directory):
+    """Captured profiles in a directory, newest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    profiles = [info for info in map(parse_profile_filename, names) if info]
+    return sorted(profiles, key=lambda info: info["file"], reverse=True)
+
+
+def _requested(request):
+    return (
+        request.headers.get(PROFILE_HEADER) == "1"
+        or request.GET.get(PROFILE_PARAM) == "1"
+    )
+
+
+def _is_staff(request):
+    """
+    Whether the X-Session-Token or session cookie of a request belongs to
+    a staff user. Runs before the auth middleware and DRF have set
+    request.user.
+    """
+    result = XSessionTokenAuthentication().authenticate(request)
+    if result is not None:
+        return result[0].is_staff
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return False
+    session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    return get_user(SimpleNamespace(session=session)).is_staff
+
+
+class ProfilingMiddleware:
+    """
+    Run cProfile around a request and write the stats to PROFILE_DIR as a
+    .prof file (readable with pstats, snakeviz or flameprof).
+
+    A request is profiled when sampled (PROFILE_SAMPLE_RATE) or when a
+    staff user asks with an 'X-Profile: 1' header or '?profile=1'; the
+    flag is ignored for everyone else, so only staff can make a request
+    pay for the profiler. Enabled with the PROFILING setting.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = _requested(request) and _is_staff(request)
+        if not requested and random.random() >= settings.PROFILE_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running in this thread
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        name = profile_filename(request.method, match.view_name if match else request.path, duration_ms)
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(settings.PROFILE_DIR, name))
+        self._prune()
+        if requested:
+            response["X-Profile-File"] = name
+        return response
+
+    def _prune(self):
+        """Delete the oldest profiles beyond PROFILE_MAX_FILES."""
+        for info in list_profiles(settings.PROFILE_DIR)[settings.PROFILE_MAX_FILES:]:
+            try:
+                os.remove(os.path.join(settings.PROFILE_DIR, info["file"]))
+            except FileNotFoundError:
+                pass
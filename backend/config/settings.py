@@ -100,6 +100,7 @@ CORS_ALLOW_CREDENTIALS = True
 
 CORS_ALLOW_HEADERS = list(default_headers) + [
     "x-session-token",
+    "x-profile",
 ]
 
 CORS_ALLOWED_ORIGINS = [
@@ -126,6 +127,11 @@ STRIPE_PRICE_PRO_YEARLY = os.getenv("STRIPE_PRICE_PRO_YEARLY")
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Insight generation queue (see the run_insight_worker command)
+INSIGHT_JOB_MAX_ATTEMPTS = int(os.getenv("INSIGHT_JOB_MAX_ATTEMPTS", "3"))
+INSIGHT_JOB_RETRY_DELAY = float(os.getenv("INSIGHT_JOB_RETRY_DELAY", "30"))
+INSIGHT_JOB_VISIBILITY_TIMEOUT = int(os.getenv("INSIGHT_JOB_VISIBILITY_TIMEOUT", "300"))
+
 # ─────────────────────────────────────────────
 # APPLICATIONS
 # ─────────────────────────────────────────────
@@ -186,7 +192,11 @@ HEADLESS_ONLY = True # tells allauth you are using the API/headless flow instead
 # MIDDLEWARE
 # ─────────────────────────────────────────────
 MIDDLEWARE = [
+    "config.metrics.MetricsMiddleware",
+    "config.timing.ServerTimingMiddleware",
+    "config.profiling.ProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "config.instrumentation.QueryCountMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -197,13 +207,55 @@ MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+# ─────────────────────────────────────────────
+# INSTRUMENTATION
+# ─────────────────────────────────────────────
+# Logs requests over their query budget; off unless enabled
+QUERY_INSTRUMENTATION = _parse_bool(os.getenv("QUERY_INSTRUMENTATION"), default=False)
+QUERY_COUNT_BUDGET = int(os.getenv("QUERY_COUNT_BUDGET", "20"))
+QUERY_TIME_BUDGET_MS = float(os.getenv("QUERY_TIME_BUDGET_MS", "250"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+
+# Per-view query budgets (by URL name), asserted by the QueryBudgetTests of each app
+QUERY_BUDGETS = {
+    "tracker:month_view": 8,
+    "tracker:tracker_list": 5,
+    "tracker:entry_create": 12,
+    "tracker:entry_batch": 16,
+    "tracker:entry_delete": 12,
+    "tracker:sync": 6,
+    "insights:list": 5,
+    "insights:generate": 10,
+    "insights:job": 5,
+}
+
+# Server-Timing header (auth, db, cache, serialization, external) on every response
+SERVER_TIMING = _parse_bool(os.getenv("SERVER_TIMING"), default=False)
+
+# Request profiles (cProfile .prof files): sampled, or asked for by staff
+# with an "X-Profile: 1" header or ?profile=1
+PROFILING = _parse_bool(os.getenv("PROFILING"), default=False)
+PROFILE_DIR = os.getenv("PROFILE_DIR") or str(BASE_DIR / "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "500"))
+
+# Request, latency, query and OpenAI metrics, aggregated across processes in
+# METRICS_CACHE and served at /api/v1/metrics/ to staff or METRICS_TOKEN bearers;
+# off unless enabled. METRICS_CACHE must be shared by every process (Redis):
+# with a per-process cache, /metrics only reports the worker that answers it
+METRICS_ENABLED = _parse_bool(os.getenv("METRICS_ENABLED"), default=False)
+METRICS_CACHE = os.getenv("METRICS_CACHE", "default")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
 # ─────────────────────────────────────────────
 # REST FRAMEWORK (AUTH)
 # ─────────────────────────────────────────────
 REST_FRAMEWORK = {
+    # allauth X-Session-Token and DRF session auth, timed for Server-Timing
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "allauth.headless.contrib.rest_framework.authentication.XSessionTokenAuthentication",
-        'rest_framework.authentication.SessionAuthentication',
+        "config.authentication.TimedXSessionTokenAuthentication",
+        "config.authentication.TimedSessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
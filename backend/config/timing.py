@@ -0,0 +1,126 @@
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Phases in the order they appear in the header
+SERVER_TIMING_PHASES = ("auth", "db", "cache", "serialization", "external")
+
+_current = ContextVar("server_timing", default=None)
+
+
+class ServerTiming:
+    """Time spent per phase during one request."""
+
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+        self._open = set()
+
+    def add(self, name, ms):
+        self.durations[name] = self.durations.get(name, 0.0) + ms
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    @contextmanager
+    def phase(self, name):
+        # Nested phases of the same name (a cache helper calling another) count once
+        if name in self._open:
+            yield
+            return
+        self._open.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._open.discard(name)
+            self.add(name, (time.perf_counter() - started) * 1000)
+
+    def __call__(self, execute, sql, params, many, context):
+        # Database execute wrapper
+        with self.phase("db"):
+            return execute(sql, params, many, context)
+
+    def header(self, total_ms):
+        """Server-Timing header value, e.g. 'auth;dur=1.2, db;dur=3.4;desc="5 calls", total;dur=9.8'."""
+        metrics = []
+        for name in SERVER_TIMING_PHASES:
+            if name in self.durations:
+                count = self.counts[name]
+                metrics.append(f'{name};dur={self.durations[name]:.1f};desc="{count} call{"s" * (count != 1)}"')
+        metrics.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(metrics)
+
+
+@contextmanager
+def timing_phase(name):
+    """
+    Count the time spent in the block towards a Server-Timing phase of the
+    current request. Does nothing outside of ServerTimingMiddleware.
+    """
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    with timing.phase(name):
+        yield
+
+
+class TimedCache:
+    """Proxy of a cache whose calls count towards the 'cache' phase."""
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def __getattr__(self, name):
+        attr = getattr(self._cache, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            with timing_phase("cache"):
+                return attr(*args, **kwargs)
+        return timed
+
+
+class ServerTimingMiddleware:
+    """
+    Add a Server-Timing header splitting the response time into auth,
+    database, cache, serialization (response rendering) and external
+    (OpenAI, Stripe) phases.
+
+    Phases overlap where they nest: queries run while authenticating count
+    towards both auth and db. Enabled with the SERVER_TIMING setting; the
+    cost is a couple of perf_counter calls per query and cache call.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = ServerTiming()
+        token = _current.set(timing)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timing))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        response["Server-Timing"] = timing.header((time.perf_counter() - started) * 1000)
+        origin = request.headers.get("Origin")
+        if origin in settings.CORS_ALLOWED_ORIGINS:
+            # Cross-origin pages only see the durations when allowed to
+            response["Timing-Allow-Origin"] = origin
+        return response
+
+    def process_template_response(self, request, response):
+        # Render here instead of in the handler so rendering can be timed
+        with timing_phase("serialization"):
+            response.render()
+        return response
@@ -1,11 +1,27 @@
+import hmac
+
 from django.views.decorators.csrf import ensure_csrf_cookie
 
 from django.conf import settings
+from django.http import HttpResponse
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, BasePermission
 from rest_framework.response import Response
 
+from .metrics import REGISTRY
+
+
+class IsMetricsScraper(BasePermission):
+    """Staff users, or requests with 'Authorization: Bearer <METRICS_TOKEN>'."""
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        token = settings.METRICS_TOKEN
+        header = request.headers.get("Authorization", "")
+        return bool(token) and hmac.compare_digest(header, f"Bearer {token}")
+
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
@@ -23,3 +39,9 @@ def public_config_view(request):
         },
         status=status.HTTP_200_OK,
     )
+
+
+@api_view(["GET"])
+@permission_classes([IsMetricsScraper])
+def metrics_view(request):
+    return HttpResponse(REGISTRY.collect(), content_type="text/plain; version=0.0.4; charset=utf-8")
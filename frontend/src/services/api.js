@@ -223,6 +223,15 @@ export const trackerAPI = {
     const response = await api.delete(`/tracker/trackers/${id}/delete/`);
     return response.data;
   },
+
+  // Download the whole history as a csv or ndjson file
+  exportHistory: async (format = 'csv', from, to) => {
+    const response = await api.get('/tracker/export/', {
+      params: { format, from, to },
+      responseType: 'blob',
+    });
+    return response.data;
+  },
 };
 
 // Entry APIs
@@ -233,6 +242,12 @@ export const entryAPI = {
     return response.data;
   },
 
+  // Create, update or delete many cells at once
+  saveEntries: async (items) => {
+    const response = await api.post('/tracker/entries/batch/', { items });
+    return response.data;
+  },
+
   // Delete entry
   deleteEntry: async (id) => {
     const response = await api.delete(`/tracker/entries/${id}/delete/`);
@@ -250,10 +265,31 @@ export const insightsAPI = {
     return first || { content: null };
   },
 
-  generate: async (reportType) => {
-    const response = await api.post('/insights/generate/', { report_type: reportType });
-    return response.data;
+  // Queues the generation, then polls the job until the insight is ready
+  generate: async (reportType, { force = false, interval = 1500, timeout = 120000 } = {}) => {
+    const response = await api.post('/insights/generate/', { report_type: reportType, force });
+    let job = response.data;
+    const deadline = Date.now() + timeout;
+
+    while (job.status === 'queued' || job.status === 'running') {
+      if (Date.now() > deadline) {
+        throw insightJobError('Insight generation is taking longer than expected. Try again soon.');
+      }
+      await new Promise((resolve) => setTimeout(resolve, interval));
+      job = (await api.get(`/insights/jobs/${job.id}/`)).data;
+    }
+
+    if (!job.insight) {
+      throw insightJobError(job.error || 'Failed to generate insight');
+    }
+    return job.insight;
   },
 };
 
+const insightJobError = (message) => {
+  const error = new Error(message);
+  error.response = { data: { error: message } };
+  return error;
+};
+
 export default api;